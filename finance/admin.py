@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Expense, Purchase
+from .models import Expense, MonthlyRollup, Purchase
 
 
 @admin.register(Expense)
@@ -80,4 +80,20 @@ class PurchaseAdmin(admin.ModelAdmin):
         if obj.pk:
             return f"{obj.total_amount:,}원"
         return "-"
-    total_amount.short_description = "총 매입금액"
\ No newline at end of file
+    total_amount.short_description = "총 매입금액"
+
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    """월별 재무 집계 — 시그널·rebuild_finance_rollup이 관리하므로 조회 전용"""
+    list_display = ['year', 'month', 'status', 'count', 'amount', 'cost', 'updated_at']
+    list_filter = ['year', 'status']
+    ordering = ['-year', '-month', 'status']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,29 @@
+"""월별 재무 집계(MonthlyRollup) 재구축.
+
+평소엔 시그널이 버킷 단위로 유지하므로 필요 없음. 시그널을 안 타는 경로(QuerySet.update,
+bulk_create, DB 직접 수정, 데이터 이관)로 원본을 고친 뒤나 집계가 의심될 때 실행.
+
+    python manage.py rebuild_finance_rollup              # 전체
+    python manage.py rebuild_finance_rollup --year 2025  # 한 해만
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from finance.rollup import rebuild
+
+
+class Command(BaseCommand):
+    help = '월별 재무 집계표를 주문·매입·지출 원본에서 다시 생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=None,
+                            help='해당 연도만 재구축 (기본값: 전체)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = rebuild(year=options['year'])
+        scope = f"{options['year']}년" if options['year'] else '전체'
+        self.stdout.write(self.style.SUCCESS(
+            f'{scope} 집계 {count}행 재구축 ({time.monotonic() - started:.2f}s)'
+        ))
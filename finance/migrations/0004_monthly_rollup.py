@@ -0,0 +1,42 @@
+# Generated by Django 4.2.25 on 2026-10-19 02:07
+
+from django.db import migrations, models
+
+
+def build_rollup(apps, schema_editor):
+    from finance.rollup import rebuild
+    rebuild(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_alter_expense_options_alter_purchase_options'),
+        ('orders', '0030_ktalk_queue_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='연도')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='월')),
+                ('status', models.CharField(max_length=20, verbose_name='구분')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='건수')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='금액')),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='원가')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='갱신일시')),
+            ],
+            options={
+                'verbose_name': '월별 재무 집계',
+                'verbose_name_plural': '월별 재무 집계',
+                'ordering': ['-year', '-month', 'status'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(fields=('year', 'month', 'status'), name='finance_rollup_month_status_uniq'),
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
@@ -99,4 +99,33 @@ class Purchase(models.Model):
     @property
     def total_amount(self):
         """총 매입 금액 (금액 × 수량)"""
-        return self.amount * self.quantity
\ No newline at end of file
+        return self.amount * self.quantity
+
+class MonthlyRollup(models.Model):
+    """월별 재무 집계 — (연, 월, 구분)당 1행. finance/rollup.py가 유지.
+
+    구분(status): 주문 상태값(NEW·CONSULTING·…)이면 그 달 결제(payment_date, 현지 시간) 주문의
+    건수·매출(total_order_amount)·원가(항목 unit_cost × quantity + 택배비) 합계,
+    PURCHASE·EXPENSE면 그 달 매입·지출 건수·금액(amount × quantity) 합계 (원가 0).
+    """
+    PURCHASE = 'PURCHASE'
+    EXPENSE = 'EXPENSE'
+
+    year = models.PositiveSmallIntegerField(verbose_name="연도")
+    month = models.PositiveSmallIntegerField(verbose_name="월")
+    status = models.CharField(max_length=20, verbose_name="구분")
+    count = models.PositiveIntegerField(default=0, verbose_name="건수")
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name="금액")
+    cost = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name="원가")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="갱신일시")
+
+    class Meta:
+        verbose_name = "월별 재무 집계"
+        verbose_name_plural = "월별 재무 집계"
+        ordering = ['-year', '-month', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month', 'status'], name='finance_rollup_month_status_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.status} {self.count}건 {self.amount:,}원"
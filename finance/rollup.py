@@ -0,0 +1,263 @@
+"""월별 재무 집계(MonthlyRollup) 유지·조회.
+
+대시보드·매출현황·결과통보/정산 목록·재무 요약은 원본 주문·매입·지출을 매번 다시 합치지 않고
+이 표를 읽는다 — 한 해 전체도 집계 행 조회 1번.
+
+갱신:
+- signals.py: Order·OrderItem·Purchase·Expense 저장/삭제 시 영향받는 (연, 월, 구분) 버킷을
+  dirty 표시 → 트랜잭션 커밋 후 그 버킷만 원본에서 다시 집계. 버킷 단위 재계산이라 증감 누적
+  오차가 없고, 상태·결제일이 바뀌면 이전·새 버킷 둘 다 갱신
+- QuerySet.update()/bulk_create는 시그널을 안 타므로 호출 측에서 직접 표시: 이전·새 값을 알면
+  mark_dirty([order_key(이전 상태, 결제일), order_key(새 상태, 결제일)]), 모르면 update 전·후로
+  touch_orders(pks) 두 번
+- 전체 재구축: python manage.py rebuild_finance_rollup [--year 2025]
+  (마이그레이션이 최초 1회 실행. 시그널 밖에서 원본을 고친 뒤 교정용)
+"""
+import threading
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+PURCHASE = 'PURCHASE'
+EXPENSE = 'EXPENSE'
+
+# 매출현황·대시보드 매출 기준 — 결제 이후 상태 (등록·제작준비·취소 제외)
+REVENUE_STATUSES = ('CONSULTING', 'PRODUCED', 'COMPLETED', 'SETTLED', 'ARCHIVED')
+
+_pending = threading.local()
+
+
+def line_total(price_field):
+    """건별 합계 (단가 × quantity) SQL 식 — 모델 total_amount/total_cost 프로퍼티의 SQL 버전."""
+    return ExpressionWrapper(
+        F(price_field) * F('quantity'),
+        output_field=DecimalField(max_digits=20, decimal_places=2),
+    )
+
+
+def _models(apps=global_apps):
+    # 마이그레이션(RunPython)에서는 과거 모델 상태의 apps를 넘겨 받음
+    return (
+        apps.get_model('orders', 'Order'),
+        apps.get_model('orders', 'OrderItem'),
+        apps.get_model('finance', 'Purchase'),
+        apps.get_model('finance', 'Expense'),
+        apps.get_model('finance', 'MonthlyRollup'),
+    )
+
+
+def order_key(status, payment_date):
+    """주문 버킷 (연, 월, 상태) — 월은 현지 시간(TIME_ZONE) 기준, payment_date__month와 같은 경계."""
+    if not status or payment_date is None:
+        return None
+    if timezone.is_aware(payment_date):
+        payment_date = timezone.localtime(payment_date)
+    return (payment_date.year, payment_date.month, status)
+
+
+def dated_key(kind, date):
+    """매입·지출 버킷 (연, 월, PURCHASE|EXPENSE)."""
+    if date is None:
+        return None
+    return (date.year, date.month, kind)
+
+
+def _order_totals(orders, item_model):
+    agg = orders.aggregate(
+        count=Count('id'),
+        revenue=Sum('total_order_amount'),
+        shipping=Sum('shipping_cost'),
+    )
+    items_cost = item_model.objects.filter(order__in=orders).aggregate(
+        cost=Sum(line_total('unit_cost')),
+    )['cost']
+    return {
+        'count': agg['count'],
+        'revenue': agg['revenue'] or Decimal('0'),
+        'cost': (agg['shipping'] or Decimal('0')) + (items_cost or Decimal('0')),
+    }
+
+
+def order_totals(orders):
+    """주문 QuerySet의 건수·매출·원가(항목 원가 + 택배비) — SQL 집계 (집계표로 못 거르는 조건용)."""
+    from orders.models import OrderItem
+    return _order_totals(orders, OrderItem)
+
+
+# ───────────────────────────────────────────────────────────────────────
+# 증분 갱신 — 시그널이 dirty 표시, 커밋 후 버킷 재계산
+# ───────────────────────────────────────────────────────────────────────
+
+
+def mark_dirty(keys=(), order_ids=()):
+    """버킷 (연, 월, 구분) / 주문 id(커밋 시점 상태로 버킷 확인)를 dirty 표시 → 커밋 후 재계산.
+
+    같은 트랜잭션의 여러 저장은 첫 flush에서 한 번에 처리되고 나머지 콜백은 빈 집합.
+    롤백되면 표시만 남아 다음 flush에서 재계산됨 (재계산은 멱등이라 무해).
+    """
+    state = _pending.__dict__
+    state.setdefault('keys', set()).update(k for k in keys if k)
+    state.setdefault('order_ids', set()).update(i for i in order_ids if i)
+    # robust: 집계 갱신 실패가 이미 커밋된 원본 저장 요청을 깨지 않도록 (로그만, rebuild로 교정)
+    transaction.on_commit(flush, robust=True)
+
+
+def touch_orders(pks):
+    """QuerySet.update() 등 시그널 밖 주문 변경용 — 지금 시점 (상태, 결제일) 버킷을 dirty 표시.
+
+    상태·결제일을 바꾸는 update면 update 전·후에 한 번씩 호출.
+    """
+    from orders.models import Order
+    rows = Order.objects.filter(pk__in=list(pks)).values_list('status', 'payment_date')
+    mark_dirty(keys=[order_key(status, payment_date) for status, payment_date in rows])
+
+
+def flush():
+    """dirty 버킷 재계산 (on_commit 콜백)."""
+    state = _pending.__dict__
+    keys = state.pop('keys', set())
+    order_ids = state.pop('order_ids', set())
+    if order_ids:
+        from orders.models import Order
+        rows = Order.objects.filter(pk__in=order_ids).values_list('status', 'payment_date')
+        keys.update(order_key(status, payment_date) for status, payment_date in rows)
+        keys.discard(None)
+    for year, month, status in sorted(keys):
+        refresh_bucket(year, month, status)
+
+
+def refresh_bucket(year, month, status, apps=global_apps):
+    """버킷 1개를 원본에서 다시 집계해 upsert (원본 0건이면 행 삭제)."""
+    Order, OrderItem, Purchase, Expense, MonthlyRollup = _models(apps)
+
+    with transaction.atomic():
+        # 기존 행 잠금 → 같은 버킷 동시 재계산 직렬화 (늦게 잡은 쪽이 최신 원본으로 다시 집계)
+        bucket = MonthlyRollup.objects.select_for_update().filter(year=year, month=month, status=status)
+        list(bucket)
+
+        if status in (PURCHASE, EXPENSE):
+            model = Purchase if status == PURCHASE else Expense
+            agg = model.objects.filter(date__year=year, date__month=month).aggregate(
+                count=Count('id'), amount=Sum(line_total('amount')),
+            )
+            values = {'count': agg['count'], 'amount': agg['amount'] or Decimal('0'), 'cost': Decimal('0')}
+        else:
+            totals = _order_totals(
+                Order.objects.filter(status=status, payment_date__year=year, payment_date__month=month),
+                OrderItem,
+            )
+            values = {'count': totals['count'], 'amount': totals['revenue'], 'cost': totals['cost']}
+
+        if not values['count']:
+            bucket.delete()
+            return
+        MonthlyRollup.objects.update_or_create(year=year, month=month, status=status, defaults=values)
+
+
+def rebuild(year=None, apps=global_apps):
+    """집계표 전체(또는 한 해) 재구축 — 모델별 TruncMonth group-by. 반환: 생성한 행 수."""
+    Order, OrderItem, Purchase, Expense, MonthlyRollup = _models(apps)
+
+    orders = Order.objects.all()
+    items = OrderItem.objects.all()
+    if year:
+        orders = orders.filter(payment_date__year=year)
+        items = items.filter(order__payment_date__year=year)
+
+    rows = {}
+    order_rows = (
+        orders.annotate(m=TruncMonth('payment_date'))
+        .values('m', 'status')
+        .annotate(count=Count('id'), revenue=Sum('total_order_amount'), shipping=Sum('shipping_cost'))
+        .order_by()
+    )
+    for r in order_rows:
+        key = (r['m'].year, r['m'].month, r['status'])
+        rows[key] = MonthlyRollup(
+            year=key[0], month=key[1], status=key[2], count=r['count'],
+            amount=r['revenue'] or Decimal('0'), cost=r['shipping'] or Decimal('0'),
+        )
+    item_rows = (
+        items.annotate(m=TruncMonth('order__payment_date'))
+        .values('m', 'order__status')
+        .annotate(cost=Sum(line_total('unit_cost')))
+        .order_by()
+    )
+    for r in item_rows:
+        row = rows.get((r['m'].year, r['m'].month, r['order__status']))
+        if row is not None:
+            row.cost += r['cost'] or Decimal('0')
+
+    for kind, model in ((PURCHASE, Purchase), (EXPENSE, Expense)):
+        qs = model.objects.filter(date__year=year) if year else model.objects.all()
+        dated_rows = (
+            qs.annotate(m=TruncMonth('date'))
+            .values('m')
+            .annotate(count=Count('id'), amount=Sum(line_total('amount')))
+            .order_by()
+        )
+        for r in dated_rows:
+            key = (r['m'].year, r['m'].month, kind)
+            rows[key] = MonthlyRollup(
+                year=key[0], month=key[1], status=kind, count=r['count'],
+                amount=r['amount'] or Decimal('0'),
+            )
+
+    with transaction.atomic():
+        existing = MonthlyRollup.objects.filter(year=year) if year else MonthlyRollup.objects.all()
+        existing.delete()
+        MonthlyRollup.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+# ───────────────────────────────────────────────────────────────────────
+# 조회 — 뷰는 여기만 읽음
+# ───────────────────────────────────────────────────────────────────────
+
+
+def empty_summary():
+    return {
+        'revenue': Decimal('0'),
+        'cost': Decimal('0'),
+        'order_count': 0,
+        'status_counts': {},
+        'purchase': Decimal('0'),
+        'purchase_count': 0,
+        'expense': Decimal('0'),
+        'expense_count': 0,
+    }
+
+
+def summary(year, month=None, statuses=REVENUE_STATUSES):
+    """(연[, 월]) 재무 집계 — 집계 행 조회 1번.
+
+    statuses: 매출·원가·주문 건수에 넣을 주문 상태 (status_counts도 이 상태만).
+    반환: (합계, {월: 월 합계}) — 각 dict 키 revenue·cost·order_count·status_counts·
+          purchase·purchase_count·expense·expense_count. 데이터 없는 달은 월 dict에 없음.
+    """
+    from .models import MonthlyRollup
+
+    rows = MonthlyRollup.objects.filter(year=year).order_by()
+    if month:
+        rows = rows.filter(month=month)
+
+    total = empty_summary()
+    months = {}
+    for row in rows:
+        for bucket in (total, months.setdefault(row.month, empty_summary())):
+            if row.status == PURCHASE:
+                bucket['purchase'] += row.amount
+                bucket['purchase_count'] += row.count
+            elif row.status == EXPENSE:
+                bucket['expense'] += row.amount
+                bucket['expense_count'] += row.count
+            elif row.status in statuses:
+                bucket['revenue'] += row.amount
+                bucket['cost'] += row.cost
+                bucket['order_count'] += row.count
+                bucket['status_counts'][row.status] = bucket['status_counts'].get(row.status, 0) + row.count
+    return total, months
@@ -0,0 +1,83 @@
+"""월별 재무 집계(rollup.py) dirty 표시 시그널.
+
+- post_init에서 로드 시점 (상태, 결제일)/order_id/date를 기억해 두고, 저장·삭제 시 이전·새
+  버킷을 모두 dirty 표시 → 커밋 후 rollup.flush()가 그 버킷만 재계산
+- update_fields가 집계와 무관한 필드뿐인 저장(메모·마감일 등)은 건너뜀
+- QuerySet.update()/bulk_create 호출 측은 rollup.touch_orders() 직접 호출
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from orders.models import Order, OrderItem
+
+from . import rollup
+from .models import Expense, Purchase
+
+ORDER_FIELDS = {'status', 'payment_date', 'total_order_amount', 'shipping_cost'}
+ITEM_FIELDS = {'order', 'order_id', 'unit_cost', 'quantity'}
+DATED_FIELDS = {'date', 'amount', 'quantity'}
+DATED_KINDS = {Purchase: rollup.PURCHASE, Expense: rollup.EXPENSE}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+# __dict__ 직접 조회: 지연 로드(only/defer) 필드를 건드려 쿼리가 나가지 않도록
+
+
+@receiver(post_init, sender=Order)
+def _order_loaded(sender, instance, **kwargs):
+    instance._rollup_loaded = (instance.__dict__.get('status'), instance.__dict__.get('payment_date'))
+
+
+@receiver(post_save, sender=Order)
+def _order_saved(sender, instance, created, update_fields=None, **kwargs):
+    if not _touches(update_fields, ORDER_FIELDS):
+        return
+    keys = [rollup.order_key(instance.status, instance.payment_date)]
+    if not created:
+        keys.append(rollup.order_key(*instance._rollup_loaded))
+    rollup.mark_dirty(keys)
+    instance._rollup_loaded = (instance.status, instance.payment_date)
+
+
+@receiver(post_delete, sender=Order)
+def _order_deleted(sender, instance, **kwargs):
+    rollup.mark_dirty([
+        rollup.order_key(instance.status, instance.payment_date),
+        rollup.order_key(*instance._rollup_loaded),
+    ])
+
+
+@receiver(post_init, sender=OrderItem)
+def _item_loaded(sender, instance, **kwargs):
+    instance._rollup_order_id = instance.__dict__.get('order_id')
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def _item_changed(sender, instance, update_fields=None, **kwargs):
+    if not _touches(update_fields, ITEM_FIELDS):
+        return
+    # 주문 삭제 cascade면 flush 시점엔 주문이 없어 건너뜀 — 주문 자신의 post_delete가 처리
+    rollup.mark_dirty(order_ids=[instance.order_id, instance._rollup_order_id])
+    instance._rollup_order_id = instance.order_id
+
+
+@receiver(post_init, sender=Purchase)
+@receiver(post_init, sender=Expense)
+def _dated_loaded(sender, instance, **kwargs):
+    instance._rollup_date = instance.__dict__.get('date')
+
+
+@receiver(post_save, sender=Purchase)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Purchase)
+@receiver(post_delete, sender=Expense)
+def _dated_changed(sender, instance, update_fields=None, **kwargs):
+    if not _touches(update_fields, DATED_FIELDS):
+        return
+    kind = DATED_KINDS[sender]
+    rollup.mark_dirty([rollup.dated_key(kind, instance.date), rollup.dated_key(kind, instance._rollup_date)])
+    instance._rollup_date = instance.date
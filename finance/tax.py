@@ -0,0 +1,174 @@
+"""종합소득세 계산 + 시나리오 시뮬레이터 (NumPy 벡터 연산).
+
+- calculate_income_tax: 과세표준 1건, Decimal 구간 순회 (재무 요약 화면)
+- income_tax_array: 과세표준 배열 전체를 np.searchsorted로 구간 찾아 한 번에 계산.
+  모든 원소에서 calculate_income_tax(x)와 정확히 같은 값 (아래 정확도 참고)
+- simulate: 매출·지출 배수 × 수수료율 × 부가세 처리 조합을 격자로 펼쳐 세후 금액 일괄 계산.
+  세액은 재무 요약(Decimal 순이익 ÷ Decimal('1.1'))과 같은 값 (아래 정확도 참고)
+
+정확도: calculate_income_tax는 Decimal(str(x)) × 세율 - 누진공제를 절사(int)한다.
+- 정수 과세표준: int64 정수 연산 (x × 세율% - 공제 × 100) // 100 — 오차 없음
+- 소수 과세표준: float 계산 후, 결과가 정수 경계에 오차 범위만큼 가까운 원소만
+  calculate_income_tax로 다시 계산 (드묾). 나머지는 float 오차가 절사 결과를 바꿀 수 없음
+- simulate: float 순이익·과세표준은 재무 요약의 Decimal 값과 마지막 자리가 다를 수 있음.
+  세액 절사 경계나 구간 상한에 그 오차 범위만큼 가까운 시나리오만 재무 요약과 같은
+  Decimal 식(_exact_income_tax)으로 다시 계산
+"""
+from decimal import Decimal
+from itertools import product
+
+import numpy as np
+
+# 과세표준 구간 (2023-2024년 귀속): (상한, 세율, 누진공제) — 상한 이하면 그 구간
+INCOME_TAX_BRACKETS = [
+    (Decimal('14000000'), Decimal('0.06'), Decimal('0')),                    # 1,400만원 이하: 6%
+    (Decimal('50000000'), Decimal('0.15'), Decimal('1260000')),              # 1,400만원 초과 ~ 5,000만원 이하: 15%, 누진공제 126만원
+    (Decimal('88000000'), Decimal('0.24'), Decimal('5760000')),              # 5,000만원 초과 ~ 8,800만원 이하: 24%, 누진공제 576만원
+    (Decimal('150000000'), Decimal('0.35'), Decimal('15440000')),            # 8,800만원 초과 ~ 1억 5,000만원 이하: 35%, 누진공제 1,544만원
+    (Decimal('300000000'), Decimal('0.38'), Decimal('19940000')),            # 1억 5,000만원 초과 ~ 3억원 이하: 38%, 누진공제 1,994만원
+    (Decimal('500000000'), Decimal('0.40'), Decimal('25940000')),            # 3억원 초과 ~ 5억원 이하: 40%, 누진공제 2,594만원
+    (Decimal('1000000000'), Decimal('0.42'), Decimal('35940000')),           # 5억원 초과 ~ 10억원 이하: 42%, 누진공제 3,594만원
+    (Decimal('9999999999999'), Decimal('0.45'), Decimal('65940000')),        # 10억원 초과: 45%, 누진공제 6,594만원
+]
+
+# 벡터 계산용 — 같은 표에서 파생 (상한 float, 세율 정수 %, 공제 정수)
+_LIMITS = np.array([float(limit) for limit, _, _ in INCOME_TAX_BRACKETS])
+_RATE_PCT = np.array([int(rate * 100) for _, rate, _ in INCOME_TAX_BRACKETS], dtype=np.int64)
+_DEDUCTIONS = np.array([int(deduction) for _, _, deduction in INCOME_TAX_BRACKETS], dtype=np.int64)
+
+VAT_MODES = {
+    'exclusive': '순이익 ÷ 1.1 (부가세 제외)',
+    'none': '부가세 없음 (순이익 그대로)',
+}
+MAX_SCENARIOS = 20000
+
+
+def calculate_income_tax(taxable_income):
+    """
+    종합소득세 계산 (2023-2024년 귀속)
+    산출세액 = (과세표준 × 해당구간세율) - 누진공제액
+    """
+    # Decimal로 변환
+    if not isinstance(taxable_income, Decimal):
+        taxable_income = Decimal(str(taxable_income))
+
+    for limit, rate, deduction in INCOME_TAX_BRACKETS:
+        if taxable_income <= limit:
+            tax = taxable_income * rate - deduction
+            return int(tax) if tax > 0 else 0
+
+    return 0
+
+
+def income_tax_array(taxable_incomes):
+    """과세표준 배열 → 산출세액 int64 배열 (원소마다 calculate_income_tax와 동일)."""
+    incomes = np.asarray(taxable_incomes, dtype=float)
+    # 첫 번째 '상한 >= 소득' 구간 = calculate_income_tax의 taxable_income <= limit
+    idx = np.searchsorted(_LIMITS, incomes, side='left')
+    in_range = idx < len(_LIMITS)   # 마지막 상한 초과는 calculate_income_tax처럼 0
+    idx = np.minimum(idx, len(_LIMITS) - 1)
+    pct = _RATE_PCT[idx]
+    deduction = _DEDUCTIONS[idx]
+
+    tax = np.zeros(incomes.shape, dtype=np.int64)
+
+    # 정수 과세표준: 정수 연산 (양수면 int() 절사 = 내림)
+    integral = in_range & (incomes == np.floor(incomes)) & (np.abs(incomes) < 2.0 ** 53 / 100)
+    scaled = incomes[integral].astype(np.int64) * pct[integral] - deduction[integral] * 100
+    tax[integral] = np.where(scaled > 0, scaled // 100, 0)
+
+    # 소수 과세표준: float 계산, 정수 경계 근처만 Decimal 재계산
+    fractional = in_range & ~integral
+    raw = incomes[fractional] * (pct[fractional] / 100) - deduction[fractional]
+    tax[fractional] = np.where(raw > 0, np.floor(raw), 0).astype(np.int64)
+    tolerance = np.abs(incomes[fractional]) * 1e-13 + 1e-6
+    near = np.abs(raw - np.round(raw)) < tolerance
+    if near.any():
+        positions = np.flatnonzero(fractional)[near]
+        tax[positions] = [calculate_income_tax(value) for value in incomes[positions].tolist()]
+    return tax
+
+
+def _near_tax_boundary(taxable, tolerance):
+    """과세표준이 ±tolerance 안에서 움직이면 세액이 바뀔 수 있는 원소 (절사 경계·구간 상한)."""
+    lo = np.searchsorted(_LIMITS, taxable - tolerance, side='left')
+    hi = np.searchsorted(_LIMITS, taxable + tolerance, side='left')
+    idx = np.minimum(hi, len(_LIMITS) - 1)
+    raw = taxable * (_RATE_PCT[idx] / 100) - _DEDUCTIONS[idx]
+    return (lo != hi) | (np.abs(raw - np.round(raw)) < tolerance + np.abs(raw) * 1e-13)
+
+
+def _exact_income_tax(revenue, purchase, expense, revenue_multiplier, expense_multiplier, fee_rate, vat_mode):
+    """시나리오 1건 세액 — 재무 요약(financial_summary)과 같은 Decimal 계산."""
+    def dec(value):
+        return value if isinstance(value, Decimal) else Decimal(str(value))
+
+    scenario_revenue = dec(revenue) * dec(revenue_multiplier)
+    net_profit = (
+        scenario_revenue - dec(purchase) - dec(expense) * dec(expense_multiplier)
+        - scenario_revenue * dec(fee_rate)
+    )
+    if vat_mode == 'exclusive':
+        net_profit = net_profit / Decimal('1.1')
+    return calculate_income_tax(net_profit)
+
+
+def simulate(revenue, purchase, expense, revenue_multipliers=(1.0,), expense_multipliers=(1.0,),
+             fee_rates=(0.06,), vat_modes=('exclusive',)):
+    """시나리오 격자 일괄 계산 — 매출 배수 × 지출 배수 × 수수료율 × 부가세 처리 전체 조합.
+
+    매출 = revenue × 매출 배수, 지출 = expense × 지출 배수 (매입은 고정),
+    순이익 = 매출 - 매입 - 지출 - 매출 × 수수료율, 과세표준 = 부가세 처리에 따라 순이익 ÷ 1.1 또는 그대로.
+    반환: 열 이름 → ndarray dict (길이 = 조합 수). 조합이 MAX_SCENARIOS 초과면 ValueError.
+    """
+    for mode in vat_modes:
+        if mode not in VAT_MODES:
+            raise ValueError(f'알 수 없는 부가세 처리: {mode} (가능: {", ".join(VAT_MODES)})')
+    count = len(revenue_multipliers) * len(expense_multipliers) * len(fee_rates) * len(vat_modes)
+    if not count:
+        raise ValueError('시나리오 값 목록이 비어 있습니다')
+    if count > MAX_SCENARIOS:
+        raise ValueError(f'시나리오 {count}개 — 최대 {MAX_SCENARIOS}개')
+
+    # 격자 펼치기 (조합 순서: 매출 배수 → 지출 배수 → 수수료율 → 부가세 처리)
+    grid = np.array(list(product(
+        range(len(revenue_multipliers)), range(len(expense_multipliers)),
+        range(len(fee_rates)), range(len(vat_modes)),
+    )))
+    revenue_x = np.asarray(revenue_multipliers, dtype=float)[grid[:, 0]]
+    expense_x = np.asarray(expense_multipliers, dtype=float)[grid[:, 1]]
+    fee_rate = np.asarray(fee_rates, dtype=float)[grid[:, 2]]
+    vat_mode = np.asarray(vat_modes)[grid[:, 3]]
+
+    scenario_revenue = float(revenue) * revenue_x
+    scenario_expense = float(expense) * expense_x
+    fee = scenario_revenue * fee_rate
+    net_profit = scenario_revenue - float(purchase) - scenario_expense - fee
+    taxable = np.where(vat_mode == 'exclusive', net_profit / 1.1, net_profit)
+    income_tax = income_tax_array(taxable)
+
+    # float 순이익 오차(입력 크기 기준 몇 ulp) 안에서 세액이 달라질 수 있는 시나리오만 Decimal 재계산
+    tolerance = (np.abs(scenario_revenue) + abs(float(purchase)) + np.abs(scenario_expense)) * 1e-13 + 1e-6
+    for i in np.flatnonzero(_near_tax_boundary(taxable, tolerance)).tolist():
+        income_tax[i] = _exact_income_tax(
+            revenue, purchase, expense, revenue_x[i], expense_x[i], fee_rate[i], vat_mode[i],
+        )
+
+    return {
+        'revenue_multiplier': revenue_x,
+        'expense_multiplier': expense_x,
+        'fee_rate': fee_rate,
+        'vat_mode': vat_mode,
+        'revenue': scenario_revenue,
+        'purchase': np.full(len(grid), float(purchase)),
+        'expense': scenario_expense,
+        'smartstore_fee': fee,
+        'net_profit': net_profit,
+        'vat_amount': net_profit - taxable,
+        'taxable_income': taxable,
+        'income_tax': income_tax,
+        'net_income': taxable - income_tax,
+        'effective_rate': np.divide(
+            income_tax * 100.0, taxable, out=np.zeros(len(grid)), where=taxable > 0,
+        ),
+    }
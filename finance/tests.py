@@ -1,3 +1,199 @@
-from django.test import TestCase
+import datetime
+import json
+import random
+from decimal import Decimal
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Order, OrderItem, Status
+from popbill_api.standin import BANKDA_REPLAY_IP
+
+from . import rollup
+from .models import Expense, MonthlyRollup, Purchase
+from .tax import INCOME_TAX_BRACKETS, calculate_income_tax, income_tax_array, simulate
+
+
+class IncomeTaxArrayTests(SimpleTestCase):
+    """벡터 세액 계산(income_tax_array)이 모든 원소에서 calculate_income_tax와 같은지."""
+
+    def assertMatchesScalar(self, incomes):
+        incomes = np.asarray(incomes, dtype=float)
+        expected = [calculate_income_tax(value) for value in incomes.tolist()]
+        self.assertEqual(income_tax_array(incomes).tolist(), expected)
+
+    def test_bracket_boundaries(self):
+        points = []
+        for limit, _rate, _deduction in INCOME_TAX_BRACKETS:
+            limit = float(limit)
+            points += [limit - 1, limit - 0.5, limit - 1e-3, limit, limit + 1e-3, limit + 0.5, limit + 1]
+        points += [-1e8, -1, 0, 0.01, 1, 16, 17, 1e13, 2e13]
+        self.assertMatchesScalar(points)
+
+    def test_random_incomes(self):
+        rng = random.Random(20261019)
+        integral = [rng.randrange(-10_000_000, 2_000_000_000) for _ in range(5000)]
+        fractional = [rng.uniform(-1e7, 2e9) for _ in range(5000)]
+        # 순이익 ÷ 1.1 — 재무 요약과 같은 형태의 과세표준 (정수 경계 근처 값이 많음)
+        vat_exclusive = [rng.randrange(0, 1_500_000_000) / 1.1 for _ in range(5000)]
+        self.assertMatchesScalar(integral + fractional + vat_exclusive)
+
+    def test_exact_integer_tax(self):
+        # float로는 0.06 × 100 = 6.000000000000001 같은 오차 — 정수 경로는 오차 없이 일치
+        self.assertMatchesScalar([100, 1_000_000, 14_000_000, 50_000_000, 87_999_999])
+        self.assertEqual(calculate_income_tax(Decimal('14000000')), income_tax_array([14_000_000])[0])
+
+
+def summary_income_tax(revenue, purchase, expense, fee_rate, vat_mode='exclusive'):
+    """재무 요약(financial_summary)의 Decimal 계산 그대로."""
+    revenue, purchase, expense = Decimal(revenue), Decimal(purchase), Decimal(expense)
+    net_profit = revenue - purchase - expense - revenue * Decimal(fee_rate)
+    if vat_mode == 'exclusive':
+        net_profit = net_profit / Decimal('1.1')
+    return calculate_income_tax(net_profit)
+
+
+class SimulateTests(SimpleTestCase):
+    def test_grid_matches_financial_summary(self):
+        result = simulate(
+            120_000_000, 30_000_000, 20_000_000,
+            revenue_multipliers=[0.5, 1, 1.5], expense_multipliers=[1, 2],
+            fee_rates=[0, 0.06], vat_modes=['exclusive', 'none'],
+        )
+        self.assertEqual(len(result['income_tax']), 3 * 2 * 2 * 2)
+        for i, income_tax in enumerate(result['income_tax'].tolist()):
+            revenue = 120_000_000 * Decimal(str(result['revenue_multiplier'][i]))
+            expense = 20_000_000 * Decimal(str(result['expense_multiplier'][i]))
+            expected = summary_income_tax(
+                revenue, 30_000_000, expense, str(result['fee_rate'][i]), result['vat_mode'][i],
+            )
+            self.assertEqual(income_tax, expected)
+
+    def test_vat_exclusive_base_matches_financial_summary(self):
+        # 순이익 ÷ 1.1을 float로 하면 1,039,502,805 등에서 재무 요약보다 1원 적게 나옴
+        for net_profit in range(11_000_000, 1_100_000_000, 1_100_003):
+            income_tax = simulate(net_profit, 0, 0, fee_rates=[0])['income_tax'][0]
+            self.assertEqual(income_tax, summary_income_tax(net_profit, 0, 0, '0'), net_profit)
+
+    def test_random_totals_match_financial_summary(self):
+        rng = random.Random(20261019)
+        for _ in range(300):
+            revenue = rng.randrange(10_000_000, 3_000_000_000)
+            purchase = rng.randrange(0, revenue // 2)
+            expense = rng.randrange(0, revenue // 3)
+            result = simulate(revenue, purchase, expense, fee_rates=[0, 0.03, 0.06], vat_modes=['exclusive', 'none'])
+            for i, income_tax in enumerate(result['income_tax'].tolist()):
+                expected = summary_income_tax(
+                    revenue, purchase, expense, str(result['fee_rate'][i]), result['vat_mode'][i],
+                )
+                self.assertEqual(income_tax, expected)
+
+    def test_rejects_unknown_vat_mode_and_oversized_grid(self):
+        with self.assertRaises(ValueError):
+            simulate(1, 0, 0, vat_modes=['gross'])
+        with self.assertRaises(ValueError):
+            simulate(1, 0, 0, revenue_multipliers=range(200), expense_multipliers=range(200))
+
+
+class MonthlyRollupIncrementalTests(TestCase):
+    """시그널·호출 측 mark_dirty로 갱신한 집계표가 rollup.rebuild() 결과와 같은지."""
+
+    def setUp(self):
+        self.may = timezone.make_aware(datetime.datetime(2026, 5, 31, 23, 30))
+        self.june = timezone.make_aware(datetime.datetime(2026, 6, 1, 0, 30))
+
+    def snapshot(self):
+        return sorted(MonthlyRollup.objects.values_list('year', 'month', 'status', 'count', 'amount', 'cost'))
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rollup.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+        return incremental
+
+    def make_order(self, order_id, status=Status.NEW, payment_date=None, amount='33000', shipping='3000'):
+        return Order.objects.create(
+            smartstore_order_id=order_id, status=status, payment_date=payment_date or self.may,
+            customer_name='홍길동', total_order_amount=Decimal(amount), shipping_cost=Decimal(shipping),
+        )
+
+    def make_item(self, order, unit_cost='5000', quantity=2):
+        return OrderItem.objects.create(
+            order=order, smartstore_product_name='반팔티', quantity=quantity,
+            unit_price=Decimal('15000'), unit_cost=Decimal(unit_cost),
+        )
+
+    def test_creates_changes_moves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.make_order('R-1', status=Status.CONSULTING)
+            second = self.make_order('R-2', status=Status.CONSULTING, payment_date=self.june)
+            item = self.make_item(first)
+            self.make_item(second, unit_cost='7000', quantity=1)
+            Purchase.objects.create(date=datetime.date(2026, 5, 3), category='원단', amount=Decimal('1000'), quantity=3)
+            expense = Expense.objects.create(date=datetime.date(2026, 5, 4), category='택배', amount=Decimal('500'))
+        rows = self.assertMatchesRebuild()
+        self.assertEqual(len(rows), 4)
+
+        # 상태·결제일 변경 → 이전·새 버킷 둘 다
+        with self.captureOnCommitCallbacks(execute=True):
+            first.status = Status.PRODUCED
+            first.save()
+            second.payment_date = self.may
+            second.save()
+            expense.date = datetime.date(2026, 6, 2)
+            expense.save()
+        self.assertMatchesRebuild()
+
+        # 항목을 다른 주문으로 이동 → 두 주문 버킷 모두 원가 갱신
+        third = self.make_order('R-3', status=Status.SETTLED, payment_date=self.june)
+        with self.captureOnCommitCallbacks(execute=True):
+            item.order = third
+            item.save()
+        self.assertMatchesRebuild()
+
+        # 삭제 (주문 cascade 포함) → 원본 0건 버킷은 행 삭제
+        with self.captureOnCommitCallbacks(execute=True):
+            third.delete()
+            expense.delete()
+        rows = self.assertMatchesRebuild()
+        self.assertNotIn(Status.SETTLED, [row[2] for row in rows])
+        self.assertNotIn(rollup.EXPENSE, [row[2] for row in rows])
+
+    def test_export_shipping_excel_update(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            orders = [self.make_order(f'R-X{i}', status=Status.PRODUCED) for i in range(3)]
+            self.make_item(orders[0])
+        self.client.force_login(User.objects.create_user('staff'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('export_shipping_excel'), {
+                'order_ids': [o.pk for o in orders[:2]],
+            })
+        self.assertEqual(response.status_code, 200)
+        rows = self.assertMatchesRebuild()
+        self.assertEqual(
+            {row[2]: row[3] for row in rows},
+            {Status.PRODUCED: 1, Status.COMPLETED: 2},
+        )
+
+    def test_payment_confirm_update(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            new = self.make_order('R-P1')
+            self.make_item(new)
+            self.make_order('R-P2', status=Status.CONSULTING, payment_date=self.june)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('bankda_payment_confirm'),
+                json.dumps({'requests': [{'order_id': 'R-P1'}, {'order_id': 'R-P2'}]}),
+                content_type='application/json', REMOTE_ADDR=BANKDA_REPLAY_IP,
+            )
+        self.assertEqual(response.status_code, 200)
+        rows = self.assertMatchesRebuild()
+        self.assertEqual(
+            [(row[1], row[2], row[3]) for row in rows],
+            [(5, Status.CONSULTING, 1), (6, Status.CONSULTING, 1)],
+        )
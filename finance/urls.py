@@ -8,6 +8,13 @@ urlpatterns = [
     # 순이익 요약
     path('net-profit/', views.net_profit_summary, name='net_profit_summary'),
     
+    # 다년 추이·예측
+    path('trends/', views.trend_report, name='trend_report'),
+    
+    # 세금 시나리오 시뮬레이터
+    path('tax-simulator/', views.tax_simulator, name='tax_simulator'),
+    path('api/tax-simulate/', views.tax_simulate_api, name='tax_simulate_api'),
+    
     # 지출 관리
     path('expenses/', views.ExpenseListView.as_view(), name='expense_list'),
     path('expenses/create/', views.ExpenseCreateView.as_view(), name='expense_create'),
@@ -4,42 +4,51 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, CreateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.db.models import Sum, Q
+from django.views.decorators.http import require_POST
 from decimal import Decimal
+from . import rollup, tax, trends
+from .tax import calculate_income_tax
 from .models import Expense, Purchase
 from .forms import ExpenseForm, PurchaseForm
-from orders.models import Order, Status
+from orders.models import Status
 
 
-def calculate_income_tax(taxable_income):
-    """
-    종합소득세 계산 (2023-2024년 귀속)
-    산출세액 = (과세표준 × 해당구간세율) - 누진공제액
-    """
-    from decimal import Decimal
-    
-    # Decimal로 변환
-    if not isinstance(taxable_income, Decimal):
-        taxable_income = Decimal(str(taxable_income))
-    
-    # 과세표준 구간 및 세율 (모두 Decimal로 처리)
-    tax_brackets = [
-        (Decimal('14000000'), Decimal('0.06'), Decimal('0')),                    # 1,400만원 이하: 6%
-        (Decimal('50000000'), Decimal('0.15'), Decimal('1260000')),              # 1,400만원 초과 ~ 5,000만원 이하: 15%, 누진공제 126만원
-        (Decimal('88000000'), Decimal('0.24'), Decimal('5760000')),              # 5,000만원 초과 ~ 8,800만원 이하: 24%, 누진공제 576만원
-        (Decimal('150000000'), Decimal('0.35'), Decimal('15440000')),            # 8,800만원 초과 ~ 1억 5,000만원 이하: 35%, 누진공제 1,544만원
-        (Decimal('300000000'), Decimal('0.38'), Decimal('19940000')),            # 1억 5,000만원 초과 ~ 3억원 이하: 38%, 누진공제 1,994만원
-        (Decimal('500000000'), Decimal('0.40'), Decimal('25940000')),            # 3억원 초과 ~ 5억원 이하: 40%, 누진공제 2,594만원
-        (Decimal('1000000000'), Decimal('0.42'), Decimal('35940000')),           # 5억원 초과 ~ 10억원 이하: 42%, 누진공제 3,594만원
-        (Decimal('9999999999999'), Decimal('0.45'), Decimal('65940000')),        # 10억원 초과: 45%, 누진공제 6,594만원
-    ]
-    
-    for limit, rate, deduction in tax_brackets:
-        if taxable_income <= limit:
-            tax = taxable_income * rate - deduction
-            return int(tax) if tax > 0 else 0
-    
-    return 0
+SMARTSTORE_FEE_RATE = Decimal('0.06')
+
+# 재무 요약·순이익 요약 매출 기준 — 발송 완료 주문
+SUMMARY_STATUSES = (Status.COMPLETED,)
+
+
+def _period_totals(year, month=None):
+    """매출·매입·지출 합계와 건수 + 월별 합계 — 월별 재무 집계(rollup) 조회 1번."""
+    total, months = rollup.summary(year, month, statuses=SUMMARY_STATUSES)
+    totals = {
+        'total_revenue': total['revenue'],
+        'total_purchase': total['purchase'],
+        'total_expense': total['expense'],
+        'revenue_count': total['order_count'],
+        'purchase_count': total['purchase_count'],
+        'expense_count': total['expense_count'],
+    }
+    return totals, months
+
+
+def _monthly_breakdown(months, include_smartstore_fee):
+    """연간 조회용 1~12월 행 (rollup.summary 월별 합계 → 수수료·순이익)."""
+    rows = []
+    for month in range(1, 13):
+        m = months.get(month) or rollup.empty_summary()
+        fee = m['revenue'] * SMARTSTORE_FEE_RATE if include_smartstore_fee else Decimal('0')
+        rows.append({
+            'month': month,
+            'revenue': m['revenue'],
+            'revenue_count': m['order_count'],
+            'purchase': m['purchase'],
+            'expense': m['expense'],
+            'smartstore_fee': fee,
+            'net_profit': m['revenue'] - m['purchase'] - m['expense'] - fee,
+        })
+    return rows
 
 
 @login_required
@@ -57,43 +66,23 @@ def financial_summary(request):
     except:
         year = datetime.now().year
     
-    # 기본 쿼리셋
-    orders_query = Order.objects.filter(
-        payment_date__year=year,
-        status=Status.COMPLETED
-    )
-    purchases_query = Purchase.objects.filter(date__year=year)
-    expenses_query = Expense.objects.filter(date__year=year)
-    
     # 월 필터
     if month:
         try:
             month = int(month)
-            orders_query = orders_query.filter(payment_date__month=month)
-            purchases_query = purchases_query.filter(date__month=month)
-            expenses_query = expenses_query.filter(date__month=month)
         except:
             pass
     
-    # 매출 계산 (완료된 주문의 총 금액)
-    total_revenue = orders_query.aggregate(
-        total=Sum('total_order_amount')
-    )['total'] or Decimal('0')
-    
-    # 매입 계산 (총 매입 금액 = amount × quantity)
-    total_purchase = Decimal('0')
-    for purchase in purchases_query:
-        total_purchase += purchase.total_amount
-    
-    # 지출 계산 (총 지출 금액 = amount × quantity)
-    total_expense = Decimal('0')
-    for expense in expenses_query:
-        total_expense += expense.total_amount
+    # 매출(발송 완료 주문)·매입·지출 합계 — 월별 재무 집계 조회 1번
+    totals, months = _period_totals(year, month if isinstance(month, int) else None)
+    total_revenue = totals['total_revenue']
+    total_purchase = totals['total_purchase']
+    total_expense = totals['total_expense']
     
     # 스마트스토어 수수료 계산 (매출의 6%)
     smartstore_fee = Decimal('0')
     if include_smartstore_fee:
-        smartstore_fee = total_revenue * Decimal('0.06')
+        smartstore_fee = total_revenue * SMARTSTORE_FEE_RATE
     
     # 순이익 계산 = 매출 - 매입 - 지출 - 스마트스토어 수수료
     net_profit = total_revenue - total_purchase - total_expense - smartstore_fee
@@ -121,11 +110,15 @@ def financial_summary(request):
         'vat_exclusive_profit': vat_exclusive_profit,
         'income_tax': income_tax,
         'net_income': net_income,
-        'revenue_count': orders_query.count(),
-        'purchase_count': purchases_query.count(),
-        'expense_count': expenses_query.count(),
+        'revenue_count': totals['revenue_count'],
+        'purchase_count': totals['purchase_count'],
+        'expense_count': totals['expense_count'],
     }
     
+    # 연간 조회(월 미선택)면 월별 내역 — 같은 집계 조회 결과에서
+    if not month:
+        context['monthly'] = _monthly_breakdown(months, include_smartstore_fee)
+    
     return render(request, 'finance/financial_summary.html', context)
 
 
@@ -149,42 +142,16 @@ def net_profit_summary(request):
     except:
         month = datetime.now().month
     
-    # 기본 쿼리셋
-    orders_query = Order.objects.filter(
-        payment_date__year=year,
-        payment_date__month=month,
-        status=Status.COMPLETED
-    ).exclude(status=Status.CANCELED)
-    
-    purchases_query = Purchase.objects.filter(
-        date__year=year,
-        date__month=month
-    )
-    
-    expenses_query = Expense.objects.filter(
-        date__year=year,
-        date__month=month
-    )
-    
-    # 매출 계산
-    total_revenue = Decimal('0')
-    for order in orders_query:
-        total_revenue += order.total_order_amount
-    
-    # 매입 계산 (총 매입 금액 = amount × quantity)
-    total_purchase = Decimal('0')
-    for purchase in purchases_query:
-        total_purchase += purchase.total_amount
-    
-    # 지출 계산 (총 지출 금액 = amount × quantity)
-    total_expense = Decimal('0')
-    for expense in expenses_query:
-        total_expense += expense.total_amount
+    # 매출(발송 완료 주문)·매입·지출 합계 — 월별 재무 집계 조회 1번
+    totals, _months = _period_totals(year, month)
+    total_revenue = totals['total_revenue']
+    total_purchase = totals['total_purchase']
+    total_expense = totals['total_expense']
     
     # 스마트스토어 수수료 계산 (매출의 6%)
     smartstore_fee = Decimal('0')
     if include_smartstore_fee:
-        smartstore_fee = total_revenue * Decimal('0.06')
+        smartstore_fee = total_revenue * SMARTSTORE_FEE_RATE
     
     # 순이익 계산 = 매출 - 매입 - 지출 - 스마트스토어 수수료
     net_profit = total_revenue - total_purchase - total_expense - smartstore_fee
@@ -209,6 +176,177 @@ def net_profit_summary(request):
     return render(request, 'finance/net_profit_summary.html', context)
 
 
+def _chart_values(series):
+    """차트용 리스트 — 원 단위 반올림, NaN은 None(JSON null → 선 끊김)."""
+    return series.round(0).astype(object).where(series.notna(), None).tolist()
+
+
+@login_required
+def trend_report(request):
+    """다년 재무 추이·예측 리포트 (월별 재무 집계 + pandas)"""
+    def int_param(name, default, low, high):
+        try:
+            return min(max(int(request.GET.get(name, default)), low), high)
+        except (TypeError, ValueError):
+            return default
+
+    years = int_param('years', 5, 2, 10)
+    horizon = int_param('horizon', 12, 1, 24)
+    include_smartstore_fee = request.GET.get('include_smartstore_fee', 'true') == 'true'
+
+    monthly, predicted, yearly = trends.trend_report(years, horizon, include_smartstore_fee)
+
+    labels = [str(p) for p in monthly.index]
+    forecast_labels = [str(p) for p in predicted.index]
+    chart_data = {
+        'labels': labels + [label for label in forecast_labels if label not in labels],
+        'forecast_labels': forecast_labels,
+        'revenue': _chart_values(monthly['revenue']),
+        'profit': _chart_values(monthly['profit']),
+        'revenue_ma12': _chart_values(monthly['revenue_ma12']),
+        'profit_ma12': _chart_values(monthly['profit_ma12']),
+        'revenue_forecast': _chart_values(predicted['revenue']),
+        'profit_forecast': _chart_values(predicted['profit']),
+        'revenue_yoy': _chart_values(monthly['revenue_yoy']),
+        'profit_yoy': _chart_values(monthly['profit_yoy']),
+    }
+
+    # 표: 최근 24개월 (최신 먼저) + 연도별 합계
+    recent = monthly.iloc[::-1].iloc[:24].reset_index()
+    recent['period'] = recent['period'].astype(str)
+    yearly_rows = yearly.iloc[::-1].reset_index(names='year')
+
+    context = {
+        'years': years,
+        'horizon': horizon,
+        'include_smartstore_fee': include_smartstore_fee,
+        'chart_data': chart_data,
+        'recent_rows': recent.astype(object).where(recent.notna(), None).to_dict('records'),
+        'yearly_rows': yearly_rows.astype(object).where(yearly_rows.notna(), None).to_dict('records'),
+        'forecast_rows': [
+            {'period': label, 'revenue': revenue, 'profit': profit}
+            for label, revenue, profit in zip(
+                forecast_labels, predicted['revenue'].tolist(), predicted['profit'].tolist()
+            )
+        ],
+        'forecast_total': predicted.sum().to_dict(),
+    }
+    return render(request, 'finance/trend_report.html', context)
+
+
+def _number_list(raw, default):
+    """'0.8, 1, 1.2' / [0.8, 1, 1.2] → float 리스트 (비었으면 default). 형식 오류 시 ValueError."""
+    import math
+
+    if raw in (None, ''):
+        return list(default)
+    items = raw.split(',') if isinstance(raw, str) else list(raw)
+    values = [float(item) for item in items if str(item).strip()]
+    if not all(math.isfinite(v) for v in values):
+        raise ValueError('숫자가 아닌 값이 있습니다')
+    return values or list(default)
+
+
+def _simulation_input(params, year):
+    """시뮬레이터 입력 — 기준 금액(미지정 시 해당 연도 재무 요약 집계) + 스윕 목록."""
+    totals, _months = _period_totals(year)
+    base = {
+        'revenue': float(params.get('revenue') or totals['total_revenue']),
+        'purchase': float(params.get('purchase') or totals['total_purchase']),
+        'expense': float(params.get('expense') or totals['total_expense']),
+    }
+    vat_modes = params.get('vat_modes') or ['exclusive']
+    if isinstance(vat_modes, str):
+        vat_modes = [mode.strip() for mode in vat_modes.split(',') if mode.strip()]
+    sweep = {
+        'revenue_multipliers': _number_list(params.get('revenue_multipliers'), [1.0]),
+        'expense_multipliers': _number_list(params.get('expense_multipliers'), [1.0]),
+        'fee_rates': _number_list(params.get('fee_rates'), [float(SMARTSTORE_FEE_RATE)]),
+        'vat_modes': vat_modes,
+    }
+    return base, sweep
+
+
+@login_required
+def tax_simulator(request):
+    """세금 시나리오 시뮬레이터 (what-if) — 매출·지출 배수 × 수수료율 × 부가세 처리 조합 비교"""
+    from datetime import datetime
+
+    try:
+        year = int(request.GET.get('year', datetime.now().year))
+    except ValueError:
+        year = datetime.now().year
+    params = {
+        'revenue': request.GET.get('revenue', ''),
+        'purchase': request.GET.get('purchase', ''),
+        'expense': request.GET.get('expense', ''),
+        'revenue_multipliers': request.GET.get('revenue_multipliers', '0.8, 0.9, 1, 1.1, 1.2'),
+        'expense_multipliers': request.GET.get('expense_multipliers', '0.8, 1, 1.2'),
+        'fee_rates': request.GET.get('fee_rates', '0, 0.03, 0.06'),
+        'vat_modes': request.GET.getlist('vat_modes') or ['exclusive', 'none'],
+    }
+
+    context = {
+        'year': year,
+        'params': params,
+        'vat_mode_choices': tax.VAT_MODES,
+        'max_scenarios': tax.MAX_SCENARIOS,
+    }
+    try:
+        base, sweep = _simulation_input(params, year)
+        result = tax.simulate(**base, **sweep)
+    except ValueError as e:
+        messages.error(request, f'시뮬레이션 입력 오류: {e}')
+        return render(request, 'finance/tax_simulator.html', context)
+
+    # 세후 실수령액 높은 순 상위 200개만 표로 (전체 수·최고/최저는 요약에)
+    order = result['net_income'].argsort()[::-1]
+    columns = list(result)
+    rows = [
+        dict(zip(columns, values))
+        for values in zip(*(result[column][order[:200]].tolist() for column in columns))
+    ]
+    context.update({
+        'base': base,
+        'scenario_count': len(order),
+        'rows': rows,
+        'best': rows[0],
+        'worst': dict(zip(columns, (result[column][order[-1]].item() for column in columns))),
+    })
+    return render(request, 'finance/tax_simulator.html', context)
+
+
+@login_required
+@require_POST
+def tax_simulate_api(request):
+    """[API] 세금 시나리오 일괄 계산 (POST JSON, 로그인 세션).
+
+    body: {"year": 2025, "revenue": 120000000, "purchase": ..., "expense": ...,   (금액 생략 시 연도 집계)
+           "revenue_multipliers": [0.8, 1, 1.2], "expense_multipliers": [1, 1.5],
+           "fee_rates": [0, 0.06], "vat_modes": ["exclusive", "none"]}
+    응답: {"count": N, "base": {...}, "columns": [...], "scenarios": {열: [값...]}} — 열 단위 배열
+    """
+    import json
+    from datetime import datetime
+    from django.http import JsonResponse
+
+    try:
+        data = json.loads(request.body or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError('JSON 객체가 필요합니다')
+        base, sweep = _simulation_input(data, int(data.get('year') or datetime.now().year))
+        result = tax.simulate(**base, **sweep)
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'count': len(result['income_tax']),
+        'base': base,
+        'columns': list(result),
+        'scenarios': {column: values.tolist() for column, values in result.items()},
+    })
+
+
 class ExpenseListView(LoginRequiredMixin, ListView):
     """지출 목록"""
     model = Expense
@@ -0,0 +1,395 @@
+"""ktalk 통합 작업 큐 — 카톡창 열기·주소 추출·발송결과 통보.
+
+저장소는 기존 요청 모델 3개 그대로 (운영자 화면 상태 폴링 무변경). 이 모듈이 세 모델을
+하나의 큐처럼 묶는다:
+- lease_tasks: 종류 우선순위(카톡창 열기 → 주소 추출 → 발송 통보) + 생성순으로 최대 N건을
+  PENDING → PROCESSING(leased_until까지)으로 한 번에 전환. skip_locked라 데몬 여러 개여도 중복 없음
+- lease 길이는 종류별(KIND_LEASE_SECONDS). extend로 연장 못 하는 기존 poll 어댑터는
+  작업이 끝날 만큼 긴 LEGACY_LEASE_SECONDS
+- 만료된 lease는 lease 호출 때(RECLAIM_INTERVAL_SECONDS에 1번) PENDING으로 회수, 시도 한도 초과면 FAILED.
+  다시 실행하면 중복 발송되는 종류(NON_IDEMPOTENT_KINDS)는 회수 없이 바로 FAILED
+- report_results: 결과 여러 건을 한 번에 보고. lease 토큰(attempts)이 다르면 stale로 거부
+  (회수 후 다른 워커가 다시 가져간 작업에 늦은 결과가 덮어쓰지 않게)
+
+task_id = '<kind>:<pk>'. 기존 종류별 poll/result 엔드포인트는 이 모듈의 얇은 어댑터.
+
+long-poll(alease_tasks): 작업이 없으면 최대 wait초 연결 유지. 같은 프로세스의 작업 적재는
+task_broker 알림으로 즉시 깨우고(orders/signals.py), 다른 프로세스 적재·lease 만료는
+POLL_RECHECK_SECONDS마다 exists 1회로 재확인.
+"""
+import json
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from popbill_api.events import EventBroker
+
+from .models import AddressExtractionRequest, KakaoOpenRequest, ShipNotifyRequest, Status
+
+# 종류별 기본 lease 길이 (요청에 lease_seconds가 없을 때)
+KIND_LEASE_SECONDS = {
+    'kakao_open': 60,
+    'address': 180,         # 대화 읽기 + LLM 추출
+    'ship_notify': 300,     # 사진 여러 장 발송 — 더 걸리면 extend로 연장
+}
+# 기존 종류별 poll 어댑터 — 결과 보고만 있고 extend가 없어 한 번에 길게 잡음
+LEGACY_LEASE_SECONDS = {
+    'address': 600,
+    'ship_notify': 900,
+}
+MAX_LEASE_SECONDS = 900
+MAX_BATCH = 50
+POLL_MAX_WAIT = 30          # 프록시 유휴 타임아웃(60s)보다 짧게
+POLL_RECHECK_SECONDS = 5
+# 만료 lease 회수 주기 — lease 호출마다 종류별 UPDATE를 돌리지 않게 (lease 최소 60초라 회수가 이만큼 늦어도 무방)
+RECLAIM_INTERVAL_SECONDS = 30
+RECLAIM_GATE_KEY = 'ktalk:reclaim_gate'
+
+# 작업 적재 알림 (프로세스 내). long-poll 대기자를 즉시 깨움
+task_broker = EventBroker(history=100)
+
+# kind → (모델, 완료 상태, 최대 시도 횟수). 카톡창 열기는 운영자가 기다리는 동안만 의미 → 재시도 없음
+TASK_KINDS = {
+    'kakao_open': (KakaoOpenRequest, 'DONE', 1),
+    'address': (AddressExtractionRequest, 'COMPLETED', 3),
+    'ship_notify': (ShipNotifyRequest, 'COMPLETED', 3),
+}
+
+# lease가 만료돼도 실제로는 이미 보냈을 수 있는 종류 — 재대기하면 고객에게 두 번 발송.
+# 만료 시 FAILED로 두고 운영자가 확인 후 다시 요청 (워커가 error+retry로 보고한 경우만 재대기)
+NON_IDEMPOTENT_KINDS = {'ship_notify'}
+
+
+class TaskError(Exception):
+    """보고 거부 사유 (not_found, stale_lease 등)."""
+
+
+def parse_task_id(task_id):
+    kind, _, pk = str(task_id or '').partition(':')
+    if kind not in TASK_KINDS or not pk.isdigit():
+        raise TaskError('invalid_task_id')
+    return kind, int(pk)
+
+
+def _has_updated_at(model):
+    return any(f.name == 'updated_at' for f in model._meta.concrete_fields)
+
+
+def lease_seconds_for(kind, lease_seconds=None):
+    """lease 길이(초) — 생략하면 종류별 기본값, 10초 ~ MAX_LEASE_SECONDS로 제한."""
+    if lease_seconds is None:
+        lease_seconds = KIND_LEASE_SECONDS[kind]
+    return max(10, min(MAX_LEASE_SECONDS, int(lease_seconds)))
+
+
+def reclaim_expired(now=None):
+    """lease 만료된 PROCESSING 작업 회수. 반환: {'requeued': n, 'failed': n}.
+
+    leased_until이 비어 있는 PROCESSING(lease 도입 전 어댑터가 잡은 작업)은 만료 시점을
+    알 수 없으므로 건드리지 않는다 — 발송 중일 수 있는 작업을 재대기시키지 않게.
+    """
+    now = now or timezone.now()
+    requeued = failed = 0
+    for kind, (model, _done, max_attempts) in TASK_KINDS.items():
+        expired = model.objects.filter(status='PROCESSING', leased_until__lt=now)
+        extra = {'updated_at': now} if _has_updated_at(model) else {}
+        failed_kwargs = {'status': 'FAILED', 'leased_until': None, **extra}
+        if kind in NON_IDEMPOTENT_KINDS:
+            if hasattr(model, 'error'):
+                failed_kwargs['error'] = 'lease 만료 — 발송 여부 불확실, 확인 후 다시 요청'
+            failed += expired.update(**failed_kwargs)
+            continue
+        if hasattr(model, 'error'):
+            failed_kwargs['error'] = 'lease 만료 — 재시도 한도 초과'
+        failed += expired.filter(attempts__gte=max_attempts).update(**failed_kwargs)
+        requeued += expired.filter(attempts__lt=max_attempts).update(
+            status='PENDING', leased_until=None, lease_owner='', **extra
+        )
+    return {'requeued': requeued, 'failed': failed}
+
+
+def _reclaim_due():
+    """회수할 차례인지 — cache.add 선점이라 RECLAIM_INTERVAL_SECONDS에 1번.
+
+    캐시가 프로세스별(locmem)이면 프로세스마다 주기당 1번.
+    """
+    return cache.add(RECLAIM_GATE_KEY, 1, RECLAIM_INTERVAL_SECONDS)
+
+
+def notify_task(kind):
+    """작업 적재(PENDING 생성·재대기) 알림 — 커밋 후 long-poll 대기자 깨움."""
+    transaction.on_commit(lambda: task_broker.publish(kind, {}))
+
+
+def _has_work(kinds, now=None):
+    """lease할 작업(PENDING 또는 만료된 PROCESSING)이 있는지 — 재확인용 가벼운 exists."""
+    now = now or timezone.now()
+    ready = Q(status='PENDING') | Q(status='PROCESSING', leased_until__lt=now)
+    return any(TASK_KINDS[kind][0].objects.filter(ready).exists() for kind in kinds)
+
+
+def _payload(kind, obj):
+    """종류별 작업 본문 — 기존 poll 응답 필드 그대로."""
+    if kind == 'kakao_open':
+        return {'request_id': obj.id, 'customer_id': obj.customer_id}
+    if kind == 'address':
+        return {
+            'request_id': obj.id,
+            'order_id': obj.order_id,
+            'customer_name': obj.order.customer_name,
+            'kakao_chat_name': obj.kakao_chat_name,
+            'limit': 20,
+            'auto_apply': True,
+            'evidence_required': True,
+        }
+    return {
+        'request_id': obj.id,
+        'kakao_chat_name': obj.kakao_chat_name,
+        'tracking_number': obj.tracking_number,
+        'photo_urls': json.loads(obj.photo_urls_json or '[]'),
+    }
+
+
+def lease_tasks(max_tasks=10, kinds=None, lease_seconds=None, owner=''):
+    """PENDING 작업 최대 max_tasks건 lease. 반환: [{'task_id', 'kind', 'lease', 'leased_until', 'payload'}].
+
+    lease_seconds 생략 시 종류별 KIND_LEASE_SECONDS.
+    """
+    max_tasks = max(1, min(MAX_BATCH, int(max_tasks)))
+    kinds = [k for k in TASK_KINDS if not kinds or k in kinds]
+
+    now = timezone.now()
+    if _reclaim_due():
+        reclaim_expired(now)
+
+    tasks = []
+    for kind in kinds:
+        remaining = max_tasks - len(tasks)
+        if remaining <= 0:
+            break
+        model = TASK_KINDS[kind][0]
+        until = now + timedelta(seconds=lease_seconds_for(kind, lease_seconds))
+        with transaction.atomic():
+            qs = (
+                model.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .filter(status='PENDING')
+                .order_by('created_at', 'pk')
+            )
+            if kind == 'address':
+                qs = qs.select_related('order')
+            rows = list(qs[:remaining])
+            if not rows:
+                continue
+            extra = {'updated_at': now} if _has_updated_at(model) else {}
+            model.objects.filter(pk__in=[r.pk for r in rows]).update(
+                status='PROCESSING', leased_until=until, lease_owner=owner[:64],
+                attempts=F('attempts') + 1, **extra
+            )
+        for row in rows:
+            tasks.append({
+                'task_id': f'{kind}:{row.pk}',
+                'kind': kind,
+                'lease': row.attempts + 1,
+                'leased_until': until.isoformat(),
+                'payload': _payload(kind, row),
+            })
+    return tasks
+
+
+async def alease_tasks(max_tasks=10, kinds=None, wait=0, lease_seconds=None, owner=''):
+    """lease_tasks의 long-poll 버전 (async 뷰용 — 대기 중 워커 스레드 점유 없음).
+
+    작업이 없으면 최대 wait초(POLL_MAX_WAIT 상한) 대기. 적재 알림에 깨거나
+    POLL_RECHECK_SECONDS마다 재확인해 작업이 보이면 lease. 끝까지 없으면 [].
+    """
+    kinds = [k for k in TASK_KINDS if not kinds or k in kinds]
+    deadline = time.monotonic() + max(0.0, min(POLL_MAX_WAIT, float(wait or 0)))
+    lease = sync_to_async(lease_tasks)
+
+    seq = task_broker.last_seq
+    tasks = await lease(max_tasks, kinds, lease_seconds=lease_seconds, owner=owner)
+    while not tasks:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        woke = await task_broker.wait(seq, min(remaining, POLL_RECHECK_SECONDS))
+        seq = task_broker.last_seq
+        if woke or await sync_to_async(_has_work)(kinds):
+            tasks = await lease(max_tasks, kinds, lease_seconds=lease_seconds, owner=owner)
+    return tasks
+
+
+# ─── 완료 처리 (종류별) ───
+
+def _address_result_to_shipping_fields(result):
+    """address_extraction_result payload → Order 배송 필드 후보.
+
+    normalized_address.road_address가 있으면 우선하고, 없으면 LLM 원본 road/detail을 조합한다.
+    """
+    ex = (result or {}).get('extracted') or {}
+    norm = (result or {}).get('normalized_address') or {}
+    if norm.get('road_address'):
+        address = str(norm.get('road_address') or '').strip()
+        detail = str(ex.get('address_detail_part') or '').strip()
+        if detail:
+            address = f'{address} {detail}'.strip()
+    else:
+        address = f"{ex.get('address_road_part') or ''} {ex.get('address_detail_part') or ''}".strip()
+    return {
+        'shipping_address': address,
+        'customer_phone': str(ex.get('phone') or '').strip(),
+        'deposit_name': str(ex.get('deposit_name') or '').strip(),
+    }
+
+
+def _is_high_confidence_address_result(result):
+    """완전자동 등록 허용선. 애매하면 자동 DB 반영하지 않고 근거만 남긴다."""
+    if not (result or {}).get('matched'):
+        return False, 'matched=false'
+    fields = _address_result_to_shipping_fields(result)
+    if not fields['shipping_address']:
+        return False, '배송 주소 후보 없음'
+    ex = (result or {}).get('extracted') or {}
+    conf = ex.get('confidence') or {}
+    if conf.get('address') != 'high':
+        return False, '주소 확실도 high 아님'
+    if fields['customer_phone'] and conf.get('phone') not in ('high', None, ''):
+        return False, '연락처 확실도 high 아님'
+    return True, ''
+
+
+def _complete_kakao_open(req, data):
+    req.status = 'FAILED' if data.get('error') else 'DONE'
+    req.leased_until = None
+    req.save(update_fields=['status', 'leased_until'])
+    return {}
+
+
+def _complete_address(req, data):
+    auto_applied = False
+    auto_apply_reason = ''
+    applied_fields = {}
+
+    if data.get('error'):
+        req.status = 'FAILED'
+        req.error = str(data['error'])[:2000]
+    else:
+        result = data.get('result') or {}
+        should_apply, auto_apply_reason = _is_high_confidence_address_result(result)
+        if should_apply:
+            applied_fields = _address_result_to_shipping_fields(result)
+            order = req.order
+            order.shipping_address = applied_fields['shipping_address']
+            order.customer_phone = applied_fields['customer_phone']
+            order.deposit_name = applied_fields['deposit_name']
+            order.save(update_fields=[
+                'shipping_address', 'customer_phone', 'deposit_name', 'updated_at'
+            ])
+            auto_applied = True
+            auto_apply_reason = 'high confidence 자동 등록 완료'
+
+        result['auto_apply'] = {
+            'attempted': True,
+            'applied': auto_applied,
+            'reason': auto_apply_reason,
+            'fields': applied_fields,
+        }
+        req.status = 'COMPLETED'
+        req.result_json = json.dumps(result, ensure_ascii=False)
+        req.error = ''
+    req.leased_until = None
+    req.save(update_fields=['status', 'result_json', 'error', 'leased_until', 'updated_at'])
+    return {'auto_applied': auto_applied, 'auto_apply_reason': auto_apply_reason}
+
+
+def _complete_ship_notify(req, data):
+    req.leased_until = None
+    if data.get('error'):
+        req.status = 'FAILED'
+        req.error = str(data['error'])[:2000]
+        req.save(update_fields=['status', 'error', 'leased_until', 'updated_at'])
+        return {}
+    req.status = 'COMPLETED'
+    req.save(update_fields=['status', 'leased_until', 'updated_at'])
+    # 통보 성공 → 정산목록으로 자동 이동
+    order = req.order
+    if order.status == Status.SETTLED:
+        order.status = Status.ARCHIVED
+        order.save(update_fields=['status', 'updated_at'])
+    return {}
+
+
+_COMPLETE = {
+    'kakao_open': _complete_kakao_open,
+    'address': _complete_address,
+    'ship_notify': _complete_ship_notify,
+}
+
+
+def complete_task(kind, pk, data, lease=None, lease_seconds=None):
+    """작업 1건 결과 반영. 반환: 종류별 추가 응답 dict. 거부 시 TaskError.
+
+    data: {'result': {...}} 성공 / {'error': str} 실패 / + 'retry': true면 실패 대신 PENDING 재대기
+          (시도 한도 내) / {'extend': true} lease 연장만 (긴 발송 작업 heartbeat)
+    lease: lease_tasks가 준 토큰. 주면 PROCESSING + 토큰 일치일 때만 반영.
+           생략(기존 종류별 result 엔드포인트)이면 예전처럼 상태 무관 반영.
+    """
+    model, _done, max_attempts = TASK_KINDS[kind]
+    with transaction.atomic():
+        req = model.objects.select_for_update().filter(pk=pk).first()
+        if req is None:
+            raise TaskError('not_found')
+        if lease is not None and (req.status != 'PROCESSING' or req.attempts != int(lease)):
+            raise TaskError('stale_lease')
+
+        if data.get('extend'):
+            if req.status != 'PROCESSING':
+                raise TaskError('not_leased')
+            req.leased_until = timezone.now() + timedelta(seconds=lease_seconds_for(kind, lease_seconds))
+            req.save(update_fields=['leased_until'])
+            return {'leased_until': req.leased_until.isoformat()}
+
+        if data.get('error') and data.get('retry') and req.attempts < max_attempts:
+            req.status = 'PENDING'
+            req.leased_until = None
+            req.lease_owner = ''
+            req.save(update_fields=['status', 'leased_until', 'lease_owner'])
+            notify_task(kind)
+            return {'requeued': True}
+
+        return _COMPLETE[kind](req, data)
+
+
+def report_results(entries, lease_seconds=None):
+    """결과 일괄 보고. entries: [{'task_id', 'lease', 'result'|'error'|'extend', 'retry'?}].
+
+    건별 독립 처리 — 한 건 거부·오류가 나머지에 영향 없음. 반환은 요청 순서 그대로.
+    """
+    results = []
+    for entry in entries:
+        entry = entry if isinstance(entry, dict) else {}
+        task_id = entry.get('task_id')
+        try:
+            kind, pk = parse_task_id(task_id)
+            extra = complete_task(kind, pk, entry, lease=entry.get('lease'), lease_seconds=lease_seconds)
+            results.append({'task_id': task_id, 'ok': True, **extra})
+        except Exception as exc:
+            results.append({'task_id': task_id, 'ok': False, 'error': str(exc)})
+    return results
+
+
+def queue_stats():
+    """종류별 PENDING/PROCESSING 건수 (데몬 상태 표시·모니터링용)."""
+    stats = {}
+    for kind, (model, _done, _max) in TASK_KINDS.items():
+        stats[kind] = {
+            'pending': model.objects.filter(status='PENDING').count(),
+            'processing': model.objects.filter(status='PROCESSING').count(),
+        }
+    return stats
@@ -0,0 +1,55 @@
+"""보존기간 지난 ktalk 요청 정리 — 압축 JSONL로 보관 후 청크 단위 삭제.
+
+대상: address / ship_notify / kakao_open 중 처리 끝난(완료·실패) 요청 가운데 --days보다
+오래된 행 (result_json·photo_urls_json 포함 행 전체). PENDING·PROCESSING은 건드리지 않음.
+입금 원본 응답 정리는 manage.py compact_deposit_payloads (popbill_api).
+
+아카이브·청크 처리: utils/retention.py. RETENTION_ARCHIVE_DIR(영구 저장소) 지정 필수.
+
+cron 예: 매일 04:00  python manage.py compact_ktalk_history
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.ktalk_queue import TASK_KINDS
+from utils.retention import add_retention_arguments, archive_and_apply, archive_dir
+
+
+class Command(BaseCommand):
+    help = '처리 끝난 ktalk 요청 보존기간 정리 (압축 JSONL 보관 후 청크 삭제)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90,
+                            help='ktalk 요청 보존 일수 (기본값: 90)')
+        parser.add_argument('--only', nargs='+', choices=list(TASK_KINDS), default=list(TASK_KINDS),
+                            help=f'대상 제한 (기본값: 전부 — {", ".join(TASK_KINDS)})')
+        add_retention_arguments(parser)
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('보존 일수는 1 이상이어야 합니다')
+        chunk_size = max(1, options['chunk_size'])
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        directory = None if options['dry_run'] else archive_dir(options)
+
+        for kind, (model, done_status, _max_attempts) in TASK_KINDS.items():
+            if kind not in options['only']:
+                continue
+            qs = model.objects.filter(status__in=[done_status, 'FAILED'], created_at__lt=cutoff)
+
+            if options['dry_run']:
+                self.stdout.write(f'{kind}: {qs.count()}건 (기준 {cutoff:%Y-%m-%d})')
+                continue
+
+            path = directory / f'{kind}-{stamp}.jsonl.gz'
+            archived = archive_and_apply(
+                qs, [f.attname for f in model._meta.concrete_fields],
+                lambda chunk: chunk.delete()[0], path, chunk_size, options['sleep'],
+            )
+            if archived:
+                self.stdout.write(self.style.SUCCESS(f'{kind}: {archived}건 정리 → {path}'))
+            else:
+                self.stdout.write(f'{kind}: 정리 대상 없음')
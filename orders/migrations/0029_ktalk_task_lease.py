@@ -0,0 +1,63 @@
+# Generated by Django 4.2.25 on 2026-10-19 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0028_order_kakao_customer_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='addressextractionrequest',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='addressextractionrequest',
+            name='lease_owner',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='lease 워커'),
+        ),
+        migrations.AddField(
+            model_name='addressextractionrequest',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='lease 만료시각'),
+        ),
+        migrations.AddField(
+            model_name='kakaoopenrequest',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='kakaoopenrequest',
+            name='lease_owner',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='lease 워커'),
+        ),
+        migrations.AddField(
+            model_name='kakaoopenrequest',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='lease 만료시각'),
+        ),
+        migrations.AddField(
+            model_name='shipnotifyrequest',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='shipnotifyrequest',
+            name='lease_owner',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='lease 워커'),
+        ),
+        migrations.AddField(
+            model_name='shipnotifyrequest',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='lease 만료시각'),
+        ),
+        migrations.AlterField(
+            model_name='kakaoopenrequest',
+            name='status',
+            field=models.CharField(default='PENDING', help_text='PENDING → PROCESSING(lease) → DONE/FAILED', max_length=20, verbose_name='처리 상태'),
+        ),
+    ]
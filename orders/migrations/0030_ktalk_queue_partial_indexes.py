@@ -0,0 +1,41 @@
+# Generated by Django 4.2.25 on 2026-10-19 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0029_ktalk_task_lease'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='addressextractionrequest',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at', 'id'], name='addrreq_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='addressextractionrequest',
+            index=models.Index(condition=models.Q(('status', 'PROCESSING')), fields=['leased_until'], name='addrreq_leased_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kakaoopenrequest',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at', 'id'], name='openreq_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kakaoopenrequest',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['customer_id'], name='openreq_pending_cust_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kakaoopenrequest',
+            index=models.Index(condition=models.Q(('status', 'PROCESSING')), fields=['leased_until'], name='openreq_leased_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipnotifyrequest',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at', 'id'], name='shipreq_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipnotifyrequest',
+            index=models.Index(condition=models.Q(('status', 'PROCESSING')), fields=['leased_until'], name='shipreq_leased_idx'),
+        ),
+    ]
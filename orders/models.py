@@ -397,7 +397,22 @@ class OrderThumbnail(models.Model):
         return None
 
 
-class AddressExtractionRequest(models.Model):
+class KtalkTaskLease(models.Model):
+    """ktalk 작업 큐 lease 필드 (orders/ktalk_queue.py).
+
+    PROCESSING 동안 leased_until까지 lease_owner가 점유. 만료되면 다음 lease 호출 때
+    PENDING으로 회수(시도 한도 초과 시 FAILED, 발송 통보는 중복 발송 방지로 바로 FAILED).
+    attempts는 lease 토큰 겸용.
+    """
+    leased_until = models.DateTimeField(null=True, blank=True, verbose_name="lease 만료시각")
+    lease_owner = models.CharField(max_length=64, blank=True, default='', verbose_name="lease 워커")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="시도 횟수")
+
+    class Meta:
+        abstract = True
+
+
+class AddressExtractionRequest(KtalkTaskLease):
     """카톡 대화에서 주소·연락처·입금자명 자동 추출 요청 큐.
 
     ERP(서버) ↔ ktalk 데몬(운영자 PC) 폴링 브릿지.
@@ -444,12 +459,20 @@ class AddressExtractionRequest(models.Model):
         verbose_name = "주소 추출 요청"
         verbose_name_plural = "주소 추출 요청"
         ordering = ['-created_at']
+        # ktalk 큐 조회(PENDING 생성순, 만료 lease 회수)는 부분 인덱스로 — 완료 이력이
+        # 쌓여도 대기·처리중 행만 읽음. 오래된 완료 행은 manage.py compact_ktalk_history로 정리
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(status='PENDING'),
+                         name='addrreq_pending_idx'),
+            models.Index(fields=['leased_until'], condition=models.Q(status='PROCESSING'),
+                         name='addrreq_leased_idx'),
+        ]
 
     def __str__(self):
         return f"{self.order_id} - {self.kakao_chat_name} - {self.status}"
 
 
-class ShipNotifyRequest(models.Model):
+class ShipNotifyRequest(KtalkTaskLease):
     """발송결과(송장번호+완료사진) 고객 카톡 통보 요청 큐.
 
     ERP(서버) ↔ ktalk 데몬(운영자 PC) 폴링 브릿지.
@@ -501,6 +524,12 @@ class ShipNotifyRequest(models.Model):
         verbose_name = "발송결과 통보 요청"
         verbose_name_plural = "발송결과 통보 요청"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(status='PENDING'),
+                         name='shipreq_pending_idx'),
+            models.Index(fields=['leased_until'], condition=models.Q(status='PROCESSING'),
+                         name='shipreq_leased_idx'),
+        ]
 
     def __str__(self):
         return f"{self.order_id} - {self.kakao_chat_name} - {self.status}"
@@ -609,14 +638,14 @@ class KakaoConsultCard(models.Model):
         return f"{self.display_name} ({self.get_state_display()})"
 
 
-class KakaoOpenRequest(models.Model):
+class KakaoOpenRequest(KtalkTaskLease):
     """카톡창 열기 요청 큐 (단계 1a-2 ②). 칸반 카드 클릭 → ktalk이 폴링해 open_chat_by_id 실행.
     방향: 운영자 클릭(ERP) → ktalk poll → 카톡창 열림 (~5초).
     """
     customer_id = models.CharField(max_length=64, verbose_name="카톡 고유 ID")
     status = models.CharField(
         max_length=20, default='PENDING',
-        verbose_name="처리 상태", help_text="PENDING → DONE"
+        verbose_name="처리 상태", help_text="PENDING → PROCESSING(lease) → DONE/FAILED"
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="요청일시")
 
@@ -624,6 +653,15 @@ class KakaoOpenRequest(models.Model):
         verbose_name = "카톡창 열기 요청"
         verbose_name_plural = "카톡창 열기 요청"
         ordering = ['created_at']
+        # kakao_open_status(고객별 PENDING 여부)도 PENDING 부분 인덱스 사용
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(status='PENDING'),
+                         name='openreq_pending_idx'),
+            models.Index(fields=['customer_id'], condition=models.Q(status='PENDING'),
+                         name='openreq_pending_cust_idx'),
+            models.Index(fields=['leased_until'], condition=models.Q(status='PROCESSING'),
+                         name='openreq_leased_idx'),
+        ]
 
     def __str__(self):
         return f"open {self.customer_id} ({self.status})"
\ No newline at end of file
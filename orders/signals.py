@@ -0,0 +1,20 @@
+"""orders 시그널 — ktalk 작업 적재 알림 (ktalk_queue long-poll 즉시 깨우기)."""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .ktalk_queue import notify_task
+from .models import AddressExtractionRequest, KakaoOpenRequest, ShipNotifyRequest
+
+_TASK_MODEL_KINDS = {
+    KakaoOpenRequest: 'kakao_open',
+    AddressExtractionRequest: 'address',
+    ShipNotifyRequest: 'ship_notify',
+}
+
+
+@receiver(post_save, sender=KakaoOpenRequest)
+@receiver(post_save, sender=AddressExtractionRequest)
+@receiver(post_save, sender=ShipNotifyRequest)
+def _ktalk_task_created(sender, instance, created, **kwargs):
+    if created and instance.status == 'PENDING':
+        notify_task(_TASK_MODEL_KINDS[sender])
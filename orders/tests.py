@@ -1,3 +1,227 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import ktalk_queue
+from .ktalk_queue import TaskError, complete_task, lease_tasks, reclaim_expired
+from .models import AddressExtractionRequest, Order, ShipNotifyRequest, Status
+
+
+class KtalkQueueTests(TestCase):
+    """ktalk 작업 큐 lease → 회수 → 완료 흐름 (orders/ktalk_queue.py)."""
+
+    def setUp(self):
+        cache.delete(ktalk_queue.RECLAIM_GATE_KEY)
+        self.order = Order.objects.create(
+            smartstore_order_id='SS-KTALK-1',
+            status=Status.SETTLED,
+            payment_date=timezone.now(),
+            customer_name='홍길동',
+            total_order_amount=Decimal('0'),
+        )
+
+    def make_address(self, **kwargs):
+        return AddressExtractionRequest.objects.create(
+            order=self.order, kakao_chat_name='홍길동', **kwargs
+        )
+
+    def make_ship_notify(self, **kwargs):
+        return ShipNotifyRequest.objects.create(
+            order=self.order, kakao_chat_name='홍길동', tracking_number='1234', **kwargs
+        )
+
+    def expire(self, req):
+        type(req).objects.filter(pk=req.pk).update(leased_until=timezone.now() - timedelta(seconds=1))
+
+    def assertLeasedFor(self, task, seconds):
+        remaining = (datetime.fromisoformat(task['leased_until']) - timezone.now()).total_seconds()
+        self.assertAlmostEqual(remaining, seconds, delta=5)
+
+    def test_lease_uses_per_kind_length(self):
+        address = self.make_address()
+        ship = self.make_ship_notify()
+        tasks = {task['kind']: task for task in lease_tasks(10, owner='w1')}
+
+        self.assertEqual(tasks['address']['task_id'], f'address:{address.pk}')
+        self.assertEqual(tasks['address']['lease'], 1)
+        self.assertLeasedFor(tasks['address'], ktalk_queue.KIND_LEASE_SECONDS['address'])
+        self.assertLeasedFor(tasks['ship_notify'], ktalk_queue.KIND_LEASE_SECONDS['ship_notify'])
+        ship.refresh_from_db()
+        self.assertEqual((ship.status, ship.lease_owner, ship.attempts), ('PROCESSING', 'w1', 1))
+        # 이미 lease된 작업은 다시 나가지 않음
+        self.assertEqual(lease_tasks(10), [])
+
+    def test_legacy_adapter_lease_is_long(self):
+        self.make_ship_notify()
+        seconds = ktalk_queue.LEGACY_LEASE_SECONDS['ship_notify']
+        [task] = lease_tasks(1, kinds=['ship_notify'], lease_seconds=seconds, owner='ship_notify_poll')
+        self.assertLeasedFor(task, seconds)
+
+    def test_reclaim_requeues_address_until_max_attempts(self):
+        req = self.make_address()
+        for attempt in range(1, 4):
+            [task] = lease_tasks(1, kinds=['address'])
+            self.assertEqual(task['lease'], attempt)
+            self.expire(req)
+            result = reclaim_expired()
+            req.refresh_from_db()
+            if attempt < 3:
+                self.assertEqual(result, {'requeued': 1, 'failed': 0})
+                self.assertEqual(req.status, 'PENDING')
+        self.assertEqual(result, {'requeued': 0, 'failed': 1})
+        self.assertEqual(req.status, 'FAILED')
+
+    def test_reclaim_fails_expired_ship_notify_without_requeue(self):
+        req = self.make_ship_notify()
+        lease_tasks(1, kinds=['ship_notify'])
+        self.expire(req)
+
+        self.assertEqual(reclaim_expired(), {'requeued': 0, 'failed': 1})
+        req.refresh_from_db()
+        self.assertEqual(req.status, 'FAILED')
+        self.assertIsNone(req.leased_until)
+        self.assertEqual(lease_tasks(10), [])
+
+    def test_lease_reclaims_at_most_once_per_interval(self):
+        req = self.make_address()
+        lease_tasks(1, kinds=['address'])   # 이 호출이 회수 주기를 선점
+        self.expire(req)
+
+        self.assertEqual(lease_tasks(1, kinds=['address']), [])   # 주기 안 → 회수 안 함
+        req.refresh_from_db()
+        self.assertEqual(req.status, 'PROCESSING')
+
+        cache.delete(ktalk_queue.RECLAIM_GATE_KEY)   # 주기 경과
+        [task] = lease_tasks(1, kinds=['address'])
+        self.assertEqual((task['task_id'], task['lease']), (f'address:{req.pk}', 2))
+
+    def test_reclaim_leaves_processing_without_lease_alone(self):
+        address = self.make_address(status='PROCESSING')
+        ship = self.make_ship_notify(status='PROCESSING')
+
+        self.assertEqual(reclaim_expired(), {'requeued': 0, 'failed': 0})
+        self.assertEqual(lease_tasks(10), [])
+        address.refresh_from_db()
+        ship.refresh_from_db()
+        self.assertEqual((address.status, ship.status), ('PROCESSING', 'PROCESSING'))
+
+    def test_complete_ship_notify_archives_order(self):
+        req = self.make_ship_notify()
+        [task] = lease_tasks(1, kinds=['ship_notify'])
+
+        complete_task('ship_notify', req.pk, {'result': {}}, lease=task['lease'])
+        req.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(req.status, 'COMPLETED')
+        self.assertEqual(self.order.status, Status.ARCHIVED)
+
+    def test_complete_rejects_stale_lease(self):
+        req = self.make_address()
+        lease_tasks(1, kinds=['address'])
+        self.expire(req)
+        reclaim_expired()
+        [task] = lease_tasks(1, kinds=['address'])
+        self.assertEqual(task['lease'], 2)
+
+        with self.assertRaisesMessage(TaskError, 'stale_lease'):
+            complete_task('address', req.pk, {'error': '늦은 결과'}, lease=1)
+        req.refresh_from_db()
+        self.assertEqual(req.status, 'PROCESSING')
+
+    def test_extend_and_retry(self):
+        req = self.make_ship_notify()
+        [task] = lease_tasks(1, kinds=['ship_notify'], lease_seconds=30)
+
+        extended = complete_task('ship_notify', req.pk, {'extend': True}, lease=task['lease'])
+        self.assertLeasedFor(extended, ktalk_queue.KIND_LEASE_SECONDS['ship_notify'])
+
+        # 워커가 보내기 전 실패를 보고하고 retry 요청 → 재대기
+        self.assertEqual(
+            complete_task('ship_notify', req.pk, {'error': '방 못 찾음', 'retry': True}, lease=task['lease']),
+            {'requeued': True},
+        )
+        req.refresh_from_db()
+        self.assertEqual(req.status, 'PENDING')
+
+
+class LegacyResultAdapterTests(TestCase):
+    """기존 종류별 result 엔드포인트 — request_id 검증 후 complete_task."""
+
+    def setUp(self):
+        order = Order.objects.create(
+            smartstore_order_id='SS-KTALK-3',
+            status=Status.SETTLED,
+            payment_date=timezone.now(),
+            customer_name='홍길동',
+            total_order_amount=Decimal('0'),
+        )
+        self.req = ShipNotifyRequest.objects.create(order=order, kakao_chat_name='홍길동', tracking_number='1234')
+        patcher = mock.patch.dict(os.environ, {'KTALK_API_KEY': 'test-ktalk-key'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, name, body):
+        return self.client.post(reverse(name), body if isinstance(body, str) else json.dumps(body),
+                                content_type='application/json', HTTP_X_KTALK_KEY='test-ktalk-key')
+
+    def test_invalid_request_id_is_400(self):
+        for name in ('address_extraction_result', 'ship_notify_result'):
+            for body in ({}, {'request_id': 'abc'}, {'request_id': None}, {'request_id': -1},
+                         {'request_id': True}, {'request_id': 1.5}, [1], '{broken'):
+                response = self.post(name, body)
+                self.assertEqual(response.status_code, 400, (name, body))
+                self.assertFalse(response.json()['success'])
+
+    def test_valid_request_id(self):
+        req = self.req
+        self.assertEqual(self.post('ship_notify_result', {'request_id': str(req.pk)}).status_code, 200)
+        req.refresh_from_db()
+        self.assertEqual(req.status, 'COMPLETED')
+        self.assertEqual(self.post('ship_notify_result', {'request_id': req.pk + 100}).status_code, 404)
+
+
+class CompactKtalkHistoryTests(TestCase):
+    """manage.py compact_ktalk_history — 영구 아카이브 경로 없으면 삭제하지 않음."""
+
+    def setUp(self):
+        order = Order.objects.create(
+            smartstore_order_id='SS-KTALK-2',
+            payment_date=timezone.now(),
+            customer_name='홍길동',
+            total_order_amount=Decimal('0'),
+        )
+        self.done = ShipNotifyRequest.objects.create(
+            order=order, kakao_chat_name='홍길동', tracking_number='1234', status='COMPLETED',
+        )
+        self.pending = ShipNotifyRequest.objects.create(
+            order=order, kakao_chat_name='홍길동', tracking_number='5678',
+        )
+        ShipNotifyRequest.objects.update(created_at=timezone.now() - timedelta(days=120))
+
+    @override_settings(RETENTION_ARCHIVE_DIR='')
+    def test_refuses_without_archive_dir(self):
+        with self.assertRaises(CommandError):
+            call_command('compact_ktalk_history', stdout=StringIO())
+        self.assertEqual(ShipNotifyRequest.objects.count(), 2)
+
+    def test_archives_then_deletes_finished_requests(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(RETENTION_ARCHIVE_DIR=directory):
+                call_command('compact_ktalk_history', only=['ship_notify'], stdout=StringIO())
+            [archive] = Path(directory).glob('ship_notify-*.jsonl.gz')
+            with gzip.open(archive, 'rt', encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual([row['id'] for row in rows], [self.done.pk])
+        self.assertEqual(list(ShipNotifyRequest.objects.values_list('pk', flat=True)), [self.pending.pk])
@@ -35,5 +35,8 @@ urlpatterns = [
     path('<int:pk>/ship-notify/status/<int:request_id>/', views.ship_notify_status, name='ship_notify_status'),
     path('ktalk/ship-notify/poll/', views.ship_notify_poll, name='ship_notify_poll'),
     path('ktalk/ship-notify/result/', views.ship_notify_result, name='ship_notify_result'),
+    path('ktalk/tasks/lease/', views.ktalk_tasks_lease, name='ktalk_tasks_lease'),
+    path('ktalk/tasks/report/', views.ktalk_tasks_report, name='ktalk_tasks_report'),
+    path('ktalk/status/', views.ktalk_status_batch, name='ktalk_status_batch'),
     path('<int:pk>/kanban-update/', views.update_order_kanban_status, name='update_order_kanban_status'),
 ]
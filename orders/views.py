@@ -439,8 +439,20 @@ def export_shipping_excel(request):
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, sheet_name='발송목록', index=False)
     
-    # 주문 상태를 COMPLETED로 변경
+    # 주문 상태를 COMPLETED로 변경 (update는 시그널 없음 → 칸반 캐시 무효화·SSE·월별 재무 집계 직접)
+    from finance import rollup
+    completed_ids = [order.pk for order in orders]
+    rollup_keys = [
+        rollup.order_key(status, order.payment_date)
+        for order in orders for status in (order.status, Status.COMPLETED)
+    ]
     orders.update(status=Status.COMPLETED)
+    from popbill_api.events import publish
+    from popbill_api.kanban import bump_kanban_version_on_commit
+    bump_kanban_version_on_commit()
+    rollup.mark_dirty(rollup_keys)
+    for order_id in completed_ids:
+        publish('order', {'id': order_id, 'status': Status.COMPLETED})
     
     # 응답 생성
     response = HttpResponse(
@@ -1187,10 +1199,23 @@ def get_completion_info(request, pk):
     return JsonResponse(data)
 
 
+def _list_totals(orders, year, month, status, customer_name):
+    """결과통보/정산 목록 통계 (건수·매출·원가).
+
+    이름 검색이 없으면 월별 재무 집계 조회 1번, 있으면 집계표로 못 거르므로 SQL 집계.
+    """
+    from finance import rollup
+
+    if customer_name:
+        totals = rollup.order_totals(orders)
+        return totals['count'], totals['revenue'], totals['cost']
+    total, _months = rollup.summary(year, month, statuses=(status,))
+    return total['order_count'], total['revenue'], total['cost']
+
+
 @login_required
 def settlement_list(request):
     """결과통보 목록"""
-    from django.db.models import Sum
     from datetime import datetime
     
     # 월 필터는 유지하되, 결과통보(SETTLED) 상태만 표시
@@ -1220,10 +1245,10 @@ def settlement_list(request):
     if customer_name:
         orders = orders.filter(customer_name__icontains=customer_name)
     
-    # 통계 계산
-    total_revenue = orders.aggregate(Sum('total_order_amount'))['total_order_amount__sum'] or 0
-    # total_cost 계산 시 이미 prefetch된 데이터 사용
-    total_cost = sum(order.total_cost for order in orders)
+    # 통계 계산 — 월별 재무 집계 (이름 검색 시 SQL 집계)
+    order_count, total_revenue, total_cost = _list_totals(
+        orders, year, month, Status.SETTLED, customer_name
+    )
     total_profit = total_revenue - total_cost
     
     # 월 목록 생성 (최근 12개월)
@@ -1246,7 +1271,7 @@ def settlement_list(request):
         'total_revenue': total_revenue,
         'total_cost': total_cost,
         'total_profit': total_profit,
-        'order_count': orders.count(),
+        'order_count': order_count,
         'page_title': '결과통보 목록',
         'customer_name': customer_name,
     })
@@ -1255,7 +1280,6 @@ def settlement_list(request):
 @login_required
 def accounting_list(request):
     """정산 목록"""
-    from django.db.models import Sum
 
     month_param = request.GET.get('month')
     customer_name = (request.GET.get('customer_name') or '').strip()
@@ -1277,8 +1301,9 @@ def accounting_list(request):
     if customer_name:
         orders = orders.filter(customer_name__icontains=customer_name)
 
-    total_revenue = orders.aggregate(Sum('total_order_amount'))['total_order_amount__sum'] or 0
-    total_cost = sum(order.total_cost for order in orders)
+    order_count, total_revenue, total_cost = _list_totals(
+        orders, year, month, Status.ARCHIVED, customer_name
+    )
     total_profit = total_revenue - total_cost
 
     from dateutil.relativedelta import relativedelta
@@ -1300,7 +1325,7 @@ def accounting_list(request):
         'total_revenue': total_revenue,
         'total_cost': total_cost,
         'total_profit': total_profit,
-        'order_count': orders.count(),
+        'order_count': order_count,
         'page_title': '정산 목록',
         'customer_name': customer_name,
     })
@@ -1325,8 +1350,9 @@ def move_to_accounting(request, pk):
 @login_required
 def sales_status(request):
     """매출 현황 - 결제 이후 상태 주문 매출 집계 (월별)"""
-    from django.db.models import Sum, Q
+    from django.db.models import Q
     from dateutil.relativedelta import relativedelta
+    from finance import rollup
     
     # 월 파라미터 받기 (기본값: 현재 월)
     month_param = request.GET.get('month')
@@ -1353,17 +1379,16 @@ def sales_status(request):
         payment_date__month=month
     ).prefetch_related('items__product_option__product').order_by('-payment_date')
     
-    # 통계 계산 (이미 prefetch된 데이터 사용)
-    total_revenue = orders.aggregate(Sum('total_order_amount'))['total_order_amount__sum'] or 0
-    total_cost = sum(order.total_cost for order in orders)
+    # 통계·상태별 주문 수 — 월별 재무 집계 조회 1번 (원본 주문 재합산 없음)
+    total, _months = rollup.summary(year, month, statuses=rollup.REVENUE_STATUSES)
+    total_revenue = total['revenue']
+    total_cost = total['cost']
     total_profit = total_revenue - total_cost
-    
-    # 상태별 주문 수
-    status_counts = {}
-    for status_value, status_label in Status.choices:
-        if status_value in ['CONSULTING', 'PRODUCED', 'COMPLETED', 'SETTLED', 'ARCHIVED']:
-            count = orders.filter(status=status_value).count()
-            status_counts[status_label] = count
+    status_counts = {
+        status_label: total['status_counts'].get(status_value, 0)
+        for status_value, status_label in Status.choices
+        if status_value in rollup.REVENUE_STATUSES
+    }
     
     # 월 목록 생성 (최근 12개월)
     months = []
@@ -1384,7 +1409,7 @@ def sales_status(request):
         'total_revenue': total_revenue,
         'total_cost': total_cost,
         'total_profit': total_profit,
-        'order_count': orders.count(),
+        'order_count': total['order_count'],
         'status_counts': status_counts,
     })
 
@@ -1564,41 +1589,25 @@ def _check_ktalk_api_key(request):
     return bool(provided) and any(provided == key for key in expected_keys if key)
 
 
-def _address_result_to_shipping_fields(result):
-    """address_extraction_result payload → Order 배송 필드 후보.
+def _long_poll_wait(request, value):
+    """long-poll 대기 초. 없거나 잘못된 값이면 0 = 즉시 응답.
 
-    normalized_address.road_address가 있으면 우선하고, 없으면 LLM 원본 road/detail을 조합한다.
+    ASGI로 띄웠을 때만 대기 — WSGI(동기 워커)에선 async 뷰도 요청마다 워커 1개를
+    붙잡으므로 대기 시간만큼 다른 요청을 못 받음. 그래서 0으로 잘라 즉시 응답.
     """
-    ex = (result or {}).get('extracted') or {}
-    norm = (result or {}).get('normalized_address') or {}
-    if norm.get('road_address'):
-        address = str(norm.get('road_address') or '').strip()
-        detail = str(ex.get('address_detail_part') or '').strip()
-        if detail:
-            address = f'{address} {detail}'.strip()
-    else:
-        address = f"{ex.get('address_road_part') or ''} {ex.get('address_detail_part') or ''}".strip()
-    return {
-        'shipping_address': address,
-        'customer_phone': str(ex.get('phone') or '').strip(),
-        'deposit_name': str(ex.get('deposit_name') or '').strip(),
-    }
+    from django.core.handlers.asgi import ASGIRequest
+
+    if not isinstance(request, ASGIRequest):
+        return 0.0
+    try:
+        return max(0.0, float(value or 0))
+    except (TypeError, ValueError):
+        return 0.0
 
 
-def _is_high_confidence_address_result(result):
-    """완전자동 등록 허용선. 애매하면 자동 DB 반영하지 않고 근거만 남긴다."""
-    if not (result or {}).get('matched'):
-        return False, 'matched=false'
-    fields = _address_result_to_shipping_fields(result)
-    if not fields['shipping_address']:
-        return False, '배송 주소 후보 없음'
-    ex = (result or {}).get('extracted') or {}
-    conf = ex.get('confidence') or {}
-    if conf.get('address') != 'high':
-        return False, '주소 확실도 high 아님'
-    if fields['customer_phone'] and conf.get('phone') not in ('high', None, ''):
-        return False, '연락처 확실도 high 아님'
-    return True, ''
+def _poll_wait(request):
+    """poll 엔드포인트 ?wait=<초> (long-poll, _long_poll_wait)."""
+    return _long_poll_wait(request, request.GET.get('wait'))
 
 
 @csrf_exempt
@@ -1609,8 +1618,13 @@ def kakao_kanban_sync(request):
     body: {"customers": [{"customer_id", "display_name",
                           "state"(WAITING|CONSULTING), "last_message_at"}]}
     데몬이 cutoff 이후 활동 고객을 판정해 보냄. ERP는 upsert만.
+
+    쿼리 수는 고객 수와 무관하게 고정: 기존 카드 IN 조회 1회 + 바뀐/새 카드
+    bulk_create(update_conflicts) 1회 + 주문 kakao_customer_id bulk_update 1회.
+    응답: synced(유효 고객 수), created/updated/unchanged(카드), orders_linked(주문)
     """
     import json
+    from django.db import transaction
     from django.http import JsonResponse
     from .models import KakaoConsultCard
 
@@ -1621,13 +1635,19 @@ def kakao_kanban_sync(request):
         data = json.loads(request.body)
         customers = data.get('customers', [])
         # 주문 매칭용 — 활성 주문의 kakao_chat_name(property) → Order
-        active_orders = Order.objects.exclude(status__in=['ARCHIVED', 'CANCELED'])
+        active_orders = (
+            Order.objects
+            .exclude(status__in=['ARCHIVED', 'CANCELED'])
+            .only('id', 'customer_name', 'kakao_customer_id')
+        )
         name_to_order = {}
         for o in active_orders:
             n = o.kakao_chat_name
             if n:
                 name_to_order.setdefault(n, o)
-        synced = 0
+
+        # 같은 customer_id 중복 push면 마지막 값 (예전 순차 upsert와 같은 결과)
+        incoming = {}
         for c in customers:
             cid = (c.get('customer_id') or '').strip()
             if not cid:
@@ -1637,22 +1657,62 @@ def kakao_kanban_sync(request):
             if state not in (KakaoConsultCard.State.WAITING, KakaoConsultCard.State.CONSULTING):
                 state = KakaoConsultCard.State.WAITING
             unread = int(c.get('unread', 0) or 0)
+            incoming[cid] = (name, state, unread)
 
-            KakaoConsultCard.objects.update_or_create(
-                customer_id=cid,
-                defaults={
-                    'display_name': name,
-                    'state': state,
-                    'unread_count': unread,
-                },
+        existing = {
+            card.customer_id: (card.display_name, card.state, card.unread_count)
+            for card in KakaoConsultCard.objects.filter(customer_id__in=list(incoming)).only(
+                'customer_id', 'display_name', 'state', 'unread_count'
             )
+        }
+        created = updated = unchanged = 0
+        to_write = []
+        linked = {}   # order pk → Order (kakao_customer_id 바뀐 것만)
+        for cid, (name, state, unread) in incoming.items():
+            if existing.get(cid) == (name, state, unread):
+                unchanged += 1
+            else:
+                if cid in existing:
+                    updated += 1
+                else:
+                    created += 1
+                to_write.append(KakaoConsultCard(
+                    customer_id=cid, display_name=name, state=state, unread_count=unread,
+                ))
             # 주문 매칭 → kakao_customer_id 저장 (주문 카드 클릭 시 카톡창)
             matched = name_to_order.get(name)
             if matched and matched.kakao_customer_id != cid:
                 matched.kakao_customer_id = cid
-                matched.save(update_fields=['kakao_customer_id'])
-            synced += 1
-        return JsonResponse({'success': True, 'synced': synced})
+                linked[matched.pk] = matched
+
+        with transaction.atomic():
+            if to_write:
+                KakaoConsultCard.objects.bulk_create(
+                    to_write,
+                    update_conflicts=True,
+                    unique_fields=['customer_id'],
+                    update_fields=['display_name', 'state', 'unread_count', 'updated_at'],
+                )
+            if linked:
+                Order.objects.bulk_update(list(linked.values()), ['kakao_customer_id'])
+
+        # bulk 쓰기는 시그널을 안 타므로 칸반 캐시 무효화·SSE 직접
+        if to_write or linked:
+            from popbill_api.events import publish
+            from popbill_api.kanban import bump_kanban_version_on_commit
+            bump_kanban_version_on_commit()
+            for card in to_write:
+                publish('kakao_card', {'customer_id': card.customer_id, 'state': card.state})
+
+        synced = len(incoming)
+        return JsonResponse({
+            'success': True,
+            'synced': synced,
+            'created': created,
+            'updated': updated,
+            'unchanged': unchanged,
+            'orders_linked': len(linked),
+        })
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
@@ -1678,22 +1738,32 @@ def kakao_open_request(request):
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
-@csrf_exempt
-@require_http_methods(["GET"])
-def kakao_open_poll(request):
-    """[ktalk] 카톡창 열기 요청 1건 가져가기 (PENDING → DONE)."""
-    from django.http import JsonResponse
-    from .models import KakaoOpenRequest
+async def kakao_open_poll(request):
+    """[ktalk] 카톡창 열기 요청 1건 가져가기 — ktalk_queue 어댑터.
 
+    ?wait=<초>: 요청 없으면 최대 그만큼 연결 유지, 운영자 클릭 즉시 응답 (long-poll).
+    기존 데몬은 결과를 보고하지 않으므로 lease 직후 바로 DONE 처리 (예전 동작 그대로).
+    async 뷰 — Django 4.2 require_http_methods는 동기 뷰 전용이라 메서드 직접 확인.
+    """
+    from asgiref.sync import sync_to_async
+    from django.http import HttpResponseNotAllowed, JsonResponse
+    from . import ktalk_queue
+
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
     if not _check_ktalk_api_key(request):
         return JsonResponse({'success': False, 'error': '인증 실패'}, status=401)
 
-    req = KakaoOpenRequest.objects.filter(status='PENDING').order_by('created_at').first()
-    if not req:
+    tasks = await ktalk_queue.alease_tasks(
+        1, kinds=['kakao_open'], wait=_poll_wait(request), owner='kakao_open_poll',
+    )
+    if not tasks:
         return JsonResponse({'has_task': False})
-    req.status = 'DONE'
-    req.save(update_fields=['status'])
-    return JsonResponse({'has_task': True, 'customer_id': req.customer_id})
+    task = tasks[0]
+    await sync_to_async(ktalk_queue.report_results)(
+        [{'task_id': task['task_id'], 'lease': task['lease'], 'result': {}}]
+    )
+    return JsonResponse({'has_task': True, 'customer_id': task['payload']['customer_id']})
 
 
 @login_required
@@ -1717,6 +1787,73 @@ def kakao_open_status(request):
     return JsonResponse({'success': True, 'pending': pending})
 
 
+@login_required
+@require_http_methods(["GET"])
+def ktalk_status_batch(request):
+    """[프론트 폴링] 진행 중인 ktalk 요청 상태 일괄 조회 — 종류당 쿼리 1회.
+
+    ?items=address:<request_id>,ship_notify:<request_id>,kakao_open:<customer_id>
+    응답: {"success": true, "statuses": {"address:12": {"status", "result"|"error"},
+                                         "ship_notify:3": {"status", "error"},
+                                         "kakao_open:<cid>": {"pending"}}}
+    없는 항목은 {"status": "NOT_FOUND"}. 본문 해시 ETag — If-None-Match 일치 시 304
+    (변화 없는 틱은 본문 없이 끝남).
+    """
+    import hashlib
+    import json
+    from django.http import HttpResponseNotModified, JsonResponse
+    from django.utils.http import parse_etags, quote_etag
+    from .models import AddressExtractionRequest, KakaoOpenRequest, ShipNotifyRequest
+
+    keys = [k.strip() for k in (request.GET.get('items') or '').split(',') if k.strip()][:100]
+    wanted = {'address': set(), 'ship_notify': set(), 'kakao_open': set()}
+    for key in keys:
+        kind, _, ident = key.partition(':')
+        if kind in ('address', 'ship_notify') and ident.isdigit():
+            wanted[kind].add(int(ident))
+        elif kind == 'kakao_open' and ident:
+            wanted[kind].add(ident)
+
+    statuses = {key: {'status': 'NOT_FOUND'} for key in keys}
+    if wanted['address']:
+        rows = AddressExtractionRequest.objects.filter(pk__in=wanted['address']).values_list(
+            'pk', 'status', 'result_json', 'error'
+        )
+        for pk, status, result_json, error in rows:
+            entry = {'status': status}
+            if status == 'COMPLETED':
+                entry['result'] = json.loads(result_json or '{}')
+            elif status == 'FAILED':
+                entry['error'] = error or '처리 실패'
+            statuses[f'address:{pk}'] = entry
+    if wanted['ship_notify']:
+        rows = ShipNotifyRequest.objects.filter(pk__in=wanted['ship_notify']).values_list(
+            'pk', 'status', 'error'
+        )
+        for pk, status, error in rows:
+            entry = {'status': status}
+            if status == 'FAILED':
+                entry['error'] = error or '통보 실패'
+            statuses[f'ship_notify:{pk}'] = entry
+    if wanted['kakao_open']:
+        pending = set(
+            KakaoOpenRequest.objects
+            .filter(customer_id__in=wanted['kakao_open'], status='PENDING')
+            .values_list('customer_id', flat=True)
+        )
+        for cid in wanted['kakao_open']:
+            statuses[f'kakao_open:{cid}'] = {'pending': cid in pending}
+
+    response = JsonResponse({'success': True, 'statuses': statuses})
+    etag = quote_etag(hashlib.md5(response.content).hexdigest())
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if if_none_match and etag in parse_etags(if_none_match):
+        response = HttpResponseNotModified()
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'   # 브라우저가 매 틱 If-None-Match로 재검증
+    return response
+
+
 @login_required
 @require_POST
 def kakao_card_dismiss(request):
@@ -1738,6 +1875,11 @@ def kakao_card_dismiss(request):
         updated = KakaoConsultCard.objects.filter(
             customer_id=cid, dismissed_at__isnull=True
         ).update(dismissed_at=timezone.now())
+        if updated:
+            from popbill_api.events import publish
+            from popbill_api.kanban import bump_kanban_version_on_commit
+            bump_kanban_version_on_commit()
+            publish('kakao_card', {'customer_id': cid, 'dismissed': True})
         return JsonResponse({'success': True, 'dismissed': updated})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
@@ -1801,101 +1943,68 @@ def address_auto_register_status(request, pk, request_id):
         return JsonResponse({'success': False, 'error': str(e)})
 
 
-@csrf_exempt
-@require_http_methods(["GET"])
-def address_extraction_poll(request):
-    """[ktalk] PENDING 요청 1건을 PROCESSING으로 전환해서 가져감 (API key 인증)."""
-    from django.http import JsonResponse
-    from django.db import transaction
-    from .models import AddressExtractionRequest
+async def address_extraction_poll(request):
+    """[ktalk] PENDING 요청 1건을 PROCESSING으로 전환해서 가져감 (API key 인증) — ktalk_queue 어댑터.
 
+    ?wait=<초>: 요청 없으면 최대 그만큼 대기 (long-poll, async 뷰).
+    """
+    from django.http import HttpResponseNotAllowed, JsonResponse
+    from . import ktalk_queue
+
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
     if not _check_ktalk_api_key(request):
         return JsonResponse({'error': 'unauthorized'}, status=401)
 
     try:
-        with transaction.atomic():
-            req = (
-                AddressExtractionRequest.objects
-                .select_for_update(skip_locked=True)
-                .filter(status='PENDING')
-                .order_by('created_at')
-                .first()
-            )
-            if not req:
-                return JsonResponse({'has_task': False})
-            req.status = 'PROCESSING'
-            req.save(update_fields=['status', 'updated_at'])
-
-        return JsonResponse({
-            'has_task': True,
-            'request_id': req.id,
-            'order_id': req.order_id,
-            'customer_name': req.order.customer_name,
-            'kakao_chat_name': req.kakao_chat_name,
-            'limit': 20,
-            'auto_apply': True,
-            'evidence_required': True,
-        })
+        tasks = await ktalk_queue.alease_tasks(
+            1, kinds=['address'], wait=_poll_wait(request), owner='address_extraction_poll',
+            lease_seconds=ktalk_queue.LEGACY_LEASE_SECONDS['address'],
+        )
+        if not tasks:
+            return JsonResponse({'has_task': False})
+        return JsonResponse({'has_task': True, **tasks[0]['payload']})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _legacy_request_id(data):
+    """기존 종류별 result 엔드포인트 body의 request_id → 양의 정수. 형식 오류면 None (400 응답)."""
+    value = data.get('request_id') if isinstance(data, dict) else None
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        return None
+    return value
+
+
 @csrf_exempt
 @require_POST
 def address_extraction_result(request):
-    """[ktalk] 추출 결과 제출 → COMPLETED/FAILED 전환 (API key 인증).
+    """[ktalk] 추출 결과 제출 → COMPLETED/FAILED 전환 (API key 인증) — ktalk_queue 어댑터.
 
     body: {"request_id": int, "result": {...}}  또는  {"request_id": int, "error": str}
     """
     import json
     from django.http import JsonResponse
-    from .models import AddressExtractionRequest
+    from . import ktalk_queue
 
     if not _check_ktalk_api_key(request):
         return JsonResponse({'error': 'unauthorized'}, status=401)
 
     try:
         data = json.loads(request.body)
-        request_id = data.get('request_id')
-        req = get_object_or_404(AddressExtractionRequest, pk=request_id)
-
-        auto_applied = False
-        auto_apply_reason = ''
-        applied_fields = {}
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'JSON 형식 오류'}, status=400)
+    request_id = _legacy_request_id(data)
+    if request_id is None:
+        return JsonResponse({'success': False, 'error': 'request_id는 양의 정수여야 함'}, status=400)
 
-        if data.get('error'):
-            req.status = 'FAILED'
-            req.error = str(data['error'])[:2000]
-        else:
-            result = data.get('result') or {}
-            should_apply, auto_apply_reason = _is_high_confidence_address_result(result)
-            if should_apply:
-                applied_fields = _address_result_to_shipping_fields(result)
-                order = req.order
-                order.shipping_address = applied_fields['shipping_address']
-                order.customer_phone = applied_fields['customer_phone']
-                order.deposit_name = applied_fields['deposit_name']
-                order.save(update_fields=[
-                    'shipping_address', 'customer_phone', 'deposit_name', 'updated_at'
-                ])
-                auto_applied = True
-                auto_apply_reason = 'high confidence 자동 등록 완료'
-
-            result['auto_apply'] = {
-                'attempted': True,
-                'applied': auto_applied,
-                'reason': auto_apply_reason,
-                'fields': applied_fields,
-            }
-            req.status = 'COMPLETED'
-            req.result_json = json.dumps(result, ensure_ascii=False)
-            req.error = ''
-        req.save(update_fields=['status', 'result_json', 'error', 'updated_at'])
-        return JsonResponse({
-            'success': True,
-            'auto_applied': auto_applied,
-            'auto_apply_reason': auto_apply_reason,
-        })
+    try:
+        extra = ktalk_queue.complete_task('address', request_id, data)
+        return JsonResponse({'success': True, **extra})
+    except ktalk_queue.TaskError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=404)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -1984,39 +2093,27 @@ def ship_notify_status(request, pk, request_id):
         return JsonResponse({'success': False, 'error': str(e)})
 
 
-@csrf_exempt
-@require_http_methods(["GET"])
-def ship_notify_poll(request):
-    """[ktalk] PENDING 통보 1건을 PROCESSING으로 전환해 가져감 (API key 인증)."""
-    import json
-    from django.http import JsonResponse
-    from django.db import transaction
-    from .models import ShipNotifyRequest
+async def ship_notify_poll(request):
+    """[ktalk] PENDING 통보 1건을 PROCESSING으로 전환해 가져감 (API key 인증) — ktalk_queue 어댑터.
+
+    ?wait=<초>: 요청 없으면 최대 그만큼 대기 (long-poll, async 뷰).
+    """
+    from django.http import HttpResponseNotAllowed, JsonResponse
+    from . import ktalk_queue
 
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
     if not _check_ktalk_api_key(request):
         return JsonResponse({'error': 'unauthorized'}, status=401)
 
     try:
-        with transaction.atomic():
-            req = (
-                ShipNotifyRequest.objects
-                .select_for_update(skip_locked=True)
-                .filter(status='PENDING')
-                .order_by('created_at')
-                .first()
-            )
-            if not req:
-                return JsonResponse({'has_task': False})
-            req.status = 'PROCESSING'
-            req.save(update_fields=['status', 'updated_at'])
-
-        return JsonResponse({
-            'has_task': True,
-            'request_id': req.id,
-            'kakao_chat_name': req.kakao_chat_name,
-            'tracking_number': req.tracking_number,
-            'photo_urls': json.loads(req.photo_urls_json or '[]'),
-        })
+        tasks = await ktalk_queue.alease_tasks(
+            1, kinds=['ship_notify'], wait=_poll_wait(request), owner='ship_notify_poll',
+            lease_seconds=ktalk_queue.LEGACY_LEASE_SECONDS['ship_notify'],
+        )
+        if not tasks:
+            return JsonResponse({'has_task': False})
+        return JsonResponse({'has_task': True, **tasks[0]['payload']})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -2024,35 +2121,105 @@ def ship_notify_poll(request):
 @csrf_exempt
 @require_POST
 def ship_notify_result(request):
-    """[ktalk] 통보 결과 제출 → COMPLETED/FAILED (API key 인증).
+    """[ktalk] 통보 결과 제출 → COMPLETED/FAILED (API key 인증) — ktalk_queue 어댑터.
 
     COMPLETED면 주문을 정산목록(ARCHIVED)으로 자동 이동.
     body: {"request_id": int}  또는  {"request_id": int, "error": str}
     """
     import json
     from django.http import JsonResponse
-    from .models import ShipNotifyRequest
+    from . import ktalk_queue
 
     if not _check_ktalk_api_key(request):
         return JsonResponse({'error': 'unauthorized'}, status=401)
 
     try:
         data = json.loads(request.body)
-        request_id = data.get('request_id')
-        req = get_object_or_404(ShipNotifyRequest, pk=request_id)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'JSON 형식 오류'}, status=400)
+    request_id = _legacy_request_id(data)
+    if request_id is None:
+        return JsonResponse({'success': False, 'error': 'request_id는 양의 정수여야 함'}, status=400)
 
-        if data.get('error'):
-            req.status = 'FAILED'
-            req.error = str(data['error'])[:2000]
-            req.save(update_fields=['status', 'error', 'updated_at'])
-        else:
-            req.status = 'COMPLETED'
-            req.save(update_fields=['status', 'updated_at'])
-            # 통보 성공 → 정산목록으로 자동 이동
-            order = req.order
-            if order.status == Status.SETTLED:
-                order.status = Status.ARCHIVED
-                order.save(update_fields=['status', 'updated_at'])
+    try:
+        ktalk_queue.complete_task('ship_notify', request_id, data)
         return JsonResponse({'success': True})
+    except ktalk_queue.TaskError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=404)
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+# ───────────────────────────────────────────────────────────────────────
+# ktalk 통합 작업 큐 — 여러 건 lease + 일괄 결과 보고 (orders/ktalk_queue.py)
+# ───────────────────────────────────────────────────────────────────────
+
+
+async def ktalk_tasks_lease(request):
+    """[ktalk] 작업 최대 N건 lease (API key 인증).
+
+    body: {"max": 10, "kinds": ["kakao_open", "address", "ship_notify"],
+           "lease_seconds": 300, "worker": "운영자PC-1", "wait": 25}   (모두 생략 가능)
+    lease_seconds 생략 시 종류별 기본 길이 (ktalk_queue.KIND_LEASE_SECONDS).
+    wait: 작업 없으면 최대 그만큼 대기 (long-poll, async 뷰 — ASGI일 때만, WSGI면 0).
+    응답: {"tasks": [{"task_id", "kind", "lease", "leased_until", "payload"}], "stats": {...}}
+    """
+    import json
+    from asgiref.sync import sync_to_async
+    from django.http import HttpResponseNotAllowed, JsonResponse
+    from . import ktalk_queue
+
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    if not _check_ktalk_api_key(request):
+        return JsonResponse({'error': 'unauthorized'}, status=401)
+
+    try:
+        data = json.loads(request.body or b'{}')
+        tasks = await ktalk_queue.alease_tasks(
+            data.get('max', 10),
+            kinds=data.get('kinds') or None,
+            wait=_long_poll_wait(request, data.get('wait')),
+            lease_seconds=data.get('lease_seconds'),
+            owner=str(data.get('worker') or ''),
+        )
+        stats = await sync_to_async(ktalk_queue.queue_stats)()
+        return JsonResponse({'tasks': tasks, 'stats': stats})
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+ktalk_tasks_lease.csrf_exempt = True   # 4.2 csrf_exempt 데코레이터는 async 뷰를 감싸지 못함
+
+
+@csrf_exempt
+@require_POST
+def ktalk_tasks_report(request):
+    """[ktalk] 결과 일괄 보고 (API key 인증).
+
+    body: {"results": [{"task_id": "address:12", "lease": 1, "result": {...}},
+                       {"task_id": "ship_notify:3", "lease": 2, "error": "...", "retry": true},
+                       {"task_id": "ship_notify:4", "lease": 1, "extend": true}],
+           "lease_seconds": 300}   (extend 길이, 생략 시 종류별 기본)
+    응답: {"results": [{"task_id", "ok", ...}]} — 요청 순서 그대로, 건별 독립 처리
+    """
+    import json
+    from django.http import JsonResponse
+    from . import ktalk_queue
+
+    if not _check_ktalk_api_key(request):
+        return JsonResponse({'error': 'unauthorized'}, status=401)
+
+    try:
+        data = json.loads(request.body)
+        entries = data.get('results') or []
+        if not isinstance(entries, list):
+            return JsonResponse({'error': 'results 배열 형식 오류'}, status=400)
+        results = ktalk_queue.report_results(
+            entries, lease_seconds=data.get('lease_seconds'),
+        )
+        return JsonResponse({'results': results})
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
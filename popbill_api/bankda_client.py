@@ -2,26 +2,150 @@
 
 인수인계 2026-05-15 §6 명세 + 통합 2026-05-25.
 호출 방향: Django (outbound) → 뱅크다 a.bankda.com.
+
+- 프로세스 단위 공유 requests.Session (keep-alive) — 매 호출 TLS 핸드셰이크 제거
+- 연결 오류·타임아웃·5xx만 지수 백오프 + jitter로 재시도 (4xx·JSON 오류는 즉시 실패)
+- transport(session) 주입 가능 — 로컬 가짜 뱅크다 서버/테스트/벤치마크용
 """
 import logging
+import random
+import threading
+import time
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 BANKDA_URL = 'https://a.bankda.com/dtsvc/bank_tr.php'
 
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5   # 초. n번째 재시도 대기 상한 = BACKOFF × 2^(n-1)
+MAX_BACKOFF = 8.0
+
+_session = None
+_session_lock = threading.Lock()
+
 
 class BankdaError(Exception):
     pass
 
 
-class BankdaClient:
+def _shared_session():
+    """프로세스 공유 Session. poll_bankda 데몬·웹 워커 모두 연결 재사용."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # 재시도는 BankdaClient가 직접 (POST + jitter + 메트릭) — 어댑터 재시도는 끔
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+class BankdaMetrics:
+    """호출 단위 지연/시도 횟수 누적. snapshot()으로 dict 반환 (로그·벤치 출력용)."""
+
     def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+        self.last_attempts = 0
+
+    def record(self, latency, attempts, ok):
+        self.calls += 1
+        self.attempts += attempts
+        self.retries += attempts - 1
+        if not ok:
+            self.failures += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.last_latency = latency
+        self.last_attempts = attempts
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'failures': self.failures,
+            'avg_latency_ms': round(self.total_latency / self.calls * 1000, 1) if self.calls else 0.0,
+            'max_latency_ms': round(self.max_latency * 1000, 1),
+            'last_latency_ms': round(self.last_latency * 1000, 1),
+            'last_attempts': self.last_attempts,
+        }
+
+
+class BankdaClient:
+    """
+    Args:
+        session: requests.Session 호환 객체 (post 메서드). 생략 시 프로세스 공유 Session.
+        url: 호출 URL. 생략 시 settings.BANKDA_URL (가짜 서버 지정용).
+        max_retries: 연결 오류·5xx 재시도 횟수 (첫 시도 제외).
+        backoff: 재시도 대기 기준 초. 실제 대기 = uniform(0, backoff × 2^(n-1)) (full jitter).
+        sleep: 대기 함수 주입 (테스트/벤치에서 무대기).
+    """
+
+    def __init__(self, session=None, url=None, timeout=DEFAULT_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF, sleep=time.sleep):
         self.access_token = settings.BANKDA_ACCESS_TOKEN
         self.account_num = settings.BANKDA_ACCOUNT_NUM
         self.is_test = settings.BANKDA_IS_TEST
+        self.url = url or getattr(settings, 'BANKDA_URL', '') or BANKDA_URL
+        self.session = session or _shared_session()
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.sleep = sleep
+        self.metrics = BankdaMetrics()
+
+    def _retry_delay(self, attempt):
+        cap = min(MAX_BACKOFF, self.backoff * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    def _post(self, headers, data):
+        """재시도 포함 POST. 최종 실패 시 BankdaError."""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.post(self.url, headers=headers, data=data, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error, retryable = exc, True
+            except requests.RequestException as exc:
+                error, retryable = exc, False
+            else:
+                if response.status_code < 500:
+                    try:
+                        response.raise_for_status()
+                    except requests.RequestException as exc:
+                        error, retryable = exc, False
+                    else:
+                        self.metrics.record(time.monotonic() - started, attempt, ok=True)
+                        return response
+                else:
+                    error, retryable = requests.HTTPError(
+                        f'{response.status_code} Server Error', response=response
+                    ), True
+
+            if not retryable or attempt > self.max_retries:
+                self.metrics.record(time.monotonic() - started, attempt, ok=False)
+                logger.error('bankda HTTP 실패 (시도 %d회): %s', attempt, error)
+                raise BankdaError(f'HTTP 호출 실패: {error}') from error
+
+            delay = self._retry_delay(attempt)
+            logger.warning('bankda HTTP 재시도 %d/%d (%.2fs 후): %s', attempt, self.max_retries, delay, error)
+            self.sleep(delay)
 
     def fetch_transactions(self, last_bcode=None, datefrom=None, dateto=None):
         if not self.access_token:
@@ -49,12 +173,7 @@ class BankdaClient:
             'Access-Token': self.access_token,
         }
 
-        try:
-            response = requests.post(BANKDA_URL, headers=headers, data=data, timeout=30)
-            response.raise_for_status()
-        except requests.RequestException as exc:
-            logger.error('bankda HTTP 실패: %s', exc)
-            raise BankdaError(f'HTTP 호출 실패: {exc}') from exc
+        response = self._post(headers, data)
 
         try:
             payload = response.json()
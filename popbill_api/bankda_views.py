@@ -8,19 +8,26 @@
 인증: Cloudflare-style IP 화이트리스트 (decorator).
 인증 미통과 시 401 (가이드 §401).
 """
+import hashlib
 import ipaddress
 import json
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
-from django.http import JsonResponse, HttpResponseNotAllowed
+from django.http import HttpResponse, JsonResponse, HttpResponseNotAllowed, HttpResponseNotModified
 from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from django.views.decorators.csrf import csrf_exempt
 
+from finance import rollup
 from orders.models import Order, Status
 from orders.views import _get_due_date_after_business_days
 
+from .events import publish
+from .kanban import bump_kanban_version_on_commit
+
 logger = logging.getLogger(__name__)
 
 # 가이드 §방화벽 (2026-05-25 화면 캡처)
@@ -32,6 +39,13 @@ BANKDA_ALLOWED_IPS = [
 # 우리 IBK 받는 계좌 (BANKDA_ACCOUNT_NUM 환경변수에서 가져오되 기본은 .env)
 DEFAULT_BANK_CODE_NAME = '기업은행'
 
+# 미확인주문리스트 응답 캐시 — 변경 카운터(버전)별 키. NEW 주문·입금 매칭 변경 시
+# signals.py가 버전을 올려 다음 호출에서 재생성. TTL은 QuerySet.update() 등 시그널을
+# 안 타는 변경·워커별 locmem 캐시 불일치의 안전망.
+UNCONFIRMED_VERSION_KEY = 'bankda:unconfirmed_orders:version'
+UNCONFIRMED_PAYLOAD_KEY = 'bankda:unconfirmed_orders:payload:{}'
+UNCONFIRMED_CACHE_TTL = 60
+
 
 def _client_ip(request):
     xff = request.META.get('HTTP_X_FORWARDED_FOR', '')
@@ -90,15 +104,21 @@ def _serialize_order(order):
     }
 
 
-@csrf_exempt
-def unconfirmed_orders_list(request):
-    """입금확인 전 주문건 리스트. 뱅크다가 GET으로 호출."""
-    if request.method not in ('GET', 'POST'):
-        return HttpResponseNotAllowed(['GET', 'POST'])
-    if not _ip_allowed(_client_ip(request)):
-        logger.warning('bankda IP 차단: %s', _client_ip(request))
-        return _unauthorized()
+def bump_unconfirmed_orders_version():
+    """미확인주문리스트 캐시 무효화 (버전 +1)."""
+    try:
+        cache.incr(UNCONFIRMED_VERSION_KEY)
+    except ValueError:
+        cache.set(UNCONFIRMED_VERSION_KEY, 1, None)
+
+
+def bump_unconfirmed_orders_version_on_commit():
+    """커밋 후 버전 +1. 커밋 전에 올리면 그 사이 요청이 옛 데이터로 새 버전 캐시를 채움."""
+    transaction.on_commit(bump_unconfirmed_orders_version)
+
 
+def _build_unconfirmed_orders_payload():
+    """미확인주문리스트 응답 본문(bytes) 생성 — 캐시 miss 때만 호출."""
     from .models import Deposit
 
     orders_qs = (
@@ -116,7 +136,42 @@ def unconfirmed_orders_list(request):
     # 미확인주문리스트: orders 키 외 메타 항목 없어야 (테스트 검증 결과)
     return _bankda_response({
         'orders': [_serialize_order(o) for o in orders_qs],
-    })
+    }).content
+
+
+@csrf_exempt
+def unconfirmed_orders_list(request):
+    """입금확인 전 주문건 리스트. 뱅크다가 GET으로 호출.
+
+    응답 본문은 변경 카운터 버전별로 캐시. ETag = 본문 해시 (워커 간 동일) —
+    If-None-Match 일치 시 304.
+    """
+    if request.method not in ('GET', 'POST'):
+        return HttpResponseNotAllowed(['GET', 'POST'])
+    if not _ip_allowed(_client_ip(request)):
+        logger.warning('bankda IP 차단: %s', _client_ip(request))
+        return _unauthorized()
+
+    version = cache.get_or_set(UNCONFIRMED_VERSION_KEY, 1, None)
+    cache_key = UNCONFIRMED_PAYLOAD_KEY.format(version)
+    cached = cache.get(cache_key)
+    if cached is None:
+        body = _build_unconfirmed_orders_payload()
+        cached = (quote_etag(hashlib.md5(body).hexdigest()), body)
+        cache.set(cache_key, cached, UNCONFIRMED_CACHE_TTL)
+    etag, body = cached
+
+    if request.method == 'GET':
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if if_none_match and etag in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+    # 본문은 _bankda_response가 만든 bytes 그대로 — 뱅크다 파서가 기대하는 형식 유지
+    response = HttpResponse(body, content_type='application/json; charset=utf-8')
+    response['ETag'] = etag
+    return response
 
 
 def _parse_json_body(request):
@@ -168,6 +223,9 @@ def payment_confirm(request):
     - Deposit 행에 Order 정보 채움 (입금자명·금액 등)
     - 운영자가 컨트롤 팝업에서 [되돌리기] 클릭하면 CONSULTING → NEW 복귀
     - 매칭 오류 케이스 (동명이인·외상 거래 충돌) 대응
+
+    뱅크다는 하루치 확인을 한 번에 보냄 → 건수와 무관하게 주문 조회·Deposit upsert·
+    상태 변경 각 1쿼리 (트랜잭션 1개).
     """
     if request.method not in ('POST', 'PUT'):
         return HttpResponseNotAllowed(['POST', 'PUT'])
@@ -185,44 +243,88 @@ def payment_confirm(request):
     if not isinstance(requests_list, list):
         return JsonResponse({'error': 'requests 배열 형식 오류'}, status=400)
 
-    orders_resp = []
+    # 1) 요청 정리 — 응답은 요청 순서 그대로. 같은 order_id 중복 시 마지막 entry를 원본으로 보관
+    parsed = []
+    entries_by_id = {}
     for entry in requests_list:
-        order_id = (entry or {}).get('order_id') or ''
-        order_id = order_id.strip()
-        if not order_id:
-            orders_resp.append({'order_id': order_id, 'description': 'invalid'})
-            continue
+        order_id = ((entry or {}).get('order_id') or '').strip()
+        parsed.append(order_id)
+        if order_id:
+            entries_by_id[order_id] = entry
 
-        try:
-            order = Order.objects.get(smartstore_order_id=order_id)
-        except Order.DoesNotExist:
-            orders_resp.append({'order_id': order_id, 'description': 'not_found'})
-            continue
+    found_ids = set()
+    if entries_by_id:
+        now = timezone.now()
+        # 마감일은 수동 결제(orders/views.py change_order_status)와 동일하게 영업일 5일 — 배치 1회 계산
+        due_date = _get_due_date_after_business_days(timezone.localdate(), 5)
 
         with transaction.atomic():
-            # Deposit 행에 Order 정보 활용해서 채움.
-            # confirmed_at=None — 컨트롤 팝업 "확인 대기"에 표시되어 운영자 검토 가능
-            Deposit.objects.update_or_create(
-                source=Deposit.Source.BANKDA,
-                transaction_id=f'bankda_confirm_{order_id}',
-                defaults={
-                    'transaction_date': timezone.now(),
-                    'depositor_name': f'(뱅크다) {order.customer_name}',
-                    'amount': order.total_order_amount,
-                    'matched_order': order,
-                    'match_status': Deposit.MatchStatus.AUTO_MATCHED,
-                    'raw_payload': entry,
-                },
+            # 2) 참조 주문 IN 쿼리 1회 + 일괄 잠금
+            orders = list(
+                Order.objects
+                .select_for_update()
+                .filter(smartstore_order_id__in=list(entries_by_id))
+                .order_by('pk')
             )
+            found_ids = {o.smartstore_order_id for o in orders}
 
-            # Order.status NEW → CONSULTING 자동 이동
-            # 마감일은 수동 결제(orders/views.py:337)와 동일하게 영업일 5일로 설정
-            if order.status == Status.NEW:
-                order.status = Status.CONSULTING
-                order.due_date = _get_due_date_after_business_days(timezone.localdate(), 5)
-                order.save(update_fields=['status', 'due_date'])
+            # 3) Deposit 일괄 upsert (transaction_id unique 충돌 시 갱신).
+            # confirmed_at=None — 컨트롤 팝업 "확인 대기"에 표시되어 운영자 검토 가능
+            if orders:
+                Deposit.objects.bulk_create(
+                    [
+                        Deposit(
+                            source=Deposit.Source.BANKDA,
+                            transaction_id=f'bankda_confirm_{o.smartstore_order_id}',
+                            transaction_date=now,
+                            depositor_name=f'(뱅크다) {o.customer_name}',
+                            amount=o.total_order_amount,
+                            matched_order=o,
+                            match_status=Deposit.MatchStatus.AUTO_MATCHED,
+                            raw_payload=entries_by_id[o.smartstore_order_id],
+                        )
+                        for o in orders
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['transaction_id'],
+                    update_fields=[
+                        'source', 'transaction_date', 'depositor_name', 'amount',
+                        'matched_order', 'match_status', 'raw_payload',
+                    ],
+                )
+
+                # 4) Order.status NEW → CONSULTING 자동 이동 (update 1회)
+                Order.objects.filter(
+                    pk__in=[o.pk for o in orders if o.status == Status.NEW],
+                ).update(status=Status.CONSULTING, due_date=due_date)
+                # 월별 재무 집계: NEW·CONSULTING 버킷 둘 다 (커밋 후 재계산)
+                rollup.mark_dirty([
+                    rollup.order_key(status, o.payment_date)
+                    for o in orders if o.status == Status.NEW
+                    for status in (Status.NEW, Status.CONSULTING)
+                ])
+
+        # bulk_create/update는 시그널을 안 타므로 미확인주문리스트·칸반 캐시 무효화·SSE 직접
+        bump_unconfirmed_orders_version_on_commit()
+        bump_kanban_version_on_commit()
+        for o in orders:
+            publish('deposit', {
+                'id': None,   # bulk upsert라 pk 미반환
+                'match_status': Deposit.MatchStatus.AUTO_MATCHED,
+                'order_id': o.pk,
+            })
+            if o.status == Status.NEW:
+                publish('order', {'id': o.pk, 'status': Status.CONSULTING})
 
-        orders_resp.append({'order_id': order_id, 'description': 'OK'})
+    orders_resp = []
+    for order_id in parsed:
+        if not order_id:
+            description = 'invalid'
+        elif order_id not in found_ids:
+            description = 'not_found'
+        else:
+            description = 'OK'
+        orders_resp.append({'order_id': order_id, 'description': description})
 
     return _bankda_response({
         'return_code': '200',
@@ -0,0 +1,125 @@
+"""프로세스 내 이벤트 브로커 + SSE 스트림 (컨트롤 패널·주문목록 실시간 갱신).
+
+외부 메시지 버스 없음 — 같은 프로세스에서 publish된 이벤트만 전달된다.
+ASGI(asgi.py) 단일 프로세스로 띄워야 웹 요청(시그널 publish)과 SSE 구독자가 한 브로커를 공유:
+    gunicorn tshirt_management.asgi:application -k uvicorn.workers.UvicornWorker -w 1
+WSGI로 띄우면 event_stream_view가 204를 돌려줘 스트림을 열지 않음 (페이지는 폴링으로 동작).
+
+- 이벤트 id = '<부팅ID>:<순번>'. 최근 EVENT_HISTORY건 링버퍼 보관 → 재접속 시
+  Last-Event-ID 이후분 재전송. 버퍼에서 밀려났거나 다른 프로세스/재시작 전 id면 'reset'
+  이벤트 (클라이언트는 전체 갱신)
+- 이벤트 종류: order(주문 저장·상태 이동), deposit(입금 매칭), kakao_card(카톡 카드 upsert·숨김)
+- publish_on_commit: 트랜잭션 커밋 후 발행 (롤백된 변경 알림 방지)
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.db import transaction
+
+EVENT_HISTORY = 500
+HEARTBEAT_SECONDS = 15
+STREAM_MAX_SECONDS = 600   # 연결 주기적 재생성 (프록시 유휴 끊김·좀비 연결 정리). 브라우저가 자동 재접속
+RETRY_MS = 3000
+
+
+class EventBroker:
+    """스레드 안전 링버퍼 브로커. publish는 어느 스레드에서나, 구독(wait)은 asyncio 루프에서."""
+
+    def __init__(self, history=EVENT_HISTORY):
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=history)
+        self._seq = 0
+        self._waiters = set()   # (loop, asyncio.Event)
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, kind, data):
+        with self._lock:
+            self._seq += 1
+            self._events.append((self._seq, kind, data))
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # 루프 종료된 구독자 — finally에서 정리됨
+
+    def parse_id(self, event_id):
+        """Last-Event-ID → 순번. 다른 부팅(재시작·다른 프로세스) id면 None."""
+        boot, _, seq = (event_id or '').partition(':')
+        if boot != self.boot_id or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def since(self, last_seq):
+        """last_seq 이후 이벤트 [(seq, kind, data)], 누락 여부(gap)."""
+        with self._lock:
+            events = [e for e in self._events if e[0] > last_seq]
+            oldest = self._events[0][0] if self._events else self._seq + 1
+        gap = last_seq < oldest - 1
+        return events, gap
+
+    async def wait(self, last_seq, timeout):
+        """last_seq 이후 이벤트가 생길 때까지 대기. 새 이벤트 있으면 True, 타임아웃 False."""
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            if self._seq > last_seq:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+broker = EventBroker()
+
+
+def publish(kind, data):
+    broker.publish(kind, data)
+
+
+def publish_on_commit(kind, data):
+    transaction.on_commit(lambda: broker.publish(kind, data))
+
+
+def _format(event_id, kind, data):
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return f'id: {event_id}\nevent: {kind}\ndata: {payload}\n\n'
+
+
+async def event_stream(last_event_id=None, max_seconds=STREAM_MAX_SECONDS):
+    """SSE 본문 async 제너레이터."""
+    yield f'retry: {RETRY_MS}\n\n'
+    last = broker.parse_id(last_event_id) if last_event_id else None
+    if last is None:
+        if last_event_id:
+            yield _format(f'{broker.boot_id}:{broker.last_seq}', 'reset', {})
+        last = broker.last_seq
+
+    deadline = time.monotonic() + max_seconds
+    while time.monotonic() < deadline:
+        events, gap = broker.since(last)
+        if gap:
+            last = broker.last_seq
+            yield _format(f'{broker.boot_id}:{last}', 'reset', {})
+            continue
+        for seq, kind, data in events:
+            last = seq
+            yield _format(f'{broker.boot_id}:{seq}', kind, data)
+        if not events:
+            timeout = min(HEARTBEAT_SECONDS, max(0.0, deadline - time.monotonic()))
+            if not await broker.wait(last, timeout):
+                yield ': ping\n\n'
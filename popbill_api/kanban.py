@@ -0,0 +1,160 @@
+"""컨트롤 패널 칸반 스냅샷 + 델타.
+
+스냅샷 = {'version', 'cards': {카드키: 카드 dict}, 'columns': {칸: [카드키, ...]}}
+- 카드키: 주문 'o:<pk>', 카톡 상담 카드 'k:<customer_id>'
+- 카드 dict 키는 _kanban_card.html이 읽는 속성명 그대로 → 템플릿·JS 렌더 공용
+- version = 스냅샷 내용 해시. 같은 내용이면 같은 버전 (워커·재시작 무관)
+
+?since=<version> 델타: 그 버전 스냅샷(캐시 보관)과 비교해 바뀐/새 카드, 사라진 카드,
+구성·순서가 바뀐 칸만 반환. 해당 버전 스냅샷이 캐시에서 빠졌으면 full.
+
+DB 조회는 변경 카운터(signals.py가 Order·KakaoConsultCard 저장/삭제 커밋 후 +1)당 1회.
+QuerySet.update()는 시그널을 안 타므로 호출 측에서 bump_kanban_version_on_commit() 직접 호출,
+KANBAN_CURRENT_TTL은 그 밖의 누락·워커별 locmem 캐시 불일치 안전망.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+
+from orders.models import Order, Status
+
+KANBAN_REV_KEY = 'kanban:rev'
+KANBAN_CURRENT_KEY = 'kanban:current:{}'
+KANBAN_SNAPSHOT_KEY = 'kanban:snapshot:{}'
+KANBAN_CURRENT_TTL = 30
+KANBAN_SNAPSHOT_TTL = 60 * 30   # 델타 기준 보관 — 이보다 오래 쉰 클라이언트만 full
+
+# 칸반 8칸 — 대기중·상담중(카톡 카드) + 등록·결제·제작준비·제작중·발송·결과통보(주문 status)
+KANBAN_COLUMNS = ['waiting', 'consulting', 'registered', 'payment', 'prep', 'producing', 'shipped', 'notified']
+STATUS_TO_COLUMN = {
+    Status.NEW: 'registered',
+    Status.CONSULTING: 'payment',
+    Status.PREP: 'prep',
+    Status.PRODUCED: 'producing',
+    Status.COMPLETED: 'shipped',
+    Status.SETTLED: 'notified',
+}
+
+
+def bump_kanban_version():
+    """칸반 스냅샷 캐시 무효화 (변경 카운터 +1)."""
+    try:
+        cache.incr(KANBAN_REV_KEY)
+    except ValueError:
+        cache.set(KANBAN_REV_KEY, 1, None)
+
+
+def bump_kanban_version_on_commit():
+    """커밋 후 변경 카운터 +1. 커밋 전에 올리면 그 사이 요청이 옛 데이터로 새 버전 스냅샷을 캐시."""
+    transaction.on_commit(bump_kanban_version)
+
+
+def _build_snapshot():
+    from orders.models import KakaoConsultCard
+
+    cards = {}
+    columns = {col: [] for col in KANBAN_COLUMNS}
+
+    # 정산목록·주문취소 제외. 보류(is_on_hold) 주문은 각자 status 칸에 표시
+    active_orders = (
+        Order.objects
+        .exclude(status__in=[Status.ARCHIVED, Status.CANCELED])
+        .order_by('-payment_date')
+        .only('id', 'status', 'customer_name', 'customer_phone', 'deposit_name',
+              'shipping_address', 'kakao_customer_id', 'is_urgent', 'payment_date')
+    )
+    matched_names = set()
+    for o in active_orders:
+        chat_name = o.kakao_chat_name   # property — 주문당 1회만 계산
+        if chat_name:
+            matched_names.add(chat_name)
+        col = STATUS_TO_COLUMN.get(o.status)
+        if not col:
+            continue
+        key = f'o:{o.pk}'
+        cards[key] = {
+            'col': col,
+            'id': o.pk,
+            'kakao_chat_name': chat_name,
+            'customer_name': o.customer_name,
+            'customer_phone': o.customer_phone,
+            'deposit_name': o.deposit_name,
+            'shipping_address': o.shipping_address,
+            'kakao_customer_id': o.kakao_customer_id,
+            'is_urgent': o.is_urgent,
+        }
+        columns[col].append(key)
+
+    # 카톡 상담 카드 — 주문 미매칭 + dismissed 아님. 같은 이름 주문 있으면 주문 카드로만 표시
+    kakao_cards = (
+        KakaoConsultCard.objects
+        .filter(dismissed_at__isnull=True, order__isnull=True)
+        .values_list('customer_id', 'display_name', 'state', 'unread_count')
+    )
+    for customer_id, display_name, state, unread_count in kakao_cards:
+        if display_name and display_name in matched_names:
+            continue
+        col = 'waiting' if state == KakaoConsultCard.State.WAITING else 'consulting'
+        key = f'k:{customer_id}'
+        cards[key] = {
+            'col': col,
+            'customer_id': customer_id,
+            'display_name': display_name,
+            'unread_count': unread_count,
+        }
+        columns[col].append(key)
+
+    body = json.dumps([cards, columns], sort_keys=True, ensure_ascii=False)
+    version = hashlib.md5(body.encode('utf-8')).hexdigest()[:16]
+    return {'version': version, 'cards': cards, 'columns': columns}
+
+
+def get_kanban_snapshot():
+    """현재 칸반 스냅샷. 변경 카운터가 그대로면 캐시에서 (DB 조회 없음)."""
+    rev = cache.get_or_set(KANBAN_REV_KEY, 0, None)
+    current_key = KANBAN_CURRENT_KEY.format(rev)
+    version = cache.get(current_key)
+    if version:
+        snapshot = cache.get(KANBAN_SNAPSHOT_KEY.format(version))
+        if snapshot:
+            return snapshot
+
+    snapshot = _build_snapshot()
+    cache.set(KANBAN_SNAPSHOT_KEY.format(snapshot['version']), snapshot, KANBAN_SNAPSHOT_TTL)
+    cache.set(current_key, snapshot['version'], KANBAN_CURRENT_TTL)
+    return snapshot
+
+
+def kanban_delta(since=None):
+    """since 버전 대비 델타. since 없음·만료·알 수 없음 → full.
+
+    반환: {'version', 'full', 'cards', 'removed', 'columns'}
+    - full=True: cards/columns 전체 (removed 빈 리스트)
+    - full=False: 바뀐·새 카드, 사라진 카드키, 구성·순서가 바뀐 칸만
+    """
+    current = get_kanban_snapshot()
+    previous = cache.get(KANBAN_SNAPSHOT_KEY.format(since)) if since else None
+    if previous is None:
+        return {
+            'version': current['version'],
+            'full': True,
+            'cards': current['cards'],
+            'removed': [],
+            'columns': current['columns'],
+        }
+    if since == current['version']:
+        return {'version': current['version'], 'full': False, 'cards': {}, 'removed': [], 'columns': {}}
+
+    prev_cards = previous['cards']
+    return {
+        'version': current['version'],
+        'full': False,
+        'cards': {key: card for key, card in current['cards'].items() if prev_cards.get(key) != card},
+        'removed': [key for key in prev_cards if key not in current['cards']],
+        'columns': {
+            col: keys for col, keys in current['columns'].items()
+            if previous['columns'].get(col) != keys
+        },
+    }
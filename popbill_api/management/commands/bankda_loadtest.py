@@ -0,0 +1,152 @@
+"""뱅크다 동기화·자동매칭·webhook 부하 측정 — 로컬 대역 서버 상대로 실행.
+
+흐름:
+1. LOADTEST- 주문 --orders건 생성 (NEW, 금액 다양)
+2. 대역 서버 기동 — 입금 --deposits건 (절반은 주문 금액과 일치 → 자동매칭 부하)
+3. sync_bankda_deposits를 신규 0건까지 반복 (BankdaClient → 대역 서버)
+4. fetch_recent_deposits (팝빌 대역)
+5. bankda webhook 재생 (--webhook-rate 회/초 × --webhook-duration 초)
+6. 단계별 처리량·지연 리포트 (--json이면 JSON 1줄)
+
+기본은 전체를 트랜잭션 안에서 돌리고 끝에 롤백 (--keep이면 커밋).
+운영 데이터와 섞이면 증분 bcode·자동매칭 결과가 왜곡되므로 빈 DB(DATABASE_URL 분리) 권장 —
+주문/입금이 이미 있으면 --force 없이는 거부.
+"""
+import json
+import random
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from orders.models import Order, Status
+from popbill_api.models import Deposit
+from popbill_api.standin import StandInState, WebhookReplayer, start_standin_server
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = '로컬 뱅크다·팝빌 대역 서버로 입금 동기화·자동매칭·webhook 부하 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=2000, help='생성할 NEW 주문 수 (기본값: 2000)')
+        parser.add_argument('--deposits', type=int, default=10000, help='대역 서버 입금 건수 (기본값: 10000)')
+        parser.add_argument('--page-size', type=int, default=1000, help='뱅크다 1회 응답 건수 (기본값: 1000)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='대역 서버 503 주입 비율 (기본값: 0)')
+        parser.add_argument('--latency-ms', type=int, default=0, help='대역 서버 응답 지연 ms (기본값: 0)')
+        parser.add_argument('--webhook-rate', type=float, default=20.0, help='webhook 재생 회/초 (기본값: 20)')
+        parser.add_argument('--webhook-duration', type=float, default=10.0, help='webhook 재생 시간 초, 0=생략 (기본값: 10)')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+        parser.add_argument('--keep', action='store_true', help='측정 데이터 커밋 (기본: 롤백)')
+        parser.add_argument('--force', action='store_true', help='기존 주문/입금이 있어도 실행')
+        parser.add_argument('--json', action='store_true', help='리포트를 JSON으로 출력')
+
+    def handle(self, *args, **options):
+        if not options['force'] and (Order.objects.exists() or Deposit.objects.exists()):
+            raise CommandError(
+                '주문/입금 데이터가 있는 DB입니다. 빈 DB(DATABASE_URL 분리)에서 실행하거나 --force 지정'
+            )
+
+        report = {}
+        try:
+            with transaction.atomic():
+                report = self._run(options)
+                if not options['keep']:
+                    raise _Rollback
+        except _Rollback:
+            report['rolled_back'] = True
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, default=str))
+        else:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+
+    def _seed_orders(self, count, rng):
+        orders = [
+            Order(
+                smartstore_order_id=f'LOADTEST-{i:06d}',
+                status=Status.NEW,
+                customer_name=f'부하테스트{i}',
+                deposit_name=f'부하{i}',
+                shipping_address='서울시 테스트구 부하로 1',
+                total_order_amount=Decimal(rng.randrange(100, 3000) * 100),
+            )
+            for i in range(count)
+        ]
+        Order.objects.bulk_create(orders, batch_size=1000)
+        return [o.smartstore_order_id for o in orders], [int(o.total_order_amount) for o in orders]
+
+    def _run(self, options):
+        from popbill_api.bankda_client import BankdaClient
+        from popbill_api.services import fetch_recent_deposits, sync_bankda_deposits
+
+        rng = random.Random(options['seed'])
+        report = {}
+
+        started = time.monotonic()
+        order_ids, order_amounts = self._seed_orders(options['orders'], rng)
+        report['seed_orders'] = {'count': len(order_ids), 'seconds': round(time.monotonic() - started, 3)}
+
+        # 입금액: 주문 금액 풀 + 같은 수의 무관 금액 → 약 절반이 매칭 후보
+        amounts = order_amounts + [rng.randrange(100, 3000) * 100 + 50 for _ in order_amounts]
+        state = StandInState(
+            deposits=options['deposits'],
+            amounts=amounts or None,
+            page_size=options['page_size'],
+            error_rate=options['error_rate'],
+            latency_ms=options['latency_ms'],
+            seed=options['seed'],
+        )
+        server, base_url = start_standin_server(state)
+        try:
+            token = settings.BANKDA_ACCESS_TOKEN or 'standin'
+            with override_settings(BANKDA_ACCESS_TOKEN=token):
+                client = BankdaClient(url=f'{base_url}/dtsvc/bank_tr.php')
+                rounds = []
+                total_new = total_matched = 0
+                sync_started = time.monotonic()
+                while True:
+                    round_started = time.monotonic()
+                    result = sync_bankda_deposits(client=client)
+                    rounds.append(time.monotonic() - round_started)
+                    if result.get('error'):
+                        report['sync_error'] = result['error']
+                        break
+                    total_new += result['new']
+                    total_matched += result['matched']
+                    if not result['new']:
+                        break
+                sync_seconds = time.monotonic() - sync_started
+            report['bankda_sync'] = {
+                'rounds': len(rounds),
+                'new_deposits': total_new,
+                'auto_matched': total_matched,
+                'seconds': round(sync_seconds, 3),
+                'deposits_per_sec': round(total_new / sync_seconds, 1) if sync_seconds else 0.0,
+                'slowest_round_s': round(max(rounds), 3) if rounds else 0.0,
+                'client_metrics': client.metrics.snapshot(),
+            }
+
+            with override_settings(POPBILL_STANDIN_URL=base_url, POPBILL_CORP_NUM='0000000000'):
+                popbill_started = time.monotonic()
+                popbill_result = fetch_recent_deposits(days=7)
+                report['popbill_fetch'] = {
+                    **popbill_result,
+                    'seconds': round(time.monotonic() - popbill_started, 3),
+                }
+
+            if options['webhook_duration'] > 0:
+                replayer = WebhookReplayer(order_ids, seed=options['seed'])
+                report['webhooks'] = replayer.run(options['webhook_rate'], options['webhook_duration'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        report['standin'] = state.stats()
+        return report
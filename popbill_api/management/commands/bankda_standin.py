@@ -0,0 +1,62 @@
+"""뱅크다·팝빌 로컬 대역 서버 단독 실행 — runserver를 이 서버로 붙여 수동 통합 테스트.
+
+예) python manage.py bankda_standin --port 8765 --deposits 500
+    BANKDA_URL=http://127.0.0.1:8765/dtsvc/bank_tr.php BANKDA_ACCESS_TOKEN=standin \
+    POPBILL_STANDIN_URL=http://127.0.0.1:8765 POPBILL_CORP_NUM=1234567890 python manage.py runserver
+
+--replay-target 지정 시 대상 서버의 bankda webhook을 --replay-rate 속도로 재생.
+"""
+import json
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from popbill_api.standin import StandInState, WebhookReplayer, start_standin_server
+
+
+class Command(BaseCommand):
+    help = '뱅크다·팝빌 대역(stand-in) 서버 실행 (+ 선택: webhook 재생)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='바인드 주소 (기본값: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8765, help='포트 (기본값: 8765)')
+        parser.add_argument('--deposits', type=int, default=1000, help='거래 피드 건수 (기본값: 1000)')
+        parser.add_argument('--page-size', type=int, default=1000, help='뱅크다 1회 응답 건수 (기본값: 1000)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='503 주입 비율 0~1 (기본값: 0)')
+        parser.add_argument('--latency-ms', type=int, default=0, help='응답 지연 ms (기본값: 0)')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본값: 0)')
+        parser.add_argument('--replay-target', default='', help='webhook 재생 대상 URL (예: http://127.0.0.1:8000)')
+        parser.add_argument('--replay-rate', type=float, default=5.0, help='webhook 재생 회/초 (기본값: 5)')
+        parser.add_argument('--replay-duration', type=float, default=30.0, help='webhook 재생 시간 초 (기본값: 30)')
+        parser.add_argument('--order-ids', default='', help='재생 시 사용할 smartstore_order_id 목록 (콤마 구분)')
+
+    def handle(self, *args, **options):
+        state = StandInState(
+            deposits=options['deposits'],
+            page_size=options['page_size'],
+            error_rate=options['error_rate'],
+            latency_ms=options['latency_ms'],
+            seed=options['seed'],
+        )
+        server, base_url = start_standin_server(state, options['host'], options['port'])
+        self.stdout.write(self.style.SUCCESS(f'대역 서버 기동: {base_url}'))
+        self.stdout.write(f'  BANKDA_URL={base_url}/dtsvc/bank_tr.php')
+        self.stdout.write(f'  POPBILL_STANDIN_URL={base_url}')
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *a: stop.set())
+        signal.signal(signal.SIGINT, lambda *a: stop.set())
+
+        try:
+            if options['replay_target']:
+                order_ids = [x.strip() for x in options['order_ids'].split(',') if x.strip()]
+                replayer = WebhookReplayer(order_ids, target_url=options['replay_target'], seed=options['seed'])
+                report = replayer.run(options['replay_rate'], options['replay_duration'])
+                self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            else:
+                stop.wait()
+        finally:
+            server.shutdown()
+            server.server_close()
+            self.stdout.write(json.dumps(state.stats(), ensure_ascii=False))
@@ -0,0 +1,53 @@
+"""보존기간 지난 입금 원본 응답 정리 — 압축 JSONL로 보관 후 raw_payload 비움.
+
+입금 내역은 장부라 행은 남기고, 매칭·무시 처리된 지 --days 지난 입금의 raw_payload
+(뱅크다 원본 응답)만 보관 후 비움. 미매칭 입금은 원본 유지.
+처리 끝난 ktalk 요청 정리는 manage.py compact_ktalk_history (orders).
+
+아카이브·청크 처리: utils/retention.py. RETENTION_ARCHIVE_DIR(영구 저장소) 지정 필수.
+
+cron 예: 매일 04:00  python manage.py compact_deposit_payloads
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from popbill_api.models import Deposit
+from utils.retention import add_retention_arguments, archive_and_apply, archive_dir
+
+
+class Command(BaseCommand):
+    help = '매칭·무시 처리된 입금의 원본 응답(raw_payload) 보존기간 정리 (압축 JSONL 보관 후 비움)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365,
+                            help='입금 raw_payload 보존 일수 (기본값: 365)')
+        add_retention_arguments(parser)
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('보존 일수는 1 이상이어야 합니다')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        qs = (
+            Deposit.objects
+            .exclude(match_status=Deposit.MatchStatus.UNMATCHED)
+            .filter(transaction_date__lt=cutoff)
+            .exclude(raw_payload={})
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'deposit: {qs.count()}건 (기준 {cutoff:%Y-%m-%d})')
+            return
+
+        stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        path = archive_dir(options) / f'deposit-{stamp}.jsonl.gz'
+        archived = archive_and_apply(
+            qs, ['id', 'transaction_id', 'source', 'bcode', 'transaction_date', 'raw_payload'],
+            lambda chunk: chunk.update(raw_payload={}), path,
+            max(1, options['chunk_size']), options['sleep'],
+        )
+        if archived:
+            self.stdout.write(self.style.SUCCESS(f'deposit: {archived}건 정리 → {path}'))
+        else:
+            self.stdout.write('deposit: 정리 대상 없음')
@@ -0,0 +1,48 @@
+"""PENDING 현금영수증 일괄 발급 — 웹 일괄 발급이 워커 재시작 등으로 중단됐을 때 재개용."""
+from django.core.management.base import BaseCommand
+
+from popbill_api.models import CashReceipt
+from popbill_api.services import issue_cash_receipts_bulk
+
+
+class Command(BaseCommand):
+    help = 'PENDING 현금영수증 일괄 발급 (중단된 일괄 발급 재개)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', default='', help='특정 일괄 발급 묶음 키만')
+        parser.add_argument('--workers', type=int, default=4, help='작업 스레드 수 — 팝빌 호출 자체는 하나씩 (기본값: 4)')
+        parser.add_argument('--retries', type=int, default=2, help='일시 오류 재시도 횟수 (기본값: 2)')
+        parser.add_argument(
+            '--reset-processing',
+            action='store_true',
+            help='발급 중(PROCESSING)에 멈춘 건을 대기로 되돌린 뒤 발급 — 팝빌 발급 이력 확인 후 사용',
+        )
+
+    def handle(self, *args, **options):
+        qs = CashReceipt.objects.all()
+        if options['batch']:
+            qs = qs.filter(batch_key=options['batch'])
+
+        if options['reset_processing']:
+            reset = qs.filter(issue_status=CashReceipt.IssueStatus.PROCESSING).update(
+                issue_status=CashReceipt.IssueStatus.PENDING
+            )
+            self.stdout.write(f'PROCESSING → PENDING {reset}건')
+
+        receipt_ids = list(
+            qs.filter(issue_status=CashReceipt.IssueStatus.PENDING)
+            .order_by('created_at')
+            .values_list('pk', flat=True)
+        )
+        if not receipt_ids:
+            self.stdout.write('발급 대기 현금영수증 없음')
+            return
+
+        counts = issue_cash_receipts_bulk(
+            receipt_ids, max_workers=options['workers'], max_retries=options['retries']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"issued={counts['issued']} failed={counts['failed']} skipped={counts['skipped']}"
+            )
+        )
@@ -1,19 +1,167 @@
-"""뱅크다 폴링 cron — systemd timer로 30분 주기 호출."""
+"""뱅크다 폴링 — 1회 실행(systemd timer 30분 주기) 또는 --daemon 상주 모드.
+
+--daemon:
+- 프로세스 1개 상주 → Django 부팅 비용 1회, BankdaClient(keep-alive Session) 재사용
+- 적응형 주기: 영업시간(평일 09~19시)엔 --min-interval부터, 신규 입금 없으면 2배씩
+  늘려 상한까지. 신규 입금 오면 즉시 최소 주기로 복귀. 영업시간 외 상한은 --idle-interval
+- PostgreSQL advisory lock — 여러 호스트에서 떠도 폴러는 1개만 (나머지는 대기)
+- SIGTERM/SIGINT → 진행 중 폴링 마치고 lock 해제 후 종료
+"""
+import signal
+import threading
+
 from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError, InterfaceError
+from django.utils import timezone
 
 from popbill_api.services import sync_bankda_deposits
 
+# pg_try_advisory_lock 키 (임의 고정값, 'bankda' 폴러 전용)
+ADVISORY_LOCK_KEY = 0x62616E6B
+
 
 class Command(BaseCommand):
     help = '뱅크다 REST API로 신규 입금 내역 동기화 + 자동매칭'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--daemon',
+            action='store_true',
+            help='상주 모드 (적응형 주기 폴링, SIGTERM으로 종료)',
+        )
+        parser.add_argument(
+            '--min-interval',
+            type=int,
+            default=60,
+            help='영업시간 최소 폴링 주기 초 (기본값: 60)',
+        )
+        parser.add_argument(
+            '--max-interval',
+            type=int,
+            default=600,
+            help='영업시간 무입금 시 최대 폴링 주기 초 (기본값: 600)',
+        )
+        parser.add_argument(
+            '--idle-interval',
+            type=int,
+            default=1800,
+            help='영업시간 외 폴링 주기 초 (기본값: 1800)',
+        )
+        parser.add_argument(
+            '--business-hours',
+            default='9-19',
+            help='영업시간 (로컬 시각, 시작-끝 시, 평일만. 기본값: 9-19)',
+        )
+
     def handle(self, *args, **options):
-        result = sync_bankda_deposits()
+        if not options['daemon']:
+            self._run_once()
+            return
+
+        try:
+            start, end = (int(x) for x in options['business_hours'].split('-'))
+        except ValueError:
+            self.stderr.write(self.style.ERROR('--business-hours 형식 오류 (예: 9-19)'))
+            return
+        self.business_hours = (start, end)
+        self.min_interval = max(5, options['min_interval'])
+        self.max_interval = max(self.min_interval, options['max_interval'])
+        self.idle_interval = max(self.min_interval, options['idle_interval'])
+
+        self.stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+
+        self._daemon_loop()
+
+    # ─── 1회 실행 ───
+
+    def _run_once(self, client=None):
+        result = sync_bankda_deposits(client=client)
         if result.get('error'):
             self.stderr.write(self.style.ERROR(f"error={result['error']}"))
-            return
+            return result
         self.stdout.write(
             self.style.SUCCESS(
                 f"new={result['new']} matched={result['matched']}"
             )
         )
+        return result
+
+    # ─── 데몬 ───
+
+    def _on_signal(self, signum, frame):
+        self.stdout.write(f'signal {signum} 수신 — 종료 준비')
+        self.stop_event.set()
+
+    def _in_business_hours(self):
+        now = timezone.localtime()
+        start, end = self.business_hours
+        return now.weekday() < 5 and start <= now.hour < end
+
+    def _next_interval(self, current, got_new):
+        if not self._in_business_hours():
+            return self.idle_interval
+        if got_new:
+            return self.min_interval
+        return min(self.max_interval, max(self.min_interval, current * 2))
+
+    def _try_lock(self):
+        """advisory lock 획득 시도. PostgreSQL 외(SQLite 단일 호스트)는 항상 True.
+
+        세션 단위 lock이라 DB 연결이 끊기면 자동 해제 → 재연결 후 다시 호출해야 함.
+        """
+        if connection.vendor != 'postgresql':
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [ADVISORY_LOCK_KEY])
+            return bool(cursor.fetchone()[0])
+
+    def _unlock(self):
+        if connection.vendor != 'postgresql' or connection.connection is None:
+            return
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [ADVISORY_LOCK_KEY])
+        except (OperationalError, InterfaceError):
+            pass
+
+    def _daemon_loop(self):
+        from popbill_api.bankda_client import BankdaClient
+
+        client = BankdaClient()
+        interval = self.min_interval
+        has_lock = False
+        self.stdout.write(
+            f'poll_bankda 데몬 시작 (영업시간 {self.business_hours[0]}~{self.business_hours[1]}시, '
+            f'주기 {self.min_interval}~{self.max_interval}s, 영업외 {self.idle_interval}s)'
+        )
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    if not has_lock:
+                        has_lock = self._try_lock()
+                        if not has_lock:
+                            # 다른 호스트 폴러가 동작 중 — 대기 후 재시도 (failover)
+                            self.stop_event.wait(self.max_interval)
+                            continue
+                        self.stdout.write('advisory lock 획득')
+
+                    result = self._run_once(client=client)
+                    got_new = bool(result.get('new')) and not result.get('error')
+                    interval = self._next_interval(interval, got_new)
+                except (OperationalError, InterfaceError) as exc:
+                    # DB 연결 끊김 → lock도 사라짐. 연결 정리 후 lock부터 다시
+                    self.stderr.write(self.style.ERROR(f'DB 오류: {exc}'))
+                    connection.close()
+                    has_lock = False
+                    interval = self.min_interval
+
+                self.stdout.write(f'다음 폴링 {interval}s 후 metrics={client.metrics.snapshot()}')
+                self.stop_event.wait(interval)
+        finally:
+            if has_lock:
+                self._unlock()
+            connection.close()
+            self.stdout.write(self.style.SUCCESS('poll_bankda 데몬 종료'))
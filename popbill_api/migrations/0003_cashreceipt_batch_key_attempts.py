@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-19 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('popbill_api', '0002_deposit_bcode_deposit_raw_payload_deposit_source_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashreceipt',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='발급 시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='cashreceipt',
+            name='batch_key',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='일괄 발급 요청 단위 키 (단건 발급은 빈값)', max_length=32, verbose_name='일괄 발급 묶음'),
+        ),
+        migrations.AlterField(
+            model_name='cashreceipt',
+            name='issue_status',
+            field=models.CharField(choices=[('PENDING', '발급 대기'), ('PROCESSING', '발급 중'), ('ISSUED', '발급 완료'), ('FAILED', '발급 실패'), ('CANCELED', '발급 취소')], default='PENDING', max_length=10, verbose_name='발급 상태'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.25 on 2026-10-19 01:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('popbill_api', '0003_cashreceipt_batch_key_attempts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['match_status', '-transaction_date'], name='deposit_status_trdate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['-transaction_date'], name='deposit_trdate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(condition=models.Q(('confirmed_at__isnull', True)), fields=['match_status', '-transaction_date'], name='deposit_unconfirmed_idx'),
+        ),
+    ]
@@ -72,6 +72,17 @@ class Deposit(models.Model):
         verbose_name = "입금 내역"
         verbose_name_plural = "입금 내역"
         ordering = ['-transaction_date']
+        # 대시보드·컨트롤 패널·주문목록 패널: match_status 필터 + 최신순,
+        # 확인 대기 목록은 confirmed_at IS NULL 부분 인덱스로 (이력 수만 건이어도 상위 N건만 읽음)
+        indexes = [
+            models.Index(fields=['match_status', '-transaction_date'], name='deposit_status_trdate_idx'),
+            models.Index(fields=['-transaction_date'], name='deposit_trdate_idx'),
+            models.Index(
+                fields=['match_status', '-transaction_date'],
+                condition=models.Q(confirmed_at__isnull=True),
+                name='deposit_unconfirmed_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['source', 'bcode'],
@@ -98,6 +109,7 @@ class CashReceipt(models.Model):
 
     class IssueStatus(models.TextChoices):
         PENDING = 'PENDING', '발급 대기'
+        PROCESSING = 'PROCESSING', '발급 중'
         ISSUED = 'ISSUED', '발급 완료'
         FAILED = 'FAILED', '발급 실패'
         CANCELED = 'CANCELED', '발급 취소'
@@ -145,6 +157,12 @@ class CashReceipt(models.Model):
         verbose_name="국세청 승인번호"
     )
     error_message = models.TextField(blank=True, default='', verbose_name="오류 메시지")
+    batch_key = models.CharField(
+        max_length=32, blank=True, default='', db_index=True,
+        verbose_name="일괄 발급 묶음",
+        help_text="일괄 발급 요청 단위 키 (단건 발급은 빈값)"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="발급 시도 횟수")
 
     issued_at = models.DateTimeField(null=True, blank=True, verbose_name="발급일시")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일시")
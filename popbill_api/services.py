@@ -1,5 +1,8 @@
 """입금확인·현금영수증 서비스 레이어. 입금확인은 뱅크다 REST API 사용."""
+import functools
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
 
@@ -19,19 +22,68 @@ def get_popbill_config():
         'corp_num': getattr(settings, 'POPBILL_CORP_NUM', ''),
         'bank_code': getattr(settings, 'POPBILL_BANK_CODE', ''),
         'account_number': getattr(settings, 'POPBILL_ACCOUNT_NUMBER', ''),
+        'standin_url': getattr(settings, 'POPBILL_STANDIN_URL', ''),
     }
 
 
-def _get_easyfinbank_service():
-    """팝빌 계좌조회 서비스 인스턴스 반환"""
-    try:
-        from popbill import EasyFinBankService
-    except ImportError:
-        logger.error("popbill 패키지가 설치되지 않았습니다. pip install popbill")
-        return None
+# 서비스 인스턴스 캐시 — SDK는 인스턴스 안에 인증 토큰(만료까지 재사용)과 HTTPS 연결을 보관.
+# SDK 클래스는 Singleton 메타클래스라 생성자를 다시 불러도 첫 인스턴스가 돌아옴 →
+# 설정을 바꿔도 첫 LinkID/SecretKey에 고정. 그래서 메타클래스를 우회해 인스턴스를 직접 만들고
+# 종류·설정(링크ID·비밀키·테스트 여부·대역 URL)별로 프로세스에 1개만 캐시 (토큰 발급도 1번).
+# 인스턴스의 연결 1개는 스레드 안전하지 않으므로 호출은 _SerializedService가 잠금으로 직렬화.
+_service_cache = {}
+_service_cache_lock = threading.Lock()
+
+
+class _SerializedService:
+    """공유 SDK 인스턴스 래퍼 — 메서드 호출을 인스턴스별 잠금으로 한 번에 하나씩."""
+
+    def __init__(self, service):
+        self._service = service
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+        return call
 
+
+def _new_sdk_instance(cls, config):
+    """Singleton 메타클래스 우회 — 설정별 독립 인스턴스."""
+    return type.__call__(cls, config['link_id'], config['secret_key'])
+
+
+def _service_cache_key(config):
+    return (config['link_id'], config['secret_key'], config['is_test'], config['standin_url'])
+
+
+def _cached_service(kind, factory):
     config = get_popbill_config()
-    service = EasyFinBankService(config['link_id'], config['secret_key'])
+    key = _service_cache_key(config)
+    with _service_cache_lock:
+        cached = _service_cache.get(kind)
+        if cached and cached[0] == key:
+            return cached[1]
+        service = factory(config)   # 생성만 (네트워크 없음) → 잠금 안에서 해도 짧음
+        if service is not None:
+            service = _SerializedService(service)
+            _service_cache[kind] = (key, service)
+        return service
+
+
+def clear_popbill_service_cache(**kwargs):
+    """서비스 캐시 비움 (설정 변경 시그널·테스트용). 설정이 바뀌면 다음 호출 때 키 비교로도 교체된다."""
+    with _service_cache_lock:
+        _service_cache.clear()
+
+
+def _configure_service(service, config):
     service.IsTest = config['is_test']
     service.IPRestrictOnOff = False
     service.UseStaticIP = False
@@ -39,21 +91,42 @@ def _get_easyfinbank_service():
     return service
 
 
-def _get_cashreceipt_service():
-    """팝빌 현금영수증 서비스 인스턴스 반환"""
+def _build_easyfinbank_service(config):
+    if config['standin_url']:
+        from .standin import StandInEasyFinBankService
+        return StandInEasyFinBankService(config['standin_url'])
+
+    try:
+        from popbill import EasyFinBankService
+    except ImportError:
+        logger.error("popbill 패키지가 설치되지 않았습니다. pip install popbill")
+        return None
+
+    return _configure_service(_new_sdk_instance(EasyFinBankService, config), config)
+
+
+def _build_cashreceipt_service(config):
+    if config['standin_url']:
+        from .standin import StandInCashReceiptService
+        return StandInCashReceiptService(config['standin_url'])
+
     try:
         from popbill import CashReceiptService
     except ImportError:
         logger.error("popbill 패키지가 설치되지 않았습니다. pip install popbill")
         return None
 
-    config = get_popbill_config()
-    service = CashReceiptService(config['link_id'], config['secret_key'])
-    service.IsTest = config['is_test']
-    service.IPRestrictOnOff = False
-    service.UseStaticIP = False
-    service.UseLocalTimeYN = True
-    return service
+    return _configure_service(_new_sdk_instance(CashReceiptService, config), config)
+
+
+def _get_easyfinbank_service():
+    """팝빌 계좌조회 서비스 인스턴스 반환 (프로세스 공유 캐시)"""
+    return _cached_service('easyfinbank', _build_easyfinbank_service)
+
+
+def _get_cashreceipt_service():
+    """팝빌 현금영수증 서비스 인스턴스 반환 (프로세스 공유 캐시)"""
+    return _cached_service('cashreceipt', _build_cashreceipt_service)
 
 
 # ─── 계좌조회 (입금확인) ───
@@ -144,16 +217,17 @@ def _parse_bankda_datetime(bkdate, bktime):
     return timezone.make_aware(dt)
 
 
-def sync_bankda_deposits():
+def sync_bankda_deposits(client=None):
     """뱅크다 호출 → 새 입금 Deposit 저장 → 자동매칭.
 
     증분 조회: 마지막으로 저장한 뱅크다 거래 bcode 다음부터.
     첫 호출 시: 오늘부터 일주일 범위.
+    client: BankdaClient 주입 (데몬의 재사용 인스턴스·가짜 서버용). 생략 시 새로 생성.
     """
     from .bankda_client import BankdaClient, BankdaError
     from .models import Deposit
 
-    client = BankdaClient()
+    client = client or BankdaClient()
     last = (
         Deposit.objects
         .filter(source=Deposit.Source.BANKDA)
@@ -280,22 +354,75 @@ def auto_match_deposits():
 
 # ─── 현금영수증 ───
 
-def issue_cash_receipt(cash_receipt_obj):
+# 팝빌 통신 오류 코드 (SDK가 네트워크 예외를 감싸서 던짐)
+POPBILL_NETWORK_ERROR_CODE = -99999999
+RECEIPT_RETRY_BACKOFF = 1.0  # 초. n번째 재시도 대기 = BACKOFF × 2^(n-1)
+
+
+def _is_transient_popbill_error(exc):
+    """재시도할 만한 오류인지 — 통신 오류·서버 5xx만. 식별번호 오류 등 업무 오류는 즉시 실패."""
+    code = getattr(exc, 'code', None)
+    if code is None:
+        return isinstance(exc, (ConnectionError, TimeoutError, OSError))
+    return code == POPBILL_NETWORK_ERROR_CODE or (isinstance(code, int) and -599 <= code <= -500)
+
+
+def _fail_cash_receipt(cash_receipt_obj, message):
+    """발급 실패 기록 — 일괄 발급이 PROCESSING으로 선점한 건도 FAILED로 끝나게."""
+    cash_receipt_obj.issue_status = 'FAILED'
+    cash_receipt_obj.error_message = message
+    cash_receipt_obj.save()
+    return {'success': False, 'message': message}
+
+
+def cash_receipt_mgt_key(cash_receipt_obj):
+    """팝빌 문서번호(MgtKey) — 영수증마다 고정.
+
+    재시도·재발급이 같은 키로 가므로, 팝빌이 이미 접수한 요청을 다시 보내도
+    두 번째 영수증 대신 문서번호 중복 오류가 난다. 생성일을 붙여 DB 초기화 후 pk 재사용과도 겹치지 않게.
+    """
+    return f"CR{timezone.localtime(cash_receipt_obj.created_at):%y%m%d}-{cash_receipt_obj.pk}"
+
+
+def _find_issued_cash_receipt(service, corp_num, mgt_key, amount):
+    """문서번호로 이미 발급된 영수증 조회 — 응답을 못 받은 앞선 시도가 실제로 발급됐는지 확인.
+
+    금액이 다르면 같은 문서번호의 다른 문서로 보고 None.
+    """
+    get_info = getattr(service, 'getInfo', None)
+    if get_info is None:
+        return None
+    try:
+        info = get_info(corp_num, mgt_key)
+    except Exception as e:
+        logger.info(f"현금영수증 문서번호 조회 실패 ({mgt_key}): {e}")
+        return None
+    try:
+        if int(getattr(info, 'totalAmount', -1)) != int(amount):
+            return None
+    except (TypeError, ValueError):
+        return None
+    return info
+
+
+def issue_cash_receipt(cash_receipt_obj, service=None, max_retries=0, sleep=time.sleep):
     """현금영수증 발급 요청
 
     Args:
         cash_receipt_obj: CashReceipt 모델 인스턴스
+        service: 사용할 CashReceiptService. 생략 시 공유 캐시 인스턴스.
+        max_retries: 일시 오류(통신·5xx) 재시도 횟수
 
     Returns:
         dict: {'success': bool, 'message': str}
     """
-    service = _get_cashreceipt_service()
+    service = service or _get_cashreceipt_service()
     if not service:
-        return {'success': False, 'message': 'popbill 패키지 미설치'}
+        return _fail_cash_receipt(cash_receipt_obj, 'popbill 패키지 미설치')
 
     config = get_popbill_config()
     if not config['corp_num']:
-        return {'success': False, 'message': '사업자번호 미설정'}
+        return _fail_cash_receipt(cash_receipt_obj, '사업자번호 미설정')
 
     # 식별번호에서 하이픈 제거
     identity_num = cash_receipt_obj.identity_number.replace('-', '')
@@ -313,36 +440,107 @@ def issue_cash_receipt(cash_receipt_obj):
         'CARD': '카드',
     }
     id_type = identity_type_map.get(cash_receipt_obj.identity_type, '사업자등록번호')
+    mgt_key = cash_receipt_mgt_key(cash_receipt_obj)
 
-    try:
-        result = service.registIssue(
-            config['corp_num'],
-            "",  # 문서번호 (자동생성)
-            trade_usage,
-            int(cash_receipt_obj.amount),  # 거래금액 (공급가 + 세액)
-            0,  # 공급가 (0이면 자동계산)
-            0,  # 세액 (0이면 자동계산)
-            0,  # 봉사료
-            id_type,
-            identity_num,
-            "",  # 고객명
-            "",  # 고객 연락처
-            "",  # 고객 이메일
-            "",  # 가맹점 사업자번호
-        )
+    attempt = 0
+    while True:
+        attempt += 1
+        cash_receipt_obj.attempts += 1
+        try:
+            result = service.registIssue(
+                config['corp_num'],
+                mgt_key,  # 문서번호 (영수증별 고정 → 재시도해도 중복 발급 없음)
+                trade_usage,
+                int(cash_receipt_obj.amount),  # 거래금액 (공급가 + 세액)
+                0,  # 공급가 (0이면 자동계산)
+                0,  # 세액 (0이면 자동계산)
+                0,  # 봉사료
+                id_type,
+                identity_num,
+                "",  # 고객명
+                "",  # 고객 연락처
+                "",  # 고객 이메일
+                "",  # 가맹점 사업자번호
+            )
+            break
+        except Exception as e:
+            if attempt <= max_retries and _is_transient_popbill_error(e):
+                logger.warning(f"현금영수증 발급 재시도 {attempt}/{max_retries} (receipt={cash_receipt_obj.pk}): {e}")
+                sleep(RECEIPT_RETRY_BACKOFF * (2 ** (attempt - 1)))
+                continue
+            # 앞선 시도(이번 재시도 또는 중단된 이전 실행)가 이미 발급됐으면 중복 오류로 돌아옴 → 조회로 확인
+            result = _find_issued_cash_receipt(service, config['corp_num'], mgt_key, cash_receipt_obj.amount)
+            if result is None:
+                logger.error(f"현금영수증 발급 실패: {e}")
+                return _fail_cash_receipt(cash_receipt_obj, str(e))
+            logger.info(f"현금영수증 기발급 확인 ({mgt_key}, receipt={cash_receipt_obj.pk})")
+            break
 
-        cash_receipt_obj.issue_status = 'ISSUED'
-        cash_receipt_obj.popbill_receipt_id = getattr(result, 'receiptID', '') or str(result) if result else ''
-        cash_receipt_obj.issued_at = timezone.now()
-        cash_receipt_obj.error_message = ''
-        cash_receipt_obj.save()
+    cash_receipt_obj.issue_status = 'ISSUED'
+    cash_receipt_obj.popbill_receipt_id = getattr(result, 'receiptID', '') or mgt_key
+    cash_receipt_obj.popbill_nts_confirm_num = getattr(result, 'confirmNum', '') or cash_receipt_obj.popbill_nts_confirm_num
+    cash_receipt_obj.issued_at = timezone.now()
+    cash_receipt_obj.error_message = ''
+    cash_receipt_obj.save()
 
-        return {'success': True, 'message': '현금영수증이 발급되었습니다.'}
+    return {'success': True, 'message': '현금영수증이 발급되었습니다.'}
 
-    except Exception as e:
-        error_msg = str(e)
-        logger.error(f"현금영수증 발급 실패: {error_msg}")
-        cash_receipt_obj.issue_status = 'FAILED'
-        cash_receipt_obj.error_message = error_msg
-        cash_receipt_obj.save()
-        return {'success': False, 'message': error_msg}
+
+def issue_cash_receipts_bulk(receipt_ids, max_workers=4, max_retries=2):
+    """PENDING 현금영수증 일괄 발급 (동시 max_workers건).
+
+    팝빌 호출은 공유 서비스 객체 1개를 거쳐 한 번에 하나씩(SDK 연결이 스레드 안전하지 않음) —
+    작업 스레드는 DB 선점·저장과 재시도 대기를 겹쳐 처리.
+    영수증별 결과는 CashReceipt.issue_status / error_message / attempts에 기록.
+
+    Returns:
+        dict: {'issued': int, 'failed': int, 'skipped': int}
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from django.db import connection
+    from .models import CashReceipt
+
+    def _issue(receipt_id):
+        try:
+            # PENDING → PROCESSING 원자적 선점. 다른 요청/스레드가 잡은 건은 건너뜀 (중복 발급 방지)
+            claimed = CashReceipt.objects.filter(
+                pk=receipt_id, issue_status=CashReceipt.IssueStatus.PENDING,
+            ).update(issue_status=CashReceipt.IssueStatus.PROCESSING)
+            if not claimed:
+                return 'skipped'
+            receipt = CashReceipt.objects.get(pk=receipt_id)
+            result = issue_cash_receipt(receipt, max_retries=max_retries)
+            return 'issued' if result['success'] else 'failed'
+        except Exception as e:
+            logger.error(f"현금영수증 일괄 발급 오류 (receipt={receipt_id}): {e}")
+            CashReceipt.objects.filter(pk=receipt_id).update(
+                issue_status=CashReceipt.IssueStatus.FAILED, error_message=str(e),
+            )
+            return 'failed'
+        finally:
+            # 작업 스레드의 DB 연결 정리 (스레드마다 별도 연결)
+            connection.close()
+
+    counts = {'issued': 0, 'failed': 0, 'skipped': 0}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='cash-receipt') as pool:
+        for outcome in pool.map(_issue, list(receipt_ids)):
+            counts[outcome] += 1
+    logger.info(f"현금영수증 일괄 발급 완료: {counts}")
+    return counts
+
+
+def start_bulk_cash_receipt_issue(receipt_ids, **kwargs):
+    """요청 스레드와 분리해 일괄 발급 시작 (백그라운드 스레드).
+
+    워커 재시작 등으로 중단되면 PENDING/PROCESSING이 남음 → manage.py issue_cash_receipts로 재개.
+    """
+    thread = threading.Thread(
+        target=issue_cash_receipts_bulk,
+        args=(list(receipt_ids),),
+        kwargs=kwargs,
+        name='cash-receipt-bulk',
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,71 @@
+"""popbill_api 캐시 무효화·실시간 push 시그널.
+
+- 뱅크다 미확인주문리스트: NEW 주문·주문 항목·입금(매칭 상태) 변경 시 bankda_views의
+  변경 카운터를 커밋 후 올린다. QuerySet.update()는 시그널을 안 타므로 호출 측에서
+  bump_unconfirmed_orders_version_on_commit() 직접 호출.
+- 컨트롤 패널 칸반: 주문·카톡 상담 카드 저장/삭제 시 kanban 변경 카운터 +1
+  커밋 후 +1 (QuerySet.update() 호출 측은 bump_kanban_version_on_commit() 직접 호출).
+- SSE(events.py): 주문 저장, 입금 매칭, 카톡 카드 upsert를 커밋 후 publish.
+  QuerySet.update() 호출 측은 publish_on_commit() 직접 호출.
+- 팝빌 서비스 인스턴스: POPBILL_* 설정 변경(override_settings 등) 시 캐시 비움.
+"""
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from orders.models import KakaoConsultCard, Order, OrderItem, Status
+
+from .bankda_views import bump_unconfirmed_orders_version_on_commit
+from .events import publish_on_commit
+from .kanban import bump_kanban_version_on_commit
+from .models import Deposit
+from .services import clear_popbill_service_cache
+
+
+@receiver(post_save, sender=Order)
+def _order_saved(sender, instance, update_fields=None, **kwargs):
+    # NEW 주문 변경 또는 status가 바뀌었을 수 있는 저장(NEW → 다른 상태 포함)
+    if instance.status == Status.NEW or update_fields is None or 'status' in update_fields:
+        bump_unconfirmed_orders_version_on_commit()
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+@receiver(post_save, sender=Deposit)
+@receiver(post_delete, sender=Deposit)
+def _bankda_source_changed(sender, **kwargs):
+    bump_unconfirmed_orders_version_on_commit()
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=KakaoConsultCard)
+@receiver(post_delete, sender=KakaoConsultCard)
+def _kanban_source_changed(sender, **kwargs):
+    bump_kanban_version_on_commit()
+
+
+@receiver(post_save, sender=Order)
+def _publish_order(sender, instance, **kwargs):
+    publish_on_commit('order', {'id': instance.pk, 'status': instance.status})
+
+
+@receiver(post_save, sender=Deposit)
+def _publish_deposit(sender, instance, **kwargs):
+    publish_on_commit('deposit', {
+        'id': instance.pk,
+        'match_status': instance.match_status,
+        'order_id': instance.matched_order_id,
+    })
+
+
+@receiver(post_save, sender=KakaoConsultCard)
+def _publish_kakao_card(sender, instance, **kwargs):
+    publish_on_commit('kakao_card', {'customer_id': instance.customer_id, 'state': instance.state})
+
+
+@receiver(setting_changed)
+def _popbill_setting_changed(sender, setting, **kwargs):
+    if setting.startswith('POPBILL_'):
+        clear_popbill_service_cache()
@@ -0,0 +1,398 @@
+"""뱅크다·팝빌 로컬 대역(stand-in) 서버 + 클라이언트 — 통합 테스트·부하 측정용.
+
+운영 서비스 없이 BankdaClient / sync_bankda_deposits / fetch_recent_deposits /
+issue_cash_receipt / bankda_views webhook을 돌려보기 위한 것. 운영 코드 경로는 그대로,
+URL(BANKDA_URL)·서비스 객체(POPBILL_STANDIN_URL)만 바꿔 끼운다.
+
+서버 (표준 라이브러리 ThreadingHTTPServer, 외부 의존 없음):
+  POST /dtsvc/bank_tr.php        뱅크다 거래내역 (bcode 증분 / datefrom~dateto, page_size씩)
+  POST /popbill/easyfinbank/search  팝빌 계좌조회 search() 대역
+  POST /popbill/cashreceipt/issue   팝빌 registIssue() 대역 (같은 MgtKey 재요청은 409)
+  POST /popbill/cashreceipt/info    팝빌 getInfo() 대역 (없는 MgtKey는 404)
+  GET  /stats                    호출 수·주입 오류 수
+
+error_rate 비율로 503, latency_ms만큼 지연을 주입 → 재시도·타임아웃 경로 검증.
+"""
+import json
+import random
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+import requests
+from django.utils import timezone
+
+DEPOSITOR_NAMES = [
+    '김민준', '이서연', '박도윤', '최서윤', '정하준', '강지우', '조은우', '윤하은',
+    '장시우', '임지호', '한수아', '오예준', '서지안', '신도현', '권채원', '황유준',
+]
+
+
+class StandInState:
+    """대역 서버가 내려줄 거래 피드 + 호출 통계.
+
+    transactions: 입금(bkinput>0) 위주, withdraw_ratio 비율로 출금 행 섞음 (동기화가 건너뛰는지 검증).
+    amounts: 지정 시 입금액을 이 목록에서 순환 선택 → 주문 금액과 일치시켜 자동매칭 부하 재현.
+    """
+
+    def __init__(self, deposits=1000, amounts=None, page_size=1000, error_rate=0.0,
+                 latency_ms=0, withdraw_ratio=0.05, seed=0):
+        self.page_size = max(1, page_size)
+        self.error_rate = error_rate
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.injected_errors = 0
+        self.receipt_seq = 0
+        self.receipts = {}  # MgtKey → 발급 정보
+        self.rng = random.Random(seed)
+        self.transactions = self._generate(deposits, amounts, withdraw_ratio)
+
+    def _generate(self, count, amounts, withdraw_ratio):
+        rng = self.rng
+        now = timezone.localtime()
+        start = now - timedelta(days=6)
+        step = (now - start) / max(1, count)
+        balance = 1_000_000
+        rows = []
+        for i in range(count):
+            dt = start + step * i
+            if rng.random() < withdraw_ratio:
+                bkinput, bkoutput = 0, rng.randrange(10, 300) * 100
+            else:
+                bkinput = rng.choice(amounts) if amounts else rng.randrange(50, 1500) * 100
+                bkoutput = 0
+            balance += bkinput - bkoutput
+            rows.append({
+                'bcode': str(100000000 + i),
+                'bkdate': dt.strftime('%Y%m%d'),
+                'bktime': dt.strftime('%H%M%S'),
+                'bkinput': str(int(bkinput)),
+                'bkoutput': str(int(bkoutput)),
+                'bkjango': str(int(balance)),
+                'bkcontent': rng.choice(DEPOSITOR_NAMES),
+                'bkjukyo': '인터넷입금' if bkinput else '체크카드',
+            })
+        return rows
+
+    def count_call(self, path):
+        with self.lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+
+    def should_fail(self):
+        if self.error_rate and self.rng.random() < self.error_rate:
+            with self.lock:
+                self.injected_errors += 1
+            return True
+        return False
+
+    def bankda_page(self, bcode=None, datefrom=None, dateto=None):
+        if bcode:
+            # bcode는 고정 자릿수 숫자 문자열 → 문자열 비교 = 숫자 비교
+            rows = [r for r in self.transactions if r['bcode'] > str(bcode)]
+        else:
+            rows = [
+                r for r in self.transactions
+                if (datefrom or '') <= r['bkdate'] <= (dateto or '99999999')
+            ]
+        return rows[:self.page_size]
+
+    def popbill_page(self, page, per_page):
+        deposits = [r for r in reversed(self.transactions) if int(r['bkinput'])]
+        chunk = deposits[(page - 1) * per_page: page * per_page]
+        return [
+            {
+                'tid': f"standin_{r['bcode']}",
+                'trdate': r['bkdate'],
+                'trtime': r['bktime'],
+                'deposit': r['bkinput'],
+                'balance': r['bkjango'],
+                'remark1': r['bkcontent'],
+                'remark2': r['bkjukyo'],
+            }
+            for r in chunk
+        ]
+
+    def issue_receipt(self, mgt_key, total_amount):
+        """MgtKey당 1건만 발급 — 중복이면 None (팝빌의 문서번호 중복 오류)."""
+        with self.lock:
+            if mgt_key and mgt_key in self.receipts:
+                return None
+            self.receipt_seq += 1
+            info = {
+                'receiptID': f'SI{self.receipt_seq:010d}',
+                'confirmNum': f'NTS{self.receipt_seq:09d}',
+                'totalAmount': str(total_amount),
+            }
+            if mgt_key:
+                self.receipts[mgt_key] = info
+            return info
+
+    def receipt_info(self, mgt_key):
+        with self.lock:
+            return self.receipts.get(mgt_key)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': dict(self.calls),
+                'injected_errors': self.injected_errors,
+                'transactions': len(self.transactions),
+                'receipts_issued': self.receipt_seq,
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'BankdaStandIn/1.0'
+    protocol_version = 'HTTP/1.1'  # keep-alive — BankdaClient Session 재사용 확인용
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if 'json' in (self.headers.get('Content-Type') or ''):
+            try:
+                return json.loads(raw or b'{}')
+            except ValueError:
+                return {}
+        return {k: v[0] for k, v in parse_qs(raw.decode('utf-8')).items()}
+
+    def do_GET(self):
+        self.state.count_call(self.path)
+        if self.path == '/stats':
+            self._send_json(self.state.stats())
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        state = self.state
+        state.count_call(self.path)
+        data = self._read_body()
+        if state.latency_ms:
+            time.sleep(state.latency_ms / 1000)
+        if state.should_fail():
+            self._send_json({'error': 'injected failure'}, status=503)
+            return
+
+        if self.path == '/dtsvc/bank_tr.php':
+            if not data.get('access_token'):
+                self._send_json({'response': {'description': 'access_token 누락', 'bank': []}})
+                return
+            rows = state.bankda_page(data.get('bcode'), data.get('datefrom'), data.get('dateto'))
+            self._send_json({'response': {'description': '', 'bank': rows}})
+        elif self.path == '/popbill/easyfinbank/search':
+            page = int(data.get('Page') or 1)
+            per_page = int(data.get('PerPage') or 100)
+            self._send_json({'list': state.popbill_page(page, per_page)})
+        elif self.path == '/popbill/cashreceipt/issue':
+            info = state.issue_receipt(data.get('MgtKey'), data.get('TotalAmount'))
+            if info is None:
+                self._send_json({'error': '이미 사용중인 문서번호'}, status=409)
+            else:
+                self._send_json({'code': 1, 'message': '발행 완료', **info})
+        elif self.path == '/popbill/cashreceipt/info':
+            info = state.receipt_info(data.get('MgtKey'))
+            if info is None:
+                self._send_json({'error': '문서번호 없음'}, status=404)
+            else:
+                self._send_json(info)
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+
+def start_standin_server(state, host='127.0.0.1', port=0):
+    """대역 서버를 백그라운드 스레드로 기동. port=0이면 빈 포트.
+
+    Returns:
+        (server, base_url) — 종료는 server.shutdown(); server.server_close()
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.state = state
+    thread = threading.Thread(target=server.serve_forever, name='bankda-standin', daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+# ─── 팝빌 SDK 대역 클라이언트 (services._get_*_service가 POPBILL_STANDIN_URL 설정 시 반환) ───
+
+class PopbillStandInError(Exception):
+    """팝빌 SDK의 PopbillException 대역 (code, message)."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class _StandInService:
+    # SDK 속성 호환 — services에서 설정하는 값들
+    IsTest = True
+    IPRestrictOnOff = False
+    UseStaticIP = False
+    UseLocalTimeYN = True
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path, data):
+        try:
+            response = self.session.post(f'{self.base_url}{path}', json=data, timeout=self.timeout)
+        except requests.RequestException as exc:
+            raise PopbillStandInError(-99999999, f'stand-in 연결 실패: {exc}') from exc
+        if response.status_code >= 400:
+            raise PopbillStandInError(-response.status_code, f'stand-in HTTP {response.status_code}')
+        return response.json()
+
+
+class StandInEasyFinBankService(_StandInService):
+    def search(self, CorpNum, BankCode, AccountNumber, SDate=None, EDate=None,
+               TradeType=None, Page=1, PerPage=100, Order='D', **kwargs):
+        payload = self._post('/popbill/easyfinbank/search', {
+            'CorpNum': CorpNum, 'SDate': SDate, 'EDate': EDate, 'Page': Page, 'PerPage': PerPage,
+        })
+        return SimpleNamespace(list=[SimpleNamespace(**row) for row in payload.get('list', [])])
+
+
+class StandInCashReceiptService(_StandInService):
+    def registIssue(self, CorpNum, MgtKey, TradeUsage, TotalAmount, *args, **kwargs):
+        payload = self._post('/popbill/cashreceipt/issue', {
+            'CorpNum': CorpNum, 'MgtKey': MgtKey, 'TradeUsage': TradeUsage, 'TotalAmount': TotalAmount,
+        })
+        return SimpleNamespace(**payload)
+
+    def getInfo(self, CorpNum, MgtKey):
+        payload = self._post('/popbill/cashreceipt/info', {'CorpNum': CorpNum, 'MgtKey': MgtKey})
+        return SimpleNamespace(**payload)
+
+
+# ─── webhook 재현 (뱅크다 → bankda_views 호출을 지정 속도로 재생) ───
+
+# bankda_views IP 화이트리스트 통과용 (BANKDA_ALLOWED_IPS 중 하나)
+BANKDA_REPLAY_IP = '13.209.86.108'
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def latency_summary(values):
+    """초 단위 지연 리스트 → ms 요약 dict."""
+    return {
+        'n': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 1),
+        'p95_ms': round(percentile(values, 95) * 1000, 1),
+        'max_ms': round(max(values) * 1000, 1) if values else 0.0,
+    }
+
+
+class WebhookReplayer:
+    """unconfirmed-orders / order-detail / payment-confirm 호출을 rate(회/초)로 재생.
+
+    target_url 지정 시 실제 HTTP(X-Forwarded-For로 뱅크다 IP 위장),
+    없으면 django.test.Client로 프로세스 내 호출 (미들웨어·URL 라우팅 포함).
+    """
+
+    PATHS = {
+        'unconfirmed': '/bankda/unconfirmed-orders/',
+        'detail': '/bankda/order-detail/',
+        'confirm': '/bankda/payment-confirm/',
+    }
+
+    def __init__(self, order_ids, target_url='', mix=('unconfirmed', 'unconfirmed', 'detail', 'confirm'),
+                 confirm_batch=20, seed=0):
+        self.order_ids = list(order_ids)
+        self.target_url = target_url.rstrip('/')
+        self.mix = list(mix)
+        self.confirm_batch = confirm_batch
+        self.rng = random.Random(seed)
+        self.latencies = {kind: [] for kind in self.PATHS}
+        self.statuses = {}
+        self.etags = {}
+        if self.target_url:
+            self.session = requests.Session()
+            self.session.headers['X-Forwarded-For'] = BANKDA_REPLAY_IP
+        else:
+            from django.test import Client
+            self.client = Client(REMOTE_ADDR=BANKDA_REPLAY_IP, SERVER_NAME='localhost')
+
+    def _send(self, kind):
+        path = self.PATHS[kind]
+        headers = {}
+        body = None
+        if kind == 'unconfirmed':
+            if self.etags.get(kind):
+                headers['If-None-Match'] = self.etags[kind]
+        elif kind == 'detail':
+            body = {'order_id': self.rng.choice(self.order_ids) if self.order_ids else ''}
+        else:
+            picked = self.rng.sample(self.order_ids, min(self.confirm_batch, len(self.order_ids)))
+            body = {'requests': [{'order_id': oid} for oid in picked]}
+
+        if self.target_url:
+            if body is None:
+                response = self.session.get(f'{self.target_url}{path}', headers=headers, timeout=30)
+            else:
+                response = self.session.post(f'{self.target_url}{path}', json=body, headers=headers, timeout=30)
+            status, etag = response.status_code, response.headers.get('ETag')
+        else:
+            extra = {f"HTTP_{k.upper().replace('-', '_')}": v for k, v in headers.items()}
+            if body is None:
+                response = self.client.get(path, **extra)
+            else:
+                response = self.client.post(path, json.dumps(body), content_type='application/json', **extra)
+            status, etag = response.status_code, response.get('ETag')
+        if etag:
+            self.etags[kind] = etag
+        return status
+
+    def run(self, rate, duration):
+        """rate 회/초로 duration 초 동안 재생. 처리 지연이 rate를 넘으면 가능한 최대 속도."""
+        interval = 1.0 / rate if rate > 0 else 0
+        deadline = time.monotonic() + duration
+        next_at = time.monotonic()
+        i = 0
+        while time.monotonic() < deadline:
+            kind = self.mix[i % len(self.mix)]
+            i += 1
+            started = time.monotonic()
+            status = self._send(kind)
+            self.latencies[kind].append(time.monotonic() - started)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            next_at += interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return self.report(duration)
+
+    def report(self, duration):
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            'requests': total,
+            'throughput_rps': round(total / duration, 1) if duration else 0.0,
+            'statuses': self.statuses,
+            'latency': {kind: latency_summary(v) for kind, v in self.latencies.items()},
+        }
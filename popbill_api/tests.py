@@ -0,0 +1,300 @@
+import datetime
+import json
+import threading
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import KakaoConsultCard, Order, Status
+
+from . import services
+
+from .bankda_views import UNCONFIRMED_VERSION_KEY
+from .kanban import KANBAN_REV_KEY
+from .models import CashReceipt, Deposit
+from .standin import BANKDA_REPLAY_IP
+
+
+class DepositQueryPlanTests(TestCase):
+    """대시보드·컨트롤 패널·주문목록 패널의 Deposit 조회가 인덱스를 타는지 (0004 인덱스).
+
+    행 수가 적으면 PostgreSQL 플래너는 seq scan을 고르므로 enable_seqscan=off로
+    '쓸 수 있는 인덱스가 있는지'만 확인한다.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.now()
+        statuses = list(Deposit.MatchStatus.values)
+        Deposit.objects.bulk_create([
+            Deposit(
+                transaction_id=f'T{i:05d}',
+                transaction_date=base - datetime.timedelta(minutes=i),
+                depositor_name=f'입금자{i}',
+                amount=10000 + i,
+                match_status=statuses[i % len(statuses)],
+            )
+            for i in range(200)
+        ])
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f'{index_names} 미사용:\n{plan}',
+        )
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('SCAN popbill_api_deposit\n', plan + '\n')
+
+    def test_unmatched_latest(self):
+        # popbill_dashboard / control_panel / OrderListView 미매칭 목록
+        qs = Deposit.objects.filter(match_status=Deposit.MatchStatus.UNMATCHED)[:10]
+        self.assertUsesIndex(qs, 'deposit_status_trdate_idx', 'deposit_unconfirmed_idx')
+
+    def test_recent_deposits(self):
+        # popbill_dashboard 최근 입금
+        self.assertUsesIndex(Deposit.objects.all()[:20], 'deposit_trdate_idx')
+
+    def test_matched_unconfirmed(self):
+        # control_panel 확인 대기 (confirmed_at IS NULL → 부분 인덱스)
+        qs = Deposit.objects.filter(
+            match_status__in=[Deposit.MatchStatus.AUTO_MATCHED, Deposit.MatchStatus.MANUAL_MATCHED],
+            confirmed_at__isnull=True,
+        )[:5]
+        self.assertUsesIndex(qs, 'deposit_unconfirmed_idx')
+
+    def test_matched_recent(self):
+        # OrderListView 최근 매칭
+        qs = Deposit.objects.filter(
+            match_status__in=[Deposit.MatchStatus.AUTO_MATCHED, Deposit.MatchStatus.MANUAL_MATCHED],
+        )[:5]
+        self.assertUsesIndex(qs, 'deposit_status_trdate_idx')
+
+
+class CacheVersionOnCommitTests(TestCase):
+    """캐시 버전은 커밋 후에만 올라감 — 커밋 전 요청이 옛 데이터로 새 버전 캐시를 채우지 않게."""
+
+    def test_unconfirmed_orders_version_bumped_after_commit(self):
+        before = cache.get(UNCONFIRMED_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Deposit.objects.create(
+                transaction_id='T-COMMIT', transaction_date=timezone.now(),
+                depositor_name='입금자', amount=10000,
+            )
+            self.assertEqual(cache.get(UNCONFIRMED_VERSION_KEY), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get(UNCONFIRMED_VERSION_KEY), before)
+
+    def test_kanban_version_bumped_after_commit(self):
+        before = cache.get(KANBAN_REV_KEY)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            KakaoConsultCard.objects.create(customer_id='c-commit', display_name='홍길동')
+            self.assertEqual(cache.get(KANBAN_REV_KEY), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get(KANBAN_REV_KEY), before)
+
+
+class PopbillServiceCacheTests(TestCase):
+    """팝빌 서비스 캐시 — 설정별 프로세스 1개 공유, 호출은 직렬화."""
+
+    def setUp(self):
+        services.clear_popbill_service_cache()
+        self.addCleanup(services.clear_popbill_service_cache)
+
+    def test_one_instance_shared_across_threads(self):
+        seen = []
+        with self.settings(POPBILL_STANDIN_URL='http://127.0.0.1:9'):
+            threads = [threading.Thread(target=lambda: seen.append(services._get_cashreceipt_service()))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len({id(service) for service in seen}), 1)
+            self.assertIs(services._get_cashreceipt_service(), seen[0])
+        with self.settings(POPBILL_STANDIN_URL='http://127.0.0.1:10'):
+            self.assertIsNot(services._get_cashreceipt_service(), seen[0])
+
+    def test_calls_are_serialized(self):
+        active, peak = [0], [0]
+
+        class SlowService:
+            def registIssue(self, *args):
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                time.sleep(0.01)
+                active[0] -= 1
+
+        service = services._SerializedService(SlowService())
+        threads = [threading.Thread(target=service.registIssue) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 1)
+
+
+class PaymentConfirmTests(TestCase):
+    """뱅크다 payment-confirm — 건수와 무관한 쿼리 수, Deposit upsert·주문 상태 이동."""
+
+    def setUp(self):
+        self.orders = [
+            Order.objects.create(
+                smartstore_order_id=f'SS-CONFIRM-{i}', status=Status.NEW, payment_date=timezone.now(),
+                customer_name=f'고객{i}', total_order_amount=Decimal('10000') * (i + 1),
+            )
+            for i in range(5)
+        ]
+        self.consulting = self.orders[4]
+        Order.objects.filter(pk=self.consulting.pk).update(status=Status.CONSULTING)
+
+    def confirm(self, *order_ids):
+        response = self.client.post(
+            reverse('bankda_payment_confirm'),
+            json.dumps({'requests': [{'order_id': oid} for oid in order_ids]}),
+            content_type='application/json', REMOTE_ADDR=BANKDA_REPLAY_IP,
+        )
+        self.assertEqual(response.status_code, 200)
+        return [row['description'] for row in response.json()['orders']]
+
+    def test_batch_is_constant_queries(self):
+        ids = [o.smartstore_order_id for o in self.orders]
+        # savepoint + 주문 IN 조회(잠금) + Deposit upsert + 상태 update + release
+        with self.assertNumQueries(5):
+            descriptions = self.confirm(*ids, 'SS-MISSING', '')
+        self.assertEqual(descriptions, ['OK'] * 5 + ['not_found', 'invalid'])
+
+        self.assertEqual(
+            dict(Order.objects.filter(pk__in=[o.pk for o in self.orders]).values_list('smartstore_order_id', 'status')),
+            {o.smartstore_order_id: Status.CONSULTING for o in self.orders},
+        )
+        new = Order.objects.get(pk=self.orders[0].pk)
+        self.assertIsNotNone(new.due_date)
+        self.assertIsNone(Order.objects.get(pk=self.consulting.pk).due_date)   # 이미 CONSULTING → 그대로
+
+        deposits = Deposit.objects.filter(transaction_id__startswith='bankda_confirm_')
+        self.assertEqual(deposits.count(), 5)
+        deposit = deposits.get(matched_order=self.orders[1])
+        self.assertEqual(
+            (deposit.transaction_id, deposit.amount, deposit.match_status, deposit.source),
+            ('bankda_confirm_SS-CONFIRM-1', Decimal('20000'), Deposit.MatchStatus.AUTO_MATCHED, Deposit.Source.BANKDA),
+        )
+        self.assertIsNone(deposit.confirmed_at)
+
+    def test_resent_confirmation_updates_existing_deposit(self):
+        order = self.orders[0]
+        self.confirm(order.smartstore_order_id)
+        Order.objects.filter(pk=order.pk).update(total_order_amount=Decimal('12345'))
+
+        with self.assertNumQueries(4):   # NEW 주문이 없으니 상태 update 없음
+            self.assertEqual(self.confirm(order.smartstore_order_id), ['OK'])
+        [deposit] = Deposit.objects.filter(transaction_id=f'bankda_confirm_{order.smartstore_order_id}')
+        self.assertEqual((deposit.amount, deposit.matched_order_id), (Decimal('12345'), order.pk))
+        order.refresh_from_db()
+        self.assertEqual(order.status, Status.CONSULTING)
+
+
+class CashReceiptIssueTests(TestCase):
+    """현금영수증 발급 (services.issue_cash_receipt / 일괄 발급)."""
+
+    def setUp(self):
+        self.order = Order.objects.create(
+            smartstore_order_id='SS-RECEIPT-1', payment_date=timezone.now(),
+            customer_name='홍길동', customer_phone='010-1234-5678', total_order_amount=Decimal('33000'),
+        )
+
+    def make_receipt(self, **kwargs):
+        return CashReceipt.objects.create(
+            order=self.order, identity_type=CashReceipt.IdentityType.PHONE,
+            identity_number='01012345678', amount=Decimal('33000'), **kwargs
+        )
+
+    def test_setup_errors_fail_claimed_receipt(self):
+        # 일괄 발급이 PROCESSING으로 선점한 건 — 설정 오류로 끝나도 PROCESSING에 남지 않아야 함
+        receipt = self.make_receipt(issue_status=CashReceipt.IssueStatus.PROCESSING)
+        with mock.patch.object(services, '_get_cashreceipt_service', return_value=None):
+            result = services.issue_cash_receipt(receipt)
+        self.assertFalse(result['success'])
+        receipt.refresh_from_db()
+        self.assertEqual(receipt.issue_status, CashReceipt.IssueStatus.FAILED)
+        self.assertEqual(receipt.error_message, 'popbill 패키지 미설치')
+
+        receipt = self.make_receipt(issue_status=CashReceipt.IssueStatus.PROCESSING)
+        with self.settings(POPBILL_CORP_NUM=''):
+            services.issue_cash_receipt(receipt, service=mock.Mock())
+        receipt.refresh_from_db()
+        self.assertEqual(receipt.issue_status, CashReceipt.IssueStatus.FAILED)
+        self.assertEqual(receipt.error_message, '사업자번호 미설정')
+
+    def test_retry_reuses_mgt_key_and_detects_accepted_issue(self):
+        # 첫 요청은 팝빌이 접수했지만 응답이 끊김 → 재시도는 같은 문서번호라 중복 오류, 조회로 발급 확인
+        receipt = self.make_receipt()
+        error = type('PopbillException', (Exception,), {})
+        timeout, duplicate = error('timeout'), error('이미 사용중인 문서번호')
+        timeout.code, duplicate.code = services.POPBILL_NETWORK_ERROR_CODE, -14000003
+        service = mock.Mock()
+        service.registIssue.side_effect = [timeout, duplicate]
+        service.getInfo.return_value = SimpleNamespace(totalAmount='33000', confirmNum='NTS-1')
+
+        with self.settings(POPBILL_CORP_NUM='1234567890'):
+            result = services.issue_cash_receipt(receipt, service=service, max_retries=2, sleep=lambda s: None)
+
+        self.assertTrue(result['success'])
+        mgt_key = services.cash_receipt_mgt_key(receipt)
+        self.assertEqual([c.args[1] for c in service.registIssue.call_args_list], [mgt_key, mgt_key])
+        service.getInfo.assert_called_once_with('1234567890', mgt_key)
+        receipt.refresh_from_db()
+        self.assertEqual(receipt.issue_status, CashReceipt.IssueStatus.ISSUED)
+        self.assertEqual((receipt.popbill_receipt_id, receipt.popbill_nts_confirm_num), (mgt_key, 'NTS-1'))
+        self.assertEqual(receipt.attempts, 2)
+
+    def test_duplicate_key_with_other_amount_fails(self):
+        receipt = self.make_receipt()
+        duplicate = Exception('이미 사용중인 문서번호')
+        duplicate.code = -14000003
+        service = mock.Mock()
+        service.registIssue.side_effect = duplicate
+        service.getInfo.return_value = SimpleNamespace(totalAmount='1000', confirmNum='NTS-OTHER')
+
+        with self.settings(POPBILL_CORP_NUM='1234567890'):
+            result = services.issue_cash_receipt(receipt, service=service)
+
+        self.assertFalse(result['success'])
+        receipt.refresh_from_db()
+        self.assertEqual(receipt.issue_status, CashReceipt.IssueStatus.FAILED)
+
+    def test_bulk_issue_skips_pending_and_ignores_bad_ids(self):
+        self.client.force_login(User.objects.create_user('staff'))
+        self.make_receipt()   # 아직 발급 대기 중인 건 → 다시 만들지 않음
+        other = Order.objects.create(
+            smartstore_order_id='SS-RECEIPT-2', payment_date=timezone.now(),
+            customer_name='김철수', customer_phone='010-9999-0000', total_order_amount=Decimal('10000'),
+        )
+        with mock.patch.object(services, 'start_bulk_cash_receipt_issue') as start:
+            response = self.client.post(reverse('issue_receipts_bulk'), {
+                'order_ids': ['abc', str(self.order.pk), '', str(other.pk)],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(CashReceipt.objects.filter(order=self.order).count(), 1)
+        [new] = CashReceipt.objects.filter(order=other)
+        start.assert_called_once_with([new.pk])
+
+        with mock.patch.object(services, 'start_bulk_cash_receipt_issue') as start:
+            response = self.client.post(reverse('issue_receipts_bulk'), {'order_ids': ['x1']})
+        self.assertEqual(response.status_code, 302)
+        start.assert_not_called()
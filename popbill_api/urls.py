@@ -16,7 +16,13 @@ urlpatterns = [
     path('receipt/<int:order_id>/form/', views.issue_receipt_form, name='issue_receipt_form'),
     path('receipt/<int:order_id>/issue/', views.issue_receipt, name='issue_receipt'),
     path('receipt/history/', views.receipt_history, name='receipt_history'),
+    path('receipt/bulk/', views.issue_receipts_bulk, name='issue_receipts_bulk'),
+    path('receipt/bulk/<str:batch_key>/status/', views.receipt_batch_status, name='receipt_batch_status'),
 
     # 컨트롤 패널 팝업
     path('control-panel/', views.control_panel, name='control_panel'),
+    path('control-panel/kanban/', views.control_panel_kanban, name='control_panel_kanban'),
+
+    # 실시간 push (SSE)
+    path('events/', views.event_stream_view, name='popbill_events'),
 ]
@@ -5,6 +5,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
@@ -208,11 +209,101 @@ def issue_receipt(request, order_id):
     return _back(request)
 
 
+@login_required
+@require_POST
+def issue_receipts_bulk(request):
+    """현금영수증 일괄 발급 — 선택 주문들을 휴대폰번호(주문 연락처)로 발급.
+
+    영수증 행(PENDING)만 만들고 실제 발급은 백그라운드 스레드. 진행 상황은
+    발급 이력(?batch=) 또는 receipt_batch_status JSON으로 확인.
+    """
+    import uuid
+
+    # 숫자가 아닌 id는 버림 (order_id__in 조회가 ValueError로 500 나지 않게)
+    order_ids = sorted({int(v) for v in request.POST.getlist('order_ids') if v.strip().isdigit()})
+    trade_type = request.POST.get('trade_type', CashReceipt.TradeType.INCOME_DEDUCTION)
+    if trade_type not in CashReceipt.TradeType.values:
+        trade_type = CashReceipt.TradeType.INCOME_DEDUCTION
+    if not order_ids:
+        messages.error(request, "발급할 주문을 선택해주세요.")
+        return _back(request)
+
+    already_issued = set(
+        CashReceipt.objects.filter(
+            order_id__in=order_ids,
+            issue_status__in=[
+                CashReceipt.IssueStatus.PENDING,
+                CashReceipt.IssueStatus.PROCESSING,
+                CashReceipt.IssueStatus.ISSUED,
+            ],
+        ).values_list('order_id', flat=True)
+    )
+    batch_key = uuid.uuid4().hex
+    receipts = []
+    skipped = []
+    for order in Order.objects.filter(pk__in=order_ids):
+        phone = (order.customer_phone or '').replace('-', '').strip()
+        if order.pk in already_issued or not phone:
+            skipped.append(order.customer_name)
+            continue
+        receipts.append(CashReceipt(
+            order=order,
+            identity_type=CashReceipt.IdentityType.PHONE,
+            identity_number=phone,
+            trade_type=trade_type,
+            amount=order.total_order_amount,
+            batch_key=batch_key,
+        ))
+    CashReceipt.objects.bulk_create(receipts)
+
+    if receipts:
+        receipt_ids = list(
+            CashReceipt.objects.filter(batch_key=batch_key).values_list('pk', flat=True)
+        )
+        services.start_bulk_cash_receipt_issue(receipt_ids)
+        messages.success(request, f"현금영수증 {len(receipts)}건 일괄 발급을 시작했습니다.")
+    if skipped:
+        messages.warning(
+            request,
+            f"{len(skipped)}건 제외 (발급 완료·대기·진행 중 또는 연락처 없음): {', '.join(skipped[:10])}"
+        )
+    if not receipts:
+        return _back(request)
+    return redirect(f"{reverse('receipt_history')}?batch={batch_key}")
+
+
+@login_required
+def receipt_batch_status(request, batch_key):
+    """일괄 발급 진행 상황 (AJAX)"""
+    rows = list(
+        CashReceipt.objects.filter(batch_key=batch_key)
+        .values('pk', 'order_id', 'issue_status', 'attempts', 'error_message')
+    )
+    counts = {}
+    for row in rows:
+        counts[row['issue_status']] = counts.get(row['issue_status'], 0) + 1
+    done = all(
+        row['issue_status'] in (CashReceipt.IssueStatus.ISSUED, CashReceipt.IssueStatus.FAILED)
+        for row in rows
+    )
+    return JsonResponse({'batch': batch_key, 'done': done, 'counts': counts, 'receipts': rows})
+
+
 @login_required
 def receipt_history(request):
-    """현금영수증 발급 이력"""
+    """현금영수증 발급 이력 (?batch=로 일괄 발급 묶음만)"""
     receipts = CashReceipt.objects.select_related('order').all()
-    return render(request, 'popbill_api/receipt_history.html', {'receipts': receipts})
+    batch_key = (request.GET.get('batch') or '').strip()
+    if batch_key:
+        receipts = receipts.filter(batch_key=batch_key)
+    batch_pending = bool(batch_key) and receipts.filter(
+        issue_status__in=[CashReceipt.IssueStatus.PENDING, CashReceipt.IssueStatus.PROCESSING],
+    ).exists()
+    return render(request, 'popbill_api/receipt_history.html', {
+        'receipts': receipts,
+        'batch_key': batch_key,
+        'batch_pending': batch_pending,
+    })
 
 
 # ─── 컨트롤 패널 (팝업창) ───
@@ -228,47 +319,13 @@ def control_panel(request):
     consulting_orders = Order.objects.filter(status=Status.CONSULTING).order_by('-payment_date')[:15]
     recent_receipts = CashReceipt.objects.filter(issue_status=CashReceipt.IssueStatus.ISSUED).order_by('-issued_at')[:5]
 
-    # 칸반 데이터 — 7칸, 자사몰 status 정식 세분화 + 보류 별도
-    active_orders = (
-        Order.objects
-        .exclude(status__in=[Status.ARCHIVED, Status.CANCELED])  # 정산목록·주문취소 제외
-        .order_by('-payment_date')
-    )
-    # 칸반 8칸 — 대기중·상담중(카톡 카드) + 등록·결제·제작준비·제작중·발송·결과통보(주문 status)
-    # 보류(on_hold)·주문취소 칸 없음: is_on_hold 주문은 각자 status 칸에 표시
+    # 칸반 — 스냅샷(kanban.py) 공용. 이후 갱신은 control_panel_kanban ?since= 델타
+    from .kanban import get_kanban_snapshot
+    snapshot = get_kanban_snapshot()
     kanban_data = {
-        'waiting': [],     # 카톡 WAITING (주문 미생성)
-        'consulting': [],  # 카톡 CONSULTING (주문 미생성)
-        'registered': [],  # NEW(등록)
-        'payment': [],     # CONSULTING(결제)
-        'prep': [],        # PREP(제작준비)
-        'producing': [],   # PRODUCED(제작중)
-        'shipped': [],     # COMPLETED(발송)
-        'notified': [],    # SETTLED(결과통보)
+        col: [snapshot['cards'][key] for key in keys]
+        for col, keys in snapshot['columns'].items()
     }
-    _status_to_col = {
-        Status.NEW: 'registered',
-        Status.CONSULTING: 'payment',
-        Status.PREP: 'prep',
-        Status.PRODUCED: 'producing',
-        Status.COMPLETED: 'shipped',
-        Status.SETTLED: 'notified',
-    }
-    for o in active_orders:
-        col = _status_to_col.get(o.status)
-        if col:
-            kanban_data[col].append(o)
-
-    # 카톡 상담 카드 (단계 1a-2) — ktalk이 push한 카톡 고객. 주문 미매칭 + dismissed 아님만
-    from orders.models import KakaoConsultCard
-    matched_names = {o.kakao_chat_name for o in active_orders if o.kakao_chat_name}
-    for card in KakaoConsultCard.objects.filter(dismissed_at__isnull=True, order__isnull=True):
-        if card.display_name and card.display_name in matched_names:
-            continue  # 이미 주문 있음 → 주문 카드로 표시되므로 중복 제외
-        if card.state == KakaoConsultCard.State.WAITING:
-            kanban_data['waiting'].append(card)
-        else:
-            kanban_data['consulting'].append(card)
 
     # 칸 폭 가중치를 카드 수에 비례 (÷3) — 많은 칸일수록 가로로 넓게 펼쳐 세로를 짧게
     import math
@@ -282,5 +339,42 @@ def control_panel(request):
         'recent_receipts': recent_receipts,
         'kanban_data': kanban_data,
         'kanban_cols': kanban_cols,
+        'kanban_version': snapshot['version'],
     }
     return render(request, 'popbill_api/control_panel.html', context)
+
+
+@login_required
+def control_panel_kanban(request):
+    """컨트롤 패널 칸반 JSON — ?since=<version> 주면 그 이후 바뀐 카드만 (kanban.kanban_delta)"""
+    from .kanban import kanban_delta
+    return JsonResponse(kanban_delta(request.GET.get('since') or None))
+
+
+async def event_stream_view(request):
+    """SSE — 주문·입금 매칭·카톡 카드 변경 push (events.py). ASGI로 띄워야 실시간.
+
+    WSGI(동기 워커)면 204: StreamingHttpResponse가 async 이터레이터를 끝까지 읽은 뒤에야
+    보내므로 워커 1개를 최대 STREAM_MAX_SECONDS 붙잡고 이벤트는 하나도 못 보냄. 브라우저
+    EventSource는 204를 받으면 재접속하지 않고, 페이지는 기존 주기 갱신(폴링)으로 동작.
+    async 뷰라 login_required 대신 직접 확인 (Django 4.2 데코레이터는 동기 뷰 전용).
+    """
+    from asgiref.sync import sync_to_async
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponse, StreamingHttpResponse
+    from .events import event_stream
+
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return JsonResponse({'error': '로그인 필요'}, status=401)
+
+    response = StreamingHttpResponse(
+        event_stream(request.headers.get('Last-Event-ID')),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'   # nginx 버퍼링 끔
+    return response
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+실시간 push(/popbill/events/ SSE, popbill_api/events.py)는 프로세스 내 브로커라
+이 application을 단일 프로세스 ASGI 서버로 띄워야 함:
+    gunicorn tshirt_management.asgi:application -k uvicorn.workers.UvicornWorker -w 1
 """
 
 import os
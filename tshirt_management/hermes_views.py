@@ -10,12 +10,33 @@ API 키 인증 경유. Phase 1 = 읽기 전용. 쓰기는 정기 백업 체계 
   * settings_app.APISettings  — 뱅크다·팝빌·카톡 등 자격증명 보관 (원칙 12)
   * auth / sessions / admin / contenttypes — 비밀번호 해시·세션키 등 침해 위험. 비즈니스 자료 아님
 """
+import base64
+import difflib
+import functools
+import hashlib
 import json
+import math
 import os
+import re
+import time as time_module
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
 
+from asgiref.sync import sync_to_async
 from django.apps import apps
-from django.core.exceptions import FieldError
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, FieldError
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek, TruncYear
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
@@ -25,6 +46,19 @@ DENY_APPS = {"auth", "sessions", "admin", "contenttypes"}
 DENY_MODELS = {"settings_app.apisettings"}
 # 한 호출 최대 행 수 — 과다 조회/덤프 방지
 MAX_LIMIT = 500
+# 묶음 요청(queries) 최대 쿼리 수
+MAX_BATCH_QUERIES = 10
+# 키별 요청 한도 고정 창: (창 길이 초, 한도 설정 이름)
+RATE_WINDOWS = ((60, "HERMES_RATE_PER_MINUTE"), (10, "HERMES_RATE_BURST"))
+# export 스트림 — DB에서 한 번에 가져오는 행 수 (PostgreSQL 서버측 커서 fetch 단위) 기본·범위
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_CHUNK_RANGE = (100, 10000)
+# 집계(group_by / aggregates) — 허용 함수·날짜 절삭 단위. 별칭은 영문·숫자·_ ("__" 불가)
+AGGREGATE_FUNCS = {"sum": Sum, "count": Count, "avg": Avg, "min": Min, "max": Max}
+TRUNC_FUNCS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth, "quarter": TruncQuarter, "year": TruncYear}
+ALIAS_RE = re.compile(r"^[A-Za-z][A-Za-z0-9]*(_[A-Za-z0-9]+)*$")
+# total 계산 방식. after(다음 페이지)가 있으면 기본 none — 첫 페이지에서 받은 total 재사용
+COUNT_MODES = {"exact", "estimate", "none"}
 
 
 def _check_hermes_api_key(request):
@@ -34,6 +68,396 @@ def _check_hermes_api_key(request):
     return bool(expected) and provided == expected
 
 
+class QueryError(ValueError):
+    """요청 오류 → status 응답. code·extra는 에이전트가 분기할 구조화 필드.
+
+    code: invalid_request(400) | denied(403) | seq_scan_rejected·statement_timeout(422) | rate_limited(429)
+    """
+
+    def __init__(self, message, status=400, code=None, **extra):
+        super().__init__(message)
+        self.status = status
+        self.code = code or ("denied" if status == 403 else "invalid_request")
+        self.extra = extra
+
+
+def _error_response(e):
+    response = JsonResponse(
+        {"success": False, "error": str(e), "code": e.code, **e.extra},
+        status=e.status,
+        json_dumps_params={"ensure_ascii": False},
+    )
+    if "retry_after" in e.extra:
+        response["Retry-After"] = str(math.ceil(e.extra["retry_after"]))
+    return response
+
+
+_UNKNOWN_FIELD_RE = re.compile(r"Cannot resolve keyword '([^']+)' into field\. Choices are: (.+)$")
+
+
+def _field_error(e):
+    """FieldError → QueryError + 힌트: 그 모델의 필드 목록(fields), 비슷한 이름(did_you_mean)."""
+    hint = {"schema": "/hermes/schema/"}
+    match = _UNKNOWN_FIELD_RE.search(str(e))
+    if match:
+        keyword, choices = match.group(1), [c.strip() for c in match.group(2).split(",")]
+        hint["fields"] = choices
+        hint["did_you_mean"] = difflib.get_close_matches(keyword, choices, n=3, cutoff=0.5)
+    return QueryError(f"필드 오류: {e}", **hint)
+
+
+def _window_add(key, cost, timeout):
+    """고정 창 카운터에 cost 더하고 새 값 반환 — cache.add + cache.incr라 같은 캐시 안에선 원자적."""
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key, cost)
+    except ValueError:   # add 직후 만료·축출
+        cache.set(key, cost, timeout)
+        return cost
+
+
+def _take_token(request, cost=1):
+    """키별 요청 한도 (cache 고정 창 카운터). 쿼리 1건 = 1회 (묶음은 쿼리 수만큼).
+
+    분당 HERMES_RATE_PER_MINUTE회 + 10초당 HERMES_RATE_BURST회. 넘으면 QueryError(429, retry_after =
+    창이 끝날 때까지 초), 거절된 요청은 세지 않음. 최선 노력(best-effort) 한도: 카운터는 캐시
+    백엔드 단위라 locmem이면 프로세스별 (gunicorn 워커 3개면 실제 한도는 최대 3배).
+    여러 프로세스가 한도를 공유하려면 CACHE_URL을 redis 등으로.
+    """
+    if cost > settings.HERMES_RATE_BURST > 0:   # 기다려도 못 받음 → 재시도 대상 아님
+        raise QueryError(f"묶음 쿼리 {cost}건이 순간 한도({settings.HERMES_RATE_BURST}건) 초과 — 나눠서 요청")
+    client = hashlib.sha256(request.headers.get("X-Hermes-Key", "").encode()).hexdigest()[:16]
+    now = time_module.time()
+    taken = []
+    for seconds, setting in RATE_WINDOWS:
+        limit = getattr(settings, setting)
+        if limit <= 0:
+            continue
+        window = int(now // seconds)
+        key = f"hermes:rate:{client}:{seconds}:{window}"
+        taken.append(key)
+        if _window_add(key, cost, seconds + 5) > limit:
+            for done in taken:   # 거절 — 이번 요청 몫은 되돌림
+                try:
+                    cache.decr(done, cost)
+                except ValueError:
+                    pass
+            retry_after = round((window + 1) * seconds - now, 1)
+            raise QueryError(
+                f"요청 한도 초과 — {retry_after}초 후 재시도", status=429, code="rate_limited",
+                retry_after=retry_after,
+            )
+
+
+def _seq_scan_guard(execute, sql, params, many, context):
+    """execute_wrapper — SELECT마다 EXPLAIN(실행 안 함)해서 큰 표 순차 스캔이면 거부 (PostgreSQL)."""
+    if sql.lstrip()[:6].upper() == "SELECT":
+        raw = context["cursor"].cursor   # 래퍼를 다시 타지 않게 DB-API 커서 직접
+        raw.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = raw.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        tables, stack = set(), [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if node.get("Node Type") == "Seq Scan":
+                tables.add(node["Relation Name"])
+            stack.extend(node.get("Plans", []))
+        if tables:
+            raw.execute("SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)", [list(tables)])
+            big = {name: int(rows) for name, rows in raw.fetchall() if rows >= settings.HERMES_SEQSCAN_MIN_ROWS}
+            if big:
+                raise QueryError(
+                    f"큰 표 전체 스캔 거부: {', '.join(sorted(big))}", status=422, code="seq_scan_rejected",
+                    tables=big,
+                    hint="인덱스 걸린 필드(id·날짜·상태 등)로 filters를 좁히거나, total이 필요 없으면 count: none, "
+                         "대략이면 count: estimate, 전체가 필요하면 /hermes/export/",
+                )
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def _cost_guard(streaming=False, snapshot=False):
+    """hermes 조회 1건 실행 범위: 트랜잭션 + 문장 시간 제한 (+ 선택적 순차 스캔 거부).
+
+    snapshot=True(묶음 요청): PostgreSQL REPEATABLE READ READ ONLY — 모든 쿼리가 같은 시점 자료를 봄
+    (기본 READ COMMITTED는 문장마다 새 스냅샷). SQLite는 트랜잭션 자체가 단일 스냅샷.
+
+    - PostgreSQL: SET LOCAL statement_timeout (이 트랜잭션 안 문장마다)
+    - SQLite(개발): progress handler로 제한 시간 지나면 중단. 스트리밍(export)은 행을 내보내는
+      동안에도 한 문장이 이어지므로 적용 안 함
+    - 시간 초과 → QueryError(422, statement_timeout)
+    """
+    timeout_ms = settings.HERMES_STATEMENT_TIMEOUT_MS
+    try:
+        outermost = not connection.in_atomic_block
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    if snapshot and outermost:   # 트랜잭션 첫 문장이어야 함
+                        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                    if timeout_ms:
+                        cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            sqlite_handler = timeout_ms and connection.vendor == "sqlite" and not streaming
+            if sqlite_handler:
+                deadline = time_module.monotonic() + timeout_ms / 1000
+                connection.ensure_connection()
+                connection.connection.set_progress_handler(lambda: time_module.monotonic() > deadline, 10000)
+            try:
+                if settings.HERMES_SEQSCAN_GUARD and connection.vendor == "postgresql" and not streaming:
+                    with connection.execute_wrapper(_seq_scan_guard):
+                        yield
+                else:
+                    yield
+            finally:
+                if sqlite_handler:
+                    connection.connection.set_progress_handler(None, 0)
+    except OperationalError as e:
+        # PostgreSQL query_canceled(57014) / SQLite interrupted
+        if getattr(e.__cause__, "pgcode", None) == "57014" or "interrupted" in str(e):
+            raise QueryError(
+                f"조회 시간 제한({timeout_ms}ms) 초과", status=422, code="statement_timeout",
+                hint="filters로 범위를 좁히거나 limit을 줄이기. 큰 표 전체는 /hermes/export/",
+            )
+        raise
+
+
+def _is_denied(model):
+    return model._meta.app_label.lower() in DENY_APPS or model._meta.label_lower in DENY_MODELS
+
+
+def _check_paths(model, paths):
+    """필드 경로(order__customer_name 등)가 관계를 타고 차단 모델로 넘어가면 403.
+
+    filters·exclude·fields·order_by·group_by·aggregates 모든 경로 공통 — 직접 조회만이 아니라
+    조인 경유로도 차단 모델 값이 나가지 않게. 관계가 아닌 부분(lookup·transform·오타)에서 멈춤
+    (오타는 ORM이 FieldError로 판정).
+    """
+    for path in paths:
+        current = model
+        for part in str(path).lstrip("-").split("__"):
+            try:
+                field = current._meta.get_field(part)
+            except FieldDoesNotExist:
+                break
+            if not field.is_relation or field.related_model is None:
+                break
+            current = field.related_model
+            if _is_denied(current):
+                raise QueryError(f"{path}: 조회 차단된 모델({current._meta.label}) 경유", status=403)
+
+
+def _load_json(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except (ValueError, json.JSONDecodeError):
+        raise QueryError("JSON 파싱 실패")
+    if not isinstance(data, dict):
+        raise QueryError("body는 JSON 객체여야 함")
+    return data
+
+
+def _parse_body(request):
+    """body JSON 파싱 + 모델 확인·차단 검사 (export용). 반환: (data, model_label, model)."""
+    data = _load_json(request)
+    return (data, *_resolve_model(data))
+
+
+def _resolve_model(data):
+    """쿼리 스펙의 model 확인·차단 검사. 반환: (model_label, model)."""
+    model_label = (data.get("model") or "")
+    model_label = model_label.strip() if isinstance(model_label, str) else ""
+    if not model_label:
+        raise QueryError("model 필수 (예: orders.Order)")
+
+    # 차단 검사
+    if "." not in model_label:
+        raise QueryError("model은 app_label.Model 형식 (예: orders.Order)")
+    app_label, model_name = model_label.split(".", 1)
+    if app_label.lower() in DENY_APPS or model_label.lower() in DENY_MODELS:
+        raise QueryError(f"{model_label}: 조회 차단된 모델", status=403)
+
+    try:
+        model = apps.get_model(app_label, model_name)
+    except (ValueError, LookupError):
+        raise QueryError(f"모델 없음: {model_label}")
+    if _is_denied(model):   # 대소문자 변형 등으로 위 검사를 비껴간 경우
+        raise QueryError(f"{model_label}: 조회 차단된 모델", status=403)
+    return model_label, model
+
+
+def _filtered_queryset(model, data):
+    """filters/exclude 적용 QuerySet (잘못된 필드는 FieldError 그대로)."""
+    filters = data.get("filters") or {}
+    exclude = data.get("exclude") or {}
+    if not all(isinstance(x, dict) for x in (filters, exclude)):
+        raise QueryError("filters/exclude는 객체여야 함")
+    _check_paths(model, [*filters, *exclude])
+    qs = model.objects.all()
+    if filters:
+        qs = qs.filter(**filters)
+    if exclude:
+        qs = qs.exclude(**exclude)
+    return qs
+
+
+def _ordering(model, order_by):
+    """정렬 키 [(필드 경로, 내림차순 여부)] — 마지막은 항상 pk (행 순서 결정적 → 커서 가능).
+
+    order_by 생략 시 모델 기본 정렬(Meta.ordering). 'pk'는 실제 pk 필드명으로.
+    """
+    if not isinstance(order_by, list) or not all(isinstance(x, str) and x for x in order_by):
+        raise QueryError("order_by는 필드명 문자열 배열이어야 함")
+    if not order_by:
+        order_by = [x for x in model._meta.ordering if isinstance(x, str)]
+    pk_name = model._meta.pk.name
+    keys = []
+    for item in order_by:
+        if item == "?":
+            raise QueryError("무작위 정렬('?')은 지원하지 않음")
+        _check_paths(model, [item])
+        desc = item.startswith("-")
+        path = item.lstrip("-")
+        path = pk_name if path == "pk" else path
+        if path not in [k for k, _ in keys]:
+            keys.append((path, desc))
+    if pk_name not in [k for k, _ in keys]:
+        keys.append((pk_name, False))
+    return keys
+
+
+def _order_exprs(keys):
+    # NULL은 방향 무관 항상 마지막 (DB마다 기본 위치가 달라 커서 조건과 어긋나지 않게 고정)
+    return [F(path).desc(nulls_last=True) if desc else F(path).asc(nulls_last=True) for path, desc in keys]
+
+
+def _cursor_value(value):
+    # DjangoJSONEncoder는 datetime을 밀리초로 자름 → 같은 ms 행이 커서 경계에서 누락/중복
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _encode_cursor(keys, row):
+    payload = {"o": [("-" if desc else "") + path for path, desc in keys],
+               "v": [_cursor_value(row[path]) for path, _ in keys]}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(keys, token):
+    """after 토큰 → 정렬 키별 값. 다른 정렬로 만든 토큰이면 거부."""
+    try:
+        raw = base64.urlsafe_b64decode(str(token) + "=" * (-len(str(token)) % 4))
+        payload = json.loads(raw)
+        order, values = payload["o"], payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise QueryError("after 토큰 형식 오류")
+    if order != [("-" if desc else "") + path for path, desc in keys] or len(values) != len(keys):
+        raise QueryError("after 토큰의 정렬이 요청 order_by와 다름 — 같은 order_by로 이어서 조회")
+    return values
+
+
+def _after_q(keys, values):
+    """(k1, k2, ..., pk) > 커서 행 — 정렬 순서 기준 '뒤'. NULL은 마지막이므로:
+    값 v 뒤 = (v보다 뒤) 또는 NULL, NULL 뒤 = 없음(다음 키로 판정)."""
+    result = Q(pk__in=[])
+    equal = Q()
+    for (path, desc), value in zip(keys, values):
+        if value is None:
+            equal &= Q(**{f"{path}__isnull": True})
+            continue
+        beyond = Q(**{f"{path}__{'lt' if desc else 'gt'}": value}) | Q(**{f"{path}__isnull": True})
+        result |= equal & beyond
+        equal &= Q(**{path: value})
+    return result
+
+
+def _aggregate_rows(model, qs, data, order_by, limit, offset, count_mode):
+    """group_by + aggregates → DB에서 GROUP BY 집계. 반환: (rows, total, count_mode).
+
+    group_by 항목: "status" (필드 경로 그대로가 키) 또는
+                   {"field": "payment_date", "trunc": "month", "as": "month"} (as 생략 시 payment_date_month)
+    aggregates: {"별칭": {"func": "sum|count|avg|min|max", "field": "경로", "distinct": bool(count만)}}
+                count는 field 생략 시 행 수. aggregates 생략 시 {"count": 행 수}
+    group_by 없으면 전체 1행. order_by는 그룹 키·집계 별칭만 (기본 그룹 키 오름차순)
+    """
+    group_by = data.get("group_by") or []
+    aggregates = data.get("aggregates") or {"count": {"func": "count"}}
+    if not isinstance(group_by, list) or not isinstance(aggregates, dict):
+        raise QueryError("group_by는 배열, aggregates는 객체여야 함")
+
+    plain, truncs = [], {}
+    for item in group_by:
+        if isinstance(item, str) and item:
+            plain.append(item)
+        elif isinstance(item, dict):
+            field, unit = item.get("field"), item.get("trunc")
+            if not isinstance(field, str) or unit not in TRUNC_FUNCS:
+                raise QueryError(f"group_by 날짜 절삭은 field + trunc({' | '.join(TRUNC_FUNCS)})")
+            alias = item.get("as") or f"{field.replace('__', '_')}_{unit}"
+            if not isinstance(alias, str) or not ALIAS_RE.match(alias):
+                raise QueryError(f"별칭 형식 오류: {alias!r}")
+            _check_paths(model, [field])
+            truncs[alias] = TRUNC_FUNCS[unit](field)
+        else:
+            raise QueryError("group_by 항목은 필드 경로 문자열 또는 {field, trunc, as} 객체")
+    _check_paths(model, plain)
+
+    aggs = {}
+    for alias, spec in aggregates.items():
+        if not ALIAS_RE.match(alias):
+            raise QueryError(f"별칭 형식 오류: {alias!r}")
+        func = spec.get("func") if isinstance(spec, dict) else None
+        if func not in AGGREGATE_FUNCS:
+            raise QueryError(f"{alias}: func는 {' | '.join(AGGREGATE_FUNCS)} 중 하나")
+        field = spec.get("field") or ("pk" if func == "count" else None)
+        if not isinstance(field, str):
+            raise QueryError(f"{alias}: field 필수")
+        _check_paths(model, [field])
+        if func == "count":
+            aggs[alias] = Count(field, distinct=bool(spec.get("distinct")))
+        else:
+            aggs[alias] = AGGREGATE_FUNCS[func](field)
+
+    group_keys = plain + list(truncs)
+    if len(set(group_keys) | set(aggs)) != len(group_keys) + len(aggs):
+        raise QueryError("group_by·aggregates 별칭 중복")
+
+    if not group_keys:
+        return [qs.aggregate(**aggs)], 1, ("none" if count_mode == "none" else "exact")
+
+    ordering = order_by or group_keys
+    if not isinstance(ordering, list) or not all(isinstance(x, str) for x in ordering):
+        raise QueryError("order_by는 문자열 배열이어야 함")
+    for item in ordering:
+        if item.lstrip("-") not in group_keys and item.lstrip("-") not in aggs:
+            raise QueryError(f"집계 order_by는 그룹 키·집계 별칭만: {item}")
+    # 나머지 그룹 키로 동률 정렬 고정 (offset 페이지 사이 순서 흔들림 방지)
+    ordering = ordering + [k for k in group_keys if k not in {x.lstrip("-") for x in ordering}]
+    grouped = (
+        qs.values(*plain, **truncs)
+        .annotate(**aggs)
+        .order_by(*[F(x[1:]).desc(nulls_last=True) if x.startswith("-") else F(x).asc(nulls_last=True)
+                    for x in ordering])
+    )
+    total = None
+    if count_mode == "exact":
+        total = grouped.count()
+    elif count_mode == "estimate":
+        total, count_mode = _estimate_count(grouped)
+    return list(grouped[offset : offset + limit]), total, count_mode
+
+
+def _estimate_count(qs):
+    """대략 행 수 — PostgreSQL 실행계획 추정치(Plan Rows, 실제 조회 없음). 그 외 DB는 exact."""
+    if connection.vendor != "postgresql":
+        return qs.count(), "exact"
+    plan = json.loads(qs.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"]), "estimate"
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def hermes_query(request):
@@ -45,80 +469,363 @@ def hermes_query(request):
         "filters": {"status": "PRODUCED"}, # Django filter kwargs (선택)
         "exclude": {"is_urgent": true},    # Django exclude kwargs (선택)
         "fields": ["id", "customer_name", "status"],  # 생략 시 전체 필드 (선택)
-        "order_by": ["-created_at"],       # (선택)
+        "order_by": ["-created_at"],       # (선택) 생략 시 모델 기본 정렬. pk가 항상 마지막 정렬 키
         "limit": 100,                      # 상한 500
-        "offset": 0
+        "after": "<next 토큰>",            # (선택) 커서 페이지네이션 — 직전 응답의 next
+        "offset": 0,                       # (선택) after와 함께 쓸 수 없음
+        "count": "exact",                  # (선택) exact | estimate | none(false). after 있으면 기본 none
+        "group_by": ["status", {"field": "payment_date", "trunc": "month", "as": "month"}],  # (선택) 집계
+        "aggregates": {"revenue": {"func": "sum", "field": "total_order_amount"}}            # (선택) 집계
       }
-    응답: {"success", "model", "count", "total", "limit", "offset", "results": [...]}
+    응답: {"success", "model", "count", "total", "total_mode", "limit", "offset",
+           "next", "results": [...]}
+    - next: 다음 페이지 after 토큰 (마지막 페이지면 null). 정렬 키 값 기준 조회라
+      OFFSET과 달리 몇 번째 페이지든 비용 동일
+    - total: count=none이면 null, estimate면 추정치 (total_mode로 구분)
+    - group_by/aggregates: DB GROUP BY 결과 행(그룹 키 + 집계 별칭)만 반환 → _aggregate_rows.
+      total = 그룹 수, next 없음 (limit·offset). fields·after와 함께 쓸 수 없음
+
+    묶음: {"queries": [{"name": "order", ...스펙}, {"name": "items", ..., "filters":
+           {"order_id__in": {"$ref": "order.id"}}}]}  (최대 MAX_BATCH_QUERIES개)
+    → {"success": true, "results": {"order": {단건 응답}, "items": {...}}}
+    한 트랜잭션·같은 스냅샷으로 순서대로 실행 (_run_batch). 쿼리별 오류는 그 이름 자리에만
+    {"success": false, "name", "error", "code", ...} (실패한 쿼리를 $ref하면 그 쿼리도 실패), 나머지는 계속.
+    묶음 형식 오류·요청 한도·시간 초과는 전체 실패
     """
     if not _check_hermes_api_key(request):
         return JsonResponse({"success": False, "error": "인증 실패"}, status=401)
 
     try:
-        data = json.loads(request.body or b"{}")
-    except (ValueError, json.JSONDecodeError):
-        return JsonResponse({"success": False, "error": "JSON 파싱 실패"}, status=400)
-    if not isinstance(data, dict):
-        return JsonResponse({"success": False, "error": "body는 JSON 객체여야 함"}, status=400)
+        data = _load_json(request)
+        queries = data.get("queries")
+        if queries is None:
+            _take_token(request)
+            payload = _guarded(lambda: _run_query(data))
+        else:
+            if not isinstance(queries, list) or not queries:
+                raise QueryError("queries는 쿼리 스펙 배열이어야 함")
+            if len(queries) > MAX_BATCH_QUERIES:
+                raise QueryError(f"queries는 최대 {MAX_BATCH_QUERIES}개")
+            _take_token(request, cost=len(queries))
+            payload = {"success": True, "results": _guarded(lambda: _run_batch(queries), snapshot=True)}
+    except QueryError as e:
+        return _error_response(e)
 
-    model_label = (data.get("model") or "").strip()
-    if not model_label:
-        return JsonResponse({"success": False, "error": "model 필수 (예: orders.Order)"}, status=400)
+    return JsonResponse(payload, json_dumps_params={"ensure_ascii": False})  # 한글 보존
 
-    # 차단 검사
-    if "." not in model_label:
-        return JsonResponse(
-            {"success": False, "error": "model은 app_label.Model 형식 (예: orders.Order)"}, status=400
-        )
-    app_label, model_name = model_label.split(".", 1)
-    if app_label.lower() in DENY_APPS or model_label.lower() in DENY_MODELS:
-        return JsonResponse({"success": False, "error": f"{model_label}: 조회 차단된 모델"}, status=403)
 
+def _guarded(run, snapshot=False):
+    """_cost_guard 안에서 실행 + ORM 오류를 QueryError로 (시간 초과 판정은 _cost_guard가 먼저)."""
     try:
-        model = apps.get_model(app_label, model_name)
-    except (ValueError, LookupError):
-        return JsonResponse({"success": False, "error": f"모델 없음: {model_label}"}, status=400)
+        with _cost_guard(snapshot=snapshot):
+            return run()
+    except QueryError:
+        raise
+    except FieldError as e:
+        raise _field_error(e)
+    except Exception as e:  # 잘못된 lookup 값 등
+        raise QueryError(f"조회 실패: {type(e).__name__}: {e}")
 
-    filters = data.get("filters") or {}
-    exclude = data.get("exclude") or {}
+
+def _resolve_refs(spec, results):
+    """filters/exclude 값 {"$ref": "<앞 쿼리 이름>.<필드>"} → 그 쿼리 결과 행들의 필드 값 목록.
+
+    값은 중복·null 제거한 배열이라 __in lookup과 함께 씀 (예: {"order_id__in": {"$ref": "orders.id"}}).
+    앞 쿼리가 받은 행(limit 안)만 대상 — next가 있었다면 나머지는 빠짐.
+    """
+    resolved = dict(spec)
+    for key in ("filters", "exclude"):
+        conditions = spec.get(key)
+        if not isinstance(conditions, dict):
+            continue
+        resolved[key] = dict(conditions)
+        for lookup, value in conditions.items():
+            if not (isinstance(value, dict) and set(value) == {"$ref"}):
+                continue
+            name, _, field = str(value["$ref"]).partition(".")
+            if name not in results or not field:
+                raise QueryError(f"$ref {value['$ref']!r}: 앞선 쿼리 이름.필드 형식이어야 함")
+            if not results[name]["success"]:
+                raise QueryError(f"$ref {value['$ref']!r}: {name} 쿼리가 실패해 값 없음")
+            rows = results[name]["results"]
+            if rows and field not in rows[0]:
+                raise QueryError(f"$ref {value['$ref']!r}: {name} 결과에 {field} 필드 없음 (fields에 포함)")
+            resolved[key][lookup] = list(dict.fromkeys(row[field] for row in rows if row[field] is not None))
+    return resolved
+
+
+def _run_batch(queries):
+    """여러 쿼리를 순서대로 (한 트랜잭션·같은 스냅샷). 반환: {이름: 단건 응답과 같은 payload}.
+
+    쿼리별 오류(잘못된 필드·$ref·lookup 값 등)는 그 쿼리만 실패 — 결과 자리에 단건 오류 응답과
+    같은 {"success": false, "name", "error", "code", ...}. 쿼리마다 savepoint라 DB 오류가 나도
+    나머지는 이어서 실행. 시간 초과(OperationalError)는 _cost_guard가 묶음 전체 실패로 판정.
+    """
+    results = {}
+    for index, spec in enumerate(queries):
+        if not isinstance(spec, dict):
+            raise QueryError(f"queries[{index}]: 객체여야 함")
+        name = spec.get("name") or f"q{index}"
+        if not isinstance(name, str) or not ALIAS_RE.match(name) or name in results:
+            raise QueryError(f"queries[{index}]: name은 영문·숫자·_ 이고 중복 불가 ({name!r})")
+        try:
+            with transaction.atomic():
+                results[name] = _run_query(_resolve_refs(spec, results))
+        except OperationalError:
+            raise
+        except QueryError as e:
+            results[name] = _query_error_payload(name, e)
+        except FieldError as e:
+            results[name] = _query_error_payload(name, _field_error(e))
+        except (DatabaseError, ValueError, TypeError, LookupError) as e:   # 잘못된 lookup 값 등
+            results[name] = _query_error_payload(name, QueryError(f"조회 실패: {type(e).__name__}: {e}"))
+    return results
+
+
+def _query_error_payload(name, e):
+    """묶음 안 쿼리 1건 실패 → 단건 오류 응답(_error_response)과 같은 본문 + name."""
+    return {"success": False, "name": name, "error": str(e), "code": e.code, **e.extra}
+
+
+def _run_query(data):
+    """쿼리 스펙 1건 실행 → 응답 payload. _cost_guard 안에서 호출 (_guarded)."""
+    model_label, model = _resolve_model(data)
     fields = data.get("fields") or []
     order_by = data.get("order_by") or []
-    if not all(isinstance(x, dict) for x in (filters, exclude)):
-        return JsonResponse({"success": False, "error": "filters/exclude는 객체여야 함"}, status=400)
+    after = data.get("after") or None
+    grouped = bool(data.get("group_by") or data.get("aggregates"))
+    if grouped and (fields or after):
+        raise QueryError("group_by/aggregates는 fields·after와 함께 쓸 수 없음")
 
     try:
         limit = int(data.get("limit", 100))
         offset = int(data.get("offset", 0))
     except (TypeError, ValueError):
-        return JsonResponse({"success": False, "error": "limit/offset은 정수여야 함"}, status=400)
+        raise QueryError("limit/offset은 정수여야 함")
     limit = max(1, min(limit, MAX_LIMIT))
     offset = max(0, offset)
+    if after and offset:
+        raise QueryError("after와 offset은 함께 쓸 수 없음")
+
+    count_mode = data.get("count", "none" if after else "exact")
+    if isinstance(count_mode, bool) or count_mode is None:
+        count_mode = "exact" if count_mode else "none"
+    if not isinstance(count_mode, str) or count_mode not in COUNT_MODES:
+        raise QueryError("count는 exact | estimate | none(false) 중 하나")
+
+    qs = _filtered_queryset(model, data)
+    if grouped:
+        rows, total, count_mode = _aggregate_rows(model, qs, data, order_by, limit, offset, count_mode)
+        keys, extra = None, []   # 집계 결과는 커서 없음 (limit·offset만)
+    else:
+        _check_paths(model, fields)
+        keys = _ordering(model, order_by)
+
+        total = None
+        if count_mode == "exact":
+            total = qs.count()
+        elif count_mode == "estimate":
+            total, count_mode = _estimate_count(qs)
+
+        if after:
+            qs = qs.filter(_after_q(keys, _decode_cursor(keys, after)))
+        qs = qs.order_by(*_order_exprs(keys))
+        # 커서용 정렬 키 값도 함께 조회 → 응답에서는 요청 fields만 남김
+        out_fields = list(fields) or [f.attname for f in model._meta.concrete_fields]
+        extra = [path for path, _ in keys if path not in out_fields]
+        rows = list(qs.values(*out_fields, *extra)[offset : offset + limit + 1])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(keys, rows[-1]) if has_more else None
+    if extra:
+        for row in rows:
+            for path in extra:
+                del row[path]
+
+    return {
+        "success": True,
+        "model": model_label,
+        "count": len(rows),
+        "total": total,
+        "total_mode": count_mode,
+        "limit": limit,
+        "offset": offset,
+        "next": next_cursor,
+        "results": rows,
+    }
+
+
+def _export_stream(qs, chunk_size):
+    """NDJSON 행 → gzip 스트림. DB fetch 단위(chunk_size)마다 압축 flush해서 내보냄.
+
+    메모리 = 청크 1개분. 마지막 줄은 {"_end": {"rows": n}} — 이 줄이 없으면 중간에 끊긴 것.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    gz = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)   # 16+ = gzip 헤더
+    lines = []
+    rows = 0
+    # statement_timeout은 FETCH(청크)마다 적용 — 전체 전송 시간이 아니라 청크 하나 읽는 시간 제한
+    with _cost_guard(streaming=True):
+        for row in qs.iterator(chunk_size=chunk_size):
+            lines.append(encoder.encode(row))
+            rows += 1
+            if len(lines) >= chunk_size:
+                yield gz.compress(("\n".join(lines) + "\n").encode("utf-8")) + gz.flush(zlib.Z_SYNC_FLUSH)
+                lines = []
+    lines.append(encoder.encode({"_end": {"rows": rows}}))
+    yield gz.compress(("\n".join(lines) + "\n").encode("utf-8")) + gz.flush(zlib.Z_FINISH)
+
+
+async def _aexport_stream(qs, chunk_size):
+    """_export_stream을 ASGI용 async 이터레이터로 — 조각마다 sync_to_async로 하나씩 받아 보냄.
+
+    Django 4.2 StreamingHttpResponse는 ASGI에서 sync 이터레이터를 sync_to_async(list)로 끝까지
+    읽은 뒤 보냄 → 내보내기 전체가 메모리에 쌓임. thread_sensitive라 제너레이터의 트랜잭션·서버측
+    커서는 요청 내내 같은 스레드·DB 연결에서 돎.
+    """
+    stream = _export_stream(qs, chunk_size)
+    take = sync_to_async(next, thread_sensitive=True)
+    end = object()
+    try:
+        while True:
+            part = await take(stream, end)
+            if part is end:
+                break
+            yield part
+    finally:   # 클라이언트가 끊어도 커서·트랜잭션은 같은 스레드에서 정리
+        await sync_to_async(stream.close, thread_sensitive=True)()
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def hermes_export(request):
+    """[hermes] 읽기 전용 전체 내보내기 — gzip NDJSON 스트림.
+
+    body: hermes_query와 같은 model / filters / exclude / fields / order_by (+ chunk_size).
+    limit·offset·after·count 없음 — 조건에 맞는 행 전부. order_by 생략 시 pk 순.
+    모델 차단·필드 검사도 hermes_query와 동일 (스트림 시작 전에 SQL까지 검증 → 오류는 JSON 400).
+
+    응답: Content-Encoding: gzip, 한 줄 = 한 행 (.values() 그대로). 마지막 줄 {"_end": {"rows": n}}.
+    .iterator()라 PostgreSQL은 서버측 커서로 chunk_size씩 fetch → 행 수와 무관하게 메모리 일정.
+    ASGI로 받으면 async 이터레이터(_aexport_stream), WSGI면 sync 제너레이터 그대로 — 각 핸들러가
+    버퍼링 없이 조각마다 보내는 쪽.
+    """
+    if not _check_hermes_api_key(request):
+        return JsonResponse({"success": False, "error": "인증 실패"}, status=401)
 
     try:
-        qs = model.objects.all()
-        if filters:
-            qs = qs.filter(**filters)
-        if exclude:
-            qs = qs.exclude(**exclude)
-        if order_by:
-            qs = qs.order_by(*order_by)
-        total = qs.count()
+        _take_token(request)
+        data, model_label, model = _parse_body(request)
+        try:
+            chunk_size = int(data.get("chunk_size", EXPORT_CHUNK_SIZE))
+        except (TypeError, ValueError):
+            raise QueryError("chunk_size는 정수여야 함")
+        chunk_size = max(EXPORT_CHUNK_RANGE[0], min(chunk_size, EXPORT_CHUNK_RANGE[1]))
+
+        fields = data.get("fields") or []
+        _check_paths(model, fields)
+        keys = _ordering(model, data.get("order_by") or ["pk"])
+        qs = _filtered_queryset(model, data).order_by(*_order_exprs(keys))
         qs = qs.values(*fields) if fields else qs.values()
-        results = list(qs[offset : offset + limit])
+        qs.query.sql_with_params()   # 잘못된 필드·lookup을 스트림 시작 전에 검출
+    except QueryError as e:
+        return _error_response(e)
     except FieldError as e:
-        return JsonResponse({"success": False, "error": f"필드 오류: {e}"}, status=400)
+        return _error_response(_field_error(e))
     except Exception as e:  # 잘못된 lookup 값 등
-        return JsonResponse({"success": False, "error": f"조회 실패: {type(e).__name__}: {e}"}, status=400)
-
-    return JsonResponse(
-        {
-            "success": True,
-            "model": model_label,
-            "count": len(results),
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "results": results,
-        },
-        json_dumps_params={"ensure_ascii": False},  # 한글 보존
+        return _error_response(QueryError(f"조회 실패: {type(e).__name__}: {e}"))
+
+    stream = _aexport_stream if isinstance(request, ASGIRequest) else _export_stream
+    response = StreamingHttpResponse(
+        stream(qs, chunk_size), content_type="application/x-ndjson; charset=utf-8"
     )
+    response["Content-Encoding"] = "gzip"
+    response["Content-Disposition"] = f'attachment; filename="{model_label}.ndjson.gz"'
+    response["X-Accel-Buffering"] = "no"   # nginx 버퍼링 없이 바로 전달
+    return response
+
+
+def _field_schema(field):
+    """필드 1개 설명. 역참조(다른 모델의 FK)는 filters 경로용 이름(related_query_name)."""
+    if field.auto_created and not field.concrete:   # 역참조
+        kind = "reverse_m2m" if field.many_to_many else ("reverse_o2o" if field.one_to_one else "reverse_fk")
+        return {"name": field.name, "type": kind, "related_model": field.related_model._meta.label,
+                "many": not field.one_to_one}
+    info = {
+        "name": field.name,
+        "type": field.get_internal_type(),
+        "null": field.null,
+        "indexed": bool(field.primary_key or field.unique or field.db_index),
+        "verbose_name": str(field.verbose_name),
+    }
+    if field.is_relation and field.related_model is not None:
+        info["related_model"] = field.related_model._meta.label
+        info["attname"] = field.attname   # .values()·fields에 나오는 키 (예: order_id)
+    if getattr(field, "max_length", None):
+        info["max_length"] = field.max_length
+    if field.choices:
+        info["choices"] = [[value, str(label)] for value, label in field.flatchoices]
+    return info
+
+
+def _model_schema(model):
+    opts = model._meta
+    fields = [
+        _field_schema(f) for f in opts.get_fields()
+        if not (f.is_relation and f.related_model is not None and _is_denied(f.related_model))
+    ]
+    indexes = [
+        {"name": index.name, "fields": list(index.fields), "partial": index.condition is not None}
+        for index in opts.indexes
+    ]
+    # 복합 인덱스·유니크 제약의 첫 컬럼도 단독 조건·정렬에 인덱스 사용 가능
+    leading = {index.fields[0].lstrip("-") for index in opts.indexes if index.fields and index.condition is None}
+    leading |= {c.fields[0] for c in opts.constraints if getattr(c, "fields", None) and c.condition is None}
+    leading |= {fields_[0] for fields_ in opts.unique_together}
+    for info in fields:
+        if info.get("name") in leading:
+            info["indexed"] = True
+    return {
+        "model": opts.label,
+        "verbose_name": str(opts.verbose_name),
+        "pk": opts.pk.name,
+        "ordering": [x for x in opts.ordering if isinstance(x, str)],
+        "fields": fields,
+        "indexes": indexes,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_payload():
+    """허용 모델 전체 스키마 (JSON bytes, ETag). 모델 정의는 실행 중 안 바뀜 → 프로세스당 1회 계산."""
+    models = sorted(
+        (m for m in apps.get_models() if not _is_denied(m) and not m._meta.proxy),
+        key=lambda m: m._meta.label,
+    )
+    body = json.dumps(
+        {"success": True, "models": [_model_schema(m) for m in models]},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    return body, quote_etag(hashlib.md5(body).hexdigest())
+
+
+@require_http_methods(["GET"])
+def hermes_schema(request):
+    """[hermes] 조회 가능 모델 스키마 — 필드·타입·관계·choices·인덱스 (DENY_APPS/DENY_MODELS 제외).
+
+    프로세스당 1회 계산(_schema_payload). ETag — If-None-Match 일치 시 304 (본문 없음).
+    indexed=true인 필드로 filters·order_by를 잡으면 큰 표도 빠름 (seq_scan_rejected 회피).
+    """
+    if not _check_hermes_api_key(request):
+        return JsonResponse({"success": False, "error": "인증 실패"}, status=401)
+
+    body, etag = _schema_payload()
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and etag in parse_etags(if_none_match):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json; charset=utf-8")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"   # 매번 If-None-Match로 재검증 (배포 후 바로 새 스키마)
+    return response
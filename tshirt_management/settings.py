@@ -106,6 +106,12 @@ if 'sqlite' in DATABASES['default']['ENGINE']:
     # SQLite 연결 타임아웃 증가
     DATABASES['default']['timeout'] = 20
 
+# 캐시 — 기본은 프로세스 로컬(locmem). gunicorn 워커 여러 개가 캐시를 공유하려면
+# CACHE_URL=filecache:///var/tmp/tshirt_cache 또는 redis://... 지정
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
 # 제품 옵션 인라인 폼셋: 행마다 필드가 여러 개라 기본(1000) 초과 시 TooManyFieldsSent → 400
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
 
@@ -177,11 +183,29 @@ POPBILL_IS_TEST = env.bool('POPBILL_IS_TEST', default=True)
 POPBILL_CORP_NUM = env('POPBILL_CORP_NUM', default='')
 POPBILL_BANK_CODE = env('POPBILL_BANK_CODE', default='')
 POPBILL_ACCOUNT_NUMBER = env('POPBILL_ACCOUNT_NUMBER', default='')
+# 로컬 대역 서버(popbill_api/standin.py) URL — 지정 시 팝빌 SDK 대신 대역 클라이언트 사용
+POPBILL_STANDIN_URL = env('POPBILL_STANDIN_URL', default='')
 
 # Bankda 입금자동확인 REST API (인수인계 2026-05-15, 통합 2026-05-25)
 BANKDA_ACCESS_TOKEN = env('BANKDA_ACCESS_TOKEN', default='')
 BANKDA_ACCOUNT_NUM = env('BANKDA_ACCOUNT_NUM', default='')
 BANKDA_IS_TEST = env('BANKDA_IS_TEST', default='n')
+# 로컬 가짜 뱅크다 서버로 돌릴 때만 변경 (기본=운영 URL)
+BANKDA_URL = env('BANKDA_URL', default='https://a.bankda.com/dtsvc/bank_tr.php')
+
+# 보존기간 정리(manage.py compact_ktalk_history, compact_deposit_payloads) 아카이브 위치 —
+# 처리 끝난 ktalk 요청·입금 원본 JSONL.gz. 반드시 영구 저장소 (Render 기본 디스크는 재배포 때
+# 비워짐). 비어 있으면 정리 명령이 삭제하지 않고 중단 (utils/retention.py)
+RETENTION_ARCHIVE_DIR = env('RETENTION_ARCHIVE_DIR', default='')
+
+# hermes 게이트웨이 비용 가드 (tshirt_management/hermes_views.py) — 운영자 화면과 같은 DB라 과부하 방지
+HERMES_STATEMENT_TIMEOUT_MS = env.int('HERMES_STATEMENT_TIMEOUT_MS', default=5000)
+# EXPLAIN으로 큰 표(행 추정치 이상) 순차 스캔 쿼리 거부 — PostgreSQL만. 기본 꺼짐
+HERMES_SEQSCAN_GUARD = env.bool('HERMES_SEQSCAN_GUARD', default=False)
+HERMES_SEQSCAN_MIN_ROWS = env.int('HERMES_SEQSCAN_MIN_ROWS', default=50000)
+# 키별 요청 한도 (cache 고정 창 카운터, best-effort — locmem이면 프로세스별): 분당 / 10초당
+HERMES_RATE_PER_MINUTE = env.int('HERMES_RATE_PER_MINUTE', default=120)
+HERMES_RATE_BURST = env.int('HERMES_RATE_BURST', default=30)
 
 # Logging configuration
 LOGGING = {
@@ -0,0 +1,295 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+
+from popbill_api.models import Deposit
+
+from . import hermes_views
+
+API_KEY = 'test-hermes-key'
+
+
+class HermesTestCase(TestCase):
+    """hermes 게이트웨이 공통 — 입금 n건 + 인증 헤더로 POST."""
+
+    deposit_count = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.now()
+        Deposit.objects.bulk_create([
+            Deposit(
+                transaction_id=f'H{i:05d}',
+                transaction_date=base - timedelta(minutes=i),
+                depositor_name=f'입금자{i % 3}',
+                amount=1000 * (i % 5 + 1),
+            )
+            for i in range(cls.deposit_count)
+        ])
+        cls.deposit_ids = sorted(Deposit.objects.values_list('id', flat=True))
+
+    def setUp(self):
+        cache.clear()   # 요청 한도 카운터
+        patcher = mock.patch.dict(os.environ, {'HERMES_API_KEY': API_KEY})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, path, body):
+        return self.client.post(path, json.dumps(body), content_type='application/json',
+                                HTTP_X_HERMES_KEY=API_KEY)
+
+
+class HermesExportTests(HermesTestCase):
+    """hermes/export/ — gzip NDJSON을 fetch 청크 단위로 나눠 스트리밍."""
+
+    deposit_count = 250
+    body = {'model': 'popbill_api.Deposit', 'fields': ['id', 'transaction_id'], 'chunk_size': 100}
+
+    def assertExport(self, parts):
+        # 250행 / 청크 100행 → 행 청크 2개 + 나머지·끝 줄 1개
+        self.assertEqual(len(parts), 3)
+        lines = gzip.decompress(b''.join(parts)).decode('utf-8').splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(rows[-1], {'_end': {'rows': 250}})
+        self.assertEqual([row['id'] for row in rows[:-1]], self.deposit_ids)
+
+    def test_wsgi_streams_chunks(self):
+        response = self.post('/hermes/export/', self.body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.is_async)
+        self.assertExport(list(response.streaming_content))
+
+    async def test_asgi_streams_chunks_without_buffering(self):
+        response = await AsyncClient().post(
+            '/hermes/export/', json.dumps(self.body), content_type='application/json',
+            headers={'X-Hermes-Key': API_KEY},
+        )
+        self.assertEqual(response.status_code, 200)
+        # async 이터레이터여야 ASGI 핸들러가 sync_to_async(list)로 전부 읽지 않고 조각마다 보냄
+        self.assertTrue(response.is_async)
+        self.assertExport([part async for part in response.streaming_content])
+
+    def test_invalid_field_is_json_error_before_stream(self):
+        response = self.post('/hermes/export/', {'model': 'popbill_api.Deposit', 'fields': ['nope']})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+
+class HermesCursorTests(HermesTestCase):
+    """hermes/query/ keyset 페이지네이션 — next 토큰을 따라가면 전 행을 정렬 순서대로 한 번씩."""
+
+    def query(self, **spec):
+        return self.post('/hermes/query/', {'model': 'popbill_api.Deposit', 'fields': ['id', 'amount'], **spec})
+
+    def test_cursor_round_trip_keeps_order_with_ties(self):
+        # amount는 5가지 값뿐 → 동률 행이 페이지 경계에 걸림. pk가 마지막 정렬 키라 누락·중복 없어야 함
+        expected = sorted(
+            Deposit.objects.values_list('amount', 'id'), key=lambda row: (-row[0], row[1]),
+        )
+        first = self.query(order_by=['-amount'], limit=7).json()
+        self.assertEqual((first['total'], first['total_mode']), (30, 'exact'))
+
+        seen, page = [], first
+        while True:
+            seen += [row['id'] for row in page['results']]
+            if not page['next']:
+                break
+            page = self.query(order_by=['-amount'], limit=7, after=page['next']).json()
+            self.assertTrue(page['success'])
+            self.assertIsNone(page['total'])   # 다음 페이지는 기본 count=none
+        self.assertEqual(seen, [pk for _amount, pk in expected])
+
+    def test_default_ordering_follows_model_meta(self):
+        ids = []
+        page = self.query(limit=12, count='none').json()
+        ids += [row['id'] for row in page['results']]
+        while page['next']:
+            page = self.query(limit=12, after=page['next']).json()
+            ids += [row['id'] for row in page['results']]
+        # Meta.ordering = -transaction_date, 입금 i는 base - i분 → id 오름차순
+        self.assertEqual(ids, self.deposit_ids)
+
+    def test_cursor_rejects_other_ordering_and_offset(self):
+        token = self.query(order_by=['-amount'], limit=5).json()['next']
+
+        response = self.query(order_by=['amount'], limit=5, after=token)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['code'], 'invalid_request')
+        self.assertEqual(self.query(order_by=['-amount'], after=token, offset=5).status_code, 400)
+        self.assertEqual(self.query(after='not-a-token').status_code, 400)
+
+
+class HermesAggregateTests(HermesTestCase):
+    """hermes/query/ group_by·aggregates — DB GROUP BY 결과가 원본 합계와 같은지."""
+
+    def aggregate(self, **spec):
+        response = self.post('/hermes/query/', {'model': 'popbill_api.Deposit', **spec})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_group_by_with_aggregates(self):
+        expected = {}
+        for name, amount in Deposit.objects.values_list('depositor_name', 'amount'):
+            count, total = expected.get(name, (0, 0))
+            expected[name] = (count + 1, total + amount)
+
+        payload = self.aggregate(
+            group_by=['depositor_name'],
+            aggregates={'n': {'func': 'count'}, 'total': {'func': 'sum', 'field': 'amount'}},
+            order_by=['-total'],
+        )
+        self.assertEqual(payload['total'], 3)
+        self.assertIsNone(payload['next'])
+        rows = payload['results']
+        self.assertEqual(
+            {row['depositor_name']: (row['n'], Decimal(row['total'])) for row in rows}, expected,
+        )
+        self.assertEqual([Decimal(row['total']) for row in rows],
+                         sorted((Decimal(row['total']) for row in rows), reverse=True))
+
+    def test_without_group_by_is_single_row(self):
+        payload = self.aggregate(aggregates={
+            'n': {'func': 'count'},
+            'amounts': {'func': 'count', 'field': 'amount', 'distinct': True},
+            'top': {'func': 'max', 'field': 'amount'},
+        })
+        [row] = payload['results']
+        self.assertEqual((row['n'], row['amounts'], Decimal(row['top'])), (30, 5, Decimal('5000')))
+
+    def test_trunc_group_and_invalid_specs(self):
+        payload = self.aggregate(group_by=[{'field': 'transaction_date', 'trunc': 'year', 'as': 'year'}])
+        self.assertEqual(sum(row['count'] for row in payload['results']), 30)
+
+        for spec in (
+            {'aggregates': {'x': {'func': 'median', 'field': 'amount'}}},
+            {'group_by': ['depositor_name'], 'order_by': ['amount']},
+            {'group_by': ['depositor_name'], 'fields': ['id']},
+        ):
+            response = self.post('/hermes/query/', {'model': 'popbill_api.Deposit', **spec})
+            self.assertEqual(response.status_code, 400, spec)
+
+
+@override_settings(HERMES_RATE_BURST=3, HERMES_RATE_PER_MINUTE=5)
+class HermesRateLimitTests(HermesTestCase):
+    """hermes 요청 한도 — 고정 창 카운터, 넘으면 429 + Retry-After, 거절된 요청은 안 셈."""
+
+    body = {'model': 'popbill_api.Deposit', 'fields': ['id'], 'limit': 1, 'count': 'none'}
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1_200_000.0   # 10초·60초 창 모두의 시작 시각 → 테스트 중 창이 넘어가지 않게
+        patcher = mock.patch.object(hermes_views.time_module, 'time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_limit_returns_429_until_window_ends(self):
+        for _ in range(3):
+            self.assertEqual(self.post('/hermes/query/', self.body).status_code, 200)
+        self.now += 4
+        response = self.post('/hermes/query/', self.body)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['code'], 'rate_limited')
+        self.assertEqual(response.json()['retry_after'], 6.0)
+        self.assertEqual(response['Retry-After'], '6')
+
+        # 다음 10초 창 — 거절된 요청은 세지 않았으므로 분당 한도(5)까지 2건 남음
+        self.now += 6
+        self.assertEqual(self.post('/hermes/query/', self.body).status_code, 200)
+        self.assertEqual(self.post('/hermes/query/', self.body).status_code, 200)
+        self.assertEqual(self.post('/hermes/query/', self.body).status_code, 429)
+
+    def test_batch_costs_one_token_per_query(self):
+        batch = {'queries': [dict(self.body, name='a'), dict(self.body, name='b')]}
+        self.assertEqual(self.post('/hermes/query/', batch).status_code, 200)
+        self.assertEqual(self.post('/hermes/query/', batch).status_code, 429)
+        self.assertEqual(self.post('/hermes/query/', self.body).status_code, 200)
+
+        # 순간 한도보다 큰 묶음은 기다려도 못 받음 → 429가 아닌 400
+        too_big = {'queries': [dict(self.body, name=f'q{i}') for i in range(4)]}
+        self.assertEqual(self.post('/hermes/query/', too_big).status_code, 400)
+
+
+class HermesBatchTests(HermesTestCase):
+    """hermes/query/ 묶음 — 쿼리별 오류는 그 자리에만, 나머지는 이어서 실행."""
+
+    def test_per_query_errors(self):
+        response = self.post('/hermes/query/', {'queries': [
+            {'name': 'recent', 'model': 'popbill_api.Deposit', 'fields': ['id'], 'limit': 3},
+            {'name': 'typo', 'model': 'popbill_api.Deposit', 'fields': ['amout']},
+            {'name': 'badvalue', 'model': 'popbill_api.Deposit', 'filters': {'id': 'abc'}},
+            {'name': 'fromtypo', 'model': 'popbill_api.Deposit', 'filters': {'id__in': {'$ref': 'typo.id'}}},
+            {'name': 'same', 'model': 'popbill_api.Deposit', 'fields': ['id', 'amount'],
+             'filters': {'id__in': {'$ref': 'recent.id'}}},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertTrue(payload['success'])
+        results = payload['results']
+
+        self.assertEqual([row['id'] for row in results['recent']['results']], self.deposit_ids[:3])
+        self.assertEqual(
+            {name: (r['success'], r.get('code')) for name, r in results.items() if name != 'recent'},
+            {
+                'typo': (False, 'invalid_request'),
+                'badvalue': (False, 'invalid_request'),
+                'fromtypo': (False, 'invalid_request'),
+                'same': (True, None),
+            },
+        )
+        self.assertEqual(results['typo']['name'], 'typo')
+        self.assertIn('amount', results['typo']['did_you_mean'])
+        self.assertIn('typo', results['fromtypo']['error'])
+        self.assertEqual(sorted(row['id'] for row in results['same']['results']), self.deposit_ids[:3])
+
+    def test_malformed_batch_fails_whole_request(self):
+        for queries in ([], ['not an object'], [{'name': 'a', 'model': 'popbill_api.Deposit'}] * 2):
+            response = self.post('/hermes/query/', {'queries': queries})
+            self.assertEqual(response.status_code, 400, queries)
+            self.assertFalse(response.json()['success'])
+
+
+class HermesSchemaTests(HermesTestCase):
+    """hermes/schema/ — 허용 모델 스키마 + ETag 재검증, 필드 오류 힌트."""
+
+    def get_schema(self, **headers):
+        return self.client.get('/hermes/schema/', HTTP_X_HERMES_KEY=API_KEY, **headers)
+
+    def test_schema_lists_allowed_models(self):
+        response = self.get_schema()
+        self.assertEqual(response.status_code, 200)
+        models = {m['model']: m for m in response.json()['models']}
+        self.assertIn('popbill_api.Deposit', models)
+        self.assertFalse([label for label in models if label.startswith(('auth.', 'sessions.', 'admin.'))])
+        self.assertNotIn('settings_app.apisettings', {label.lower() for label in models})
+        fields = {f['name']: f for f in models['popbill_api.Deposit']['fields']}
+        self.assertTrue(fields['transaction_id']['indexed'])
+        self.assertEqual(fields['matched_order']['attname'], 'matched_order_id')
+
+    def test_etag_revalidation(self):
+        first = self.get_schema()
+        etag = first['ETag']
+        self.assertTrue(etag)
+
+        cached = self.get_schema(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], etag)
+        self.assertEqual(self.get_schema(HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+        self.assertEqual(self.client.get('/hermes/schema/').status_code, 401)
+
+    def test_unknown_field_error_has_hints(self):
+        response = self.post('/hermes/query/', {'model': 'popbill_api.Deposit', 'filters': {'depositor': 'x'}})
+        self.assertEqual(response.status_code, 400)
+        payload = response.json()
+        self.assertEqual(payload['schema'], '/hermes/schema/')
+        self.assertIn('depositor_name', payload['fields'])
+        self.assertIn('depositor_name', payload['did_you_mean'])
@@ -48,6 +48,8 @@ urlpatterns = [
 
     # hermes 에이전트 읽기 전용 게이트웨이 (2026-06-06) — 외부 호출이라 root 경로
     path('hermes/query/', hermes_views.hermes_query, name='hermes_query'),
+    path('hermes/export/', hermes_views.hermes_export, name='hermes_export'),
+    path('hermes/schema/', hermes_views.hermes_schema, name='hermes_schema'),
 
     path('admin/', admin.site.urls),
 ]
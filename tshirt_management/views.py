@@ -2,7 +2,7 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.db.models import Count, Q, Sum
 from orders.models import Order, OrderItem, Status
-from finance.models import Expense, Purchase
+from finance import rollup
 from products.models import Product
 
 
@@ -21,40 +21,13 @@ def dashboard(request):
     # CANCELED 상태가 아닌 주문만 대상으로 계산
     active_orders = Order.objects.exclude(status=Status.CANCELED)
     
-    # FINANCE: 이번 달 매출-매입=순이익 계산
+    # FINANCE: 이번 달 매출-매입=순이익 계산 — 월별 재무 집계 조회 1번
     # 매출: 매출현황(sales_status)과 동일 — 결제 이후 상태, 이번 달 payment_date 기준 (등록/취소 제외)
-    monthly_revenue_orders = Order.objects.filter(
-        Q(status=Status.CONSULTING)
-        | Q(status=Status.PRODUCED)
-        | Q(status=Status.COMPLETED)
-        | Q(status=Status.SETTLED)
-        | Q(status=Status.ARCHIVED),
-        payment_date__year=now.year,
-        payment_date__month=now.month,
-    )
-    total_revenue = monthly_revenue_orders.aggregate(
-        total=Sum('total_order_amount')
-    )['total'] or Decimal('0')
-    
-    # 매입: 이번 달 매입 내역
-    purchases = Purchase.objects.filter(
-        date__year=now.year,
-        date__month=now.month
-    )
-    total_purchases = sum(
-        purchase.amount * purchase.quantity 
-        for purchase in purchases
-    )
-    
-    # 지출: 이번 달 지출 내역
-    expenses = Expense.objects.filter(
-        date__year=now.year,
-        date__month=now.month
-    )
-    total_expenses = sum(
-        expense.amount * expense.quantity 
-        for expense in expenses
-    )
+    # 매입·지출: 이번 달 매입·지출 내역 (금액 × 수량)
+    month_totals, _months = rollup.summary(now.year, now.month, statuses=rollup.REVENUE_STATUSES)
+    total_revenue = month_totals['revenue']
+    total_purchases = month_totals['purchase']
+    total_expenses = month_totals['expense']
     
     # 스마트스토어 수수료 (매출의 6%)
     smartstore_fee = Decimal(str(total_revenue)) * Decimal('0.06')
@@ -0,0 +1,74 @@
+"""
+보존기간 정리 공용 — 압축 JSONL로 보관 후 청크 단위 삭제/비움.
+
+manage.py compact_ktalk_history(orders), compact_deposit_payloads(popbill_api)가 사용.
+
+아카이브: <RETENTION_ARCHIVE_DIR>/<대상>-<실행시각>.jsonl.gz (한 줄 = 한 행, .values() 그대로).
+청크마다 아카이브에 먼저 쓰고 flush → 그 청크만 짧은 트랜잭션으로 삭제/비움. 중간에 죽어도
+삭제된 행은 항상 아카이브에 있음 (재실행 시 남은 행부터 새 파일로 이어서).
+
+RETENTION_ARCHIVE_DIR는 반드시 영구 저장소 (Render persistent disk, docker 볼륨 등).
+Render 기본 디스크처럼 재배포·재시작 때 비워지는 경로면 지운 행이 아카이브와 함께 사라짐.
+그래서 기본값이 없고, 설정도 --archive-dir도 없으면 지우지 않고 중단한다.
+"""
+import gzip
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+def add_retention_arguments(parser):
+    """정리 명령 공통 옵션 (--chunk-size, --sleep, --archive-dir, --dry-run)."""
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help='청크당 행 수 (기본값: 1000)')
+    parser.add_argument('--sleep', type=float, default=0.0,
+                        help='청크 사이 대기 초 — 운영 시간대 실행 시 부하 분산 (기본값: 0)')
+    parser.add_argument('--archive-dir', default=settings.RETENTION_ARCHIVE_DIR,
+                        help='아카이브 디렉터리, 영구 저장소여야 함 (기본값: settings.RETENTION_ARCHIVE_DIR)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='대상 건수만 출력 (보관·삭제 안 함)')
+
+
+def archive_dir(options):
+    """아카이브 디렉터리 Path. 명시 설정이 없으면 CommandError (임시 디스크에 보관 후 삭제 방지)."""
+    if not options['archive_dir']:
+        raise CommandError(
+            'RETENTION_ARCHIVE_DIR(또는 --archive-dir)를 영구 저장소 경로로 지정해야 정리합니다 '
+            '— 재배포 때 지워지는 디스크에 보관하면 삭제한 행을 복구할 수 없음'
+        )
+    return Path(options['archive_dir'])
+
+
+def archive_and_apply(qs, fields, apply, path, chunk_size, sleep):
+    """pk 순 keyset 청크: 아카이브 기록·flush → 같은 조건으로 다시 걸러 삭제/비움. 반환: 처리 건수."""
+    out = None
+    last_pk = 0
+    total = 0
+    try:
+        while True:
+            rows = list(qs.filter(pk__gt=last_pk).order_by('pk').values(*fields)[:chunk_size])
+            if not rows:
+                break
+            if out is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                out = gzip.open(path, 'wt', encoding='utf-8')
+            for row in rows:
+                out.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+            out.flush()
+
+            pks = [row['id'] for row in rows]
+            last_pk = pks[-1]
+            with transaction.atomic():
+                # 조회 후 상태가 바뀐 행(예: 재요청)은 조건에서 빠져 남음
+                total += apply(qs.filter(pk__in=pks))
+            if sleep:
+                time.sleep(sleep)
+    finally:
+        if out is not None:
+            out.close()
+    return total